@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+api/bench_responses.py
+룰 / 알림 응답의 크기와 직렬화 시간 비교 (변경 전 / 후)
+- 변경 전: jsonable_encoder + JSONResponse, 압축 없음 / save_* 의 indent=2 파일
+- 변경 후: FastJSONResponse (orjson 있으면 orjson) + gzip (brotli 있으면 br 도)
+- 합성 데이터 사용 (실제 룰 파일 / eve.json 은 건드리지 않음)
+
+사용법:
+    python3 api/bench_responses.py [--rules 40000] [--alerts 10000] [--repeat 5]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from main import FastJSONResponse, orjson
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CLASSTYPES = ["trojan-activity", "attempted-recon", "attempted-admin", "web-application-attack", "policy-violation"]
+
+
+def make_rules(n: int) -> list[dict]:
+    rules = []
+    for i in range(n):
+        sid = 2000000 + i
+        classtype = random.choice(CLASSTYPES)
+        msg = f"ET POLICY Suspicious outbound request pattern {i}"
+        rule = (
+            f'alert http $HOME_NET any -> $EXTERNAL_NET any (msg:"{msg}"; flow:established,to_server; '
+            f'http.uri; content:"/api/{i:x}/"; fast_pattern; http.user_agent; content:"curl"; '
+            f'classtype:{classtype}; sid:{sid}; rev:{random.randint(1, 9)};)'
+        )
+        rules.append({
+            "sid": str(sid), "action": random.choice(["alert", "alert", "drop"]), "message": msg,
+            "category": classtype, "file": "suricata.rules", "origin": "upstream", "rule": rule, "timestamp": "",
+        })
+    return rules
+
+
+def make_alerts(n: int) -> list[dict]:
+    return [{
+        "timestamp": f"2025-11-10T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.123456+0900",
+        "src_ip": f"10.0.{i % 256}.{random.randint(1, 254)}",
+        "dest_ip": f"192.168.1.{random.randint(1, 254)}",
+        "src_port": random.randint(1024, 65535), "dest_port": random.choice([22, 80, 443, 3389]),
+        "proto": "TCP", "signature": "ET SCAN Potential SSH Scan", "severity": random.randint(1, 4),
+        "category": "Attempted Information Leak", "gid": 1, "sid": 2001219, "sensor": "eth0",
+    } for i in range(n)]
+
+
+def timed(func, repeat: int) -> tuple[float, bytes]:
+    best, result = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def report(name: str, content: dict, repeat: int):
+    before_ms, before = timed(lambda: JSONResponse(jsonable_encoder(content)).body, repeat)
+    after_ms, after = timed(lambda: FastJSONResponse(content).body, repeat)
+    gzip_ms, gzipped = timed(lambda: gzip.compress(after, compresslevel=6), repeat)
+    indent_size = len(json.dumps(content, indent=2).encode())
+
+    print(f"\n== {name} ==")
+    print(f"  변경 전  JSONResponse + jsonable_encoder : {len(before) / 1024:9.1f} KB  {before_ms:8.1f} ms")
+    print(f"  변경 후  FastJSONResponse               : {len(after) / 1024:9.1f} KB  {after_ms:8.1f} ms")
+    print(f"           + gzip (level 6)               : {len(gzipped) / 1024:9.1f} KB  {gzip_ms:8.1f} ms")
+    if brotli is not None:
+        br_ms, br = timed(lambda: brotli.compress(after, quality=4), repeat)
+        print(f"           + br (quality 4)               : {len(br) / 1024:9.1f} KB  {br_ms:8.1f} ms")
+    print(f"  파일 저장 indent=2 → 공백 없음           : {indent_size / 1024:9.1f} KB → {len(after) / 1024:.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 응답 크기 / 직렬화 시간 벤치마크")
+    parser.add_argument("--rules", type=int, default=40000)
+    parser.add_argument("--alerts", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"orjson: {'사용' if orjson is not None else '없음 (json.dumps)'}, brotli: {'사용' if brotli else '없음'}")
+    rules = make_rules(args.rules)
+    alerts = make_alerts(args.alerts)
+    report(f"/api/rules/active ({args.rules:,} rules)", {"rules": rules, "total": len(rules)}, args.repeat)
+    report(f"/api/logs/suricata ({args.alerts:,} alerts)", {"count": len(alerts), "logs": alerts}, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,18 @@ FastAPI Backend - 실제 데이터 버전
 MCP 서버가 저장한 data/alerts.json, data/rules.json 읽기
 """
 
-from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 from typing import Optional, Dict
+import hashlib
+import hmac
 import json
+import os
 import re
+import time
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from collections import Counter
@@ -18,19 +25,53 @@ from collections import Counter
 import uvicorn  # (if __name__ == "__main__" 에서 사용할 것이므로)
 import asyncio  # 실시간 감시(tail)를 위해
 from typing import List, Set # Set을 추가
+import sys
+
+from rule_perf import load_rule_perf, load_latest_stats, build_perf_report
+
+# (선택) orjson: 큰 JSON 응답 직렬화 가속 / brotli-asgi: br 압축 (없으면 gzip 만)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+# MCP 서버와 공유하는 eve.json 처리 모듈
+sys.path.append(str(Path(__file__).resolve().parent.parent / "mcp_server"))
+from eve_watch import create_watcher
+from alert_store import AlertStore, normalize_alert, to_epoch
+from sensors import expand_sources
+from eve_scan import iter_lines_since
+from eve_archive import open_eve
+from eve_reader import ChunkedLineReader
+from alert_aggregator import AlertAggregator
+from sketches import HyperLogLog, WindowedDistinct, WindowedTopK, distinct_counts, top_k
+from firewall import FirewallBackend, FirewallError, ProtectedNetworks, create_backend, normalize_ip
+from blocklist import BlockList
+
+class FastJSONResponse(JSONResponse):
+    """orjson 이 있으면 orjson 으로, 없으면 공백 없는 json.dumps 로 직렬화"""
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
 
 app = FastAPI(
     title="Suricata Monitoring API",
     description="실시간 Suricata 로그 API",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # --- WebSocket 연결 관리 ---
 # 현재 연결된 모든 클라이언트(대시보드)를 저장할 집합(Set)
 connected_clients: Set[WebSocket] = set()
-
-# 파일의 마지막으로 읽은 위치를 저장 (서버가 켜져 있는 동안)
-last_file_position = 0
+# ?raw=1 로 연결한 클라이언트: 집계 없이 모든 알림을 그대로 받음
+raw_clients: Set[WebSocket] = set()
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,63 +81,167 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (작은 응답은 압축 비용이 더 크므로 COMPRESS_MIN_BYTES 이상만)
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", "1024"))
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESS_MIN_BYTES, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_BYTES, compresslevel=6)
+
 # 데이터 파일 경로
 ALERTS_FILE = Path("/var/log/suricata/eve.json")
 RULES_FILE = Path("/etc/suricata/rules/suricata.rules")
+RULE_PERF_FILE = Path("/var/log/suricata/rule_perf.log")
+ALERT_STORE_FILE = Path("data/alerts.db")  # bulk_import.py 로 가져온 과거 알림
+
+# 다중 센서: 쉼표로 구분한 경로 / glob (예: EVE_SOURCES="/data/sensors/*/eve.json")
+EVE_SOURCES = [p.strip() for p in os.environ.get("EVE_SOURCES", str(ALERTS_FILE)).split(",") if p.strip()]
+SOURCE_RESCAN_INTERVAL = 30
+# 같은 (sensor, sid, src_ip, dest_ip, dest_port) 알림을 합쳐 보내는 창 (초, 0 = 집계 안 함)
+ALERT_AGGREGATION_WINDOW = float(os.environ.get("ALERT_AGGREGATION_WINDOW", "60"))
+# 상위 위협 (heavy hitter): 센서별로 수집 시 갱신, 조회는 창마다 캐시된 요약 병합만
+TOP_K_FIELDS = ("src_ip", "signature", "dest_port", "category")
+TOP_K_WINDOWS = (3600, 6 * 3600, 24 * 3600)
+# 고유 개수 (HyperLogLog): 1시간 버킷, 보존 기간 안의 임의 창 (시간 단위)
+DISTINCT_NAMES = ("src_ip", "dest_ip", "src_sid")
+DISTINCT_RETENTION_HOURS = int(os.environ.get("DISTINCT_RETENTION_HOURS", str(7 * 24)))
+# 시간 창(최근 N시간) 통계의 ETag 유효 단위 (초) — 새 알림이 없어도 창이 밀리면 값이 바뀌므로
+ETAG_TIME_BUCKET = 60
+# IP 차단 백엔드: ipset / nftables / fake / auto (설치된 nft → ipset, 없으면 기록만 하는 fake)
+FIREWALL_BACKEND = os.environ.get("FIREWALL_BACKEND", "auto")
+FIREWALL_USE_SUDO = os.environ.get("FIREWALL_USE_SUDO", "1") not in ("0", "false")
+# 차단 / 해제 액션은 ACTION_API_TOKEN 을 설정했을 때만 사용 가능 (X-API-Token 헤더로 전달, 미설정 시 403)
+ACTION_API_TOKEN = os.environ.get("ACTION_API_TOKEN", "")
+# 차단하지 않을 대역 (쉼표 구분 CIDR), 루프백 / 이 호스트 / 게이트웨이 주소는 항상 보호
+FIREWALL_PROTECTED = [n.strip() for n in os.environ.get("FIREWALL_PROTECTED", "").split(",") if n.strip()]
+BLOCK_LOG_FILE = Path("logs/actions/blocks.log")
+# 차단 목록 저장소 (MCP 자동 차단과 공유), 방화벽 집합과 맞추는 주기 (초)
+BLOCKLIST_FILE = Path("data/blocklist.db")
+BLOCKLIST_RECONCILE_INTERVAL = int(os.environ.get("BLOCKLIST_RECONCILE_INTERVAL", "300"))
+
+_alert_store: Optional[AlertStore] = None
+_sources: list[tuple[Path, str]] = []
+_source_names: set[str] = set()
+_source_paths: set[Path] = set()
+_threat_trackers: Dict[str, WindowedTopK] = {}
+_distinct_trackers: Dict[str, WindowedDistinct] = {}
+_firewall: Optional[FirewallBackend] = None
+_protected: Optional[ProtectedNetworks] = None
+_blocklist: Optional[BlockList] = None
 
 # ================== 데이터 로드 함수 ==================
 
-def load_alerts() -> list[dict]:
-    """알림 데이터 로드 (JSONL 형식 .json 파일 파서로 변경 및 데이터 평탄화)"""
+def get_alert_store() -> Optional[AlertStore]:
+    """과거 알림 저장소 (가져온 적이 없으면 None)"""
+    global _alert_store
+    if _alert_store is None and ALERT_STORE_FILE.exists():
+        _alert_store = AlertStore(ALERT_STORE_FILE)
+    return _alert_store
+
+def get_firewall() -> FirewallBackend:
+    global _firewall
+    if _firewall is None:
+        _firewall = create_backend(FIREWALL_BACKEND, use_sudo=FIREWALL_USE_SUDO)
+    return _firewall
+
+def get_protected() -> ProtectedNetworks:
+    global _protected
+    if _protected is None:
+        _protected = ProtectedNetworks(FIREWALL_PROTECTED)
+    return _protected
+
+def get_blocklist() -> BlockList:
+    global _blocklist
+    if _blocklist is None:
+        _blocklist = BlockList(BLOCKLIST_FILE)
+    return _blocklist
+
+def log_block_action(action: str, entries: list[dict]):
+    """차단 / 해제 기록 (logs/actions/blocks.log, 한 줄에 JSON 하나)"""
+    BLOCK_LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    now = datetime.now().isoformat()
+    with open(BLOCK_LOG_FILE, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps({"timestamp": now, "action": action, **entry}, ensure_ascii=False) + "\n")
+
+def get_sources() -> list[tuple[Path, str]]:
+    """(eve.json 경로, 센서 이름) 목록 — glob 은 호출마다 재검색해 새 센서 추가"""
+    for path, sensor in expand_sources(EVE_SOURCES, _source_names, _source_paths):
+        _sources.append((path, sensor))
+    return _sources
+
+def read_eve_alerts(path: Path, sensor: str, since: Optional[float] = None) -> list[dict]:
+    """eve.json 한 개에서 알림만 평탄화해 읽기 (sensor 태그 포함, since 지정 시 mmap 으로 해당 구간만)"""
     alerts_list = []
     try:
-        if ALERTS_FILE.exists():
-            with open(ALERTS_FILE, "r") as f:
+        if path.exists() and since is not None:
+            for line in iter_lines_since(path, since):
+                if b'"alert"' not in line:
+                    continue
+                try:
+                    alert = normalize_alert(json.loads(line), sensor)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if alert:
+                    alerts_list.append(alert)
+        elif path.exists():
+            # 회전 후 압축된 아카이브(.gz / .zst)도 스트리밍 해제해 읽음
+            with open_eve(path) as f:
                 for line in f:
                     line = line.strip()
                     if not line:
                         continue
                     
                     try:
-                        # 각 줄을 개별 JSON으로 파싱
-                        event_data = json.loads(line)
-                        
-                        # 'alert' 타입만 필터링
-                        if event_data.get("event_type") == "alert":
-                            
-                            alert_details = event_data.get('alert')
-                            if not alert_details:
-                                continue # alert 객체가 없는 경우 건너뛰기
-
-                            # (중요) 데이터를 평탄화(Flatten)하여 API의 다른 부분이 사용하기 쉽게 만듦
-                            alerts_list.append({
-                                "timestamp": event_data.get("timestamp"),
-                                "src_ip": event_data.get("src_ip"),
-                                "dest_ip": event_data.get("dest_ip"),
-                                "src_port": event_data.get("src_port"),
-                                "dest_port": event_data.get("dest_port"),
-                                "proto": event_data.get("proto"),
-                                
-                                # 'alert' 하위 객체에서 정보 추출
-                                "signature": alert_details.get("signature"),
-                                "severity": alert_details.get("severity"), # 1, 2, 3 등
-                                "category": alert_details.get("category"),
-                                
-                                # (선택) 원본 룰 SID
-                                "gid": alert_details.get("gid"),
-                                "sid": alert_details.get("signature_id") 
-                            })
-
-                    except json.JSONDecodeError as json_err:
+                        # 각 줄을 개별 JSON으로 파싱 후 'alert' 타입만 평탄화
+                        alert = normalize_alert(json.loads(line), sensor)
+                        if alert:
+                            alerts_list.append(alert)
+
+                    except (json.JSONDecodeError, UnicodeDecodeError) as json_err:
                         # 파일의 특정 줄 파싱 실패 (무시하고 계속)
                         print(f"[API] ⚠️ 알림 JSONL 파싱 에러: {json_err} | 라인: {line[:100]}...")
         else:
-             print(f"[API] ❌ 알림 파일 없음: {ALERTS_FILE}")
+             print(f"[API] ❌ 알림 파일 없음: {path}")
              
     except Exception as e:
         print(f"[API] ❌ 알림 파일 읽기 실패: {e}")
     
-    # data.get("alerts", []) 대신 파싱한 리스트를 직접 반환
+    return alerts_list
+
+def load_alerts(sensor: Optional[str] = None, since: Optional[float] = None) -> list[dict]:
+    """
+    알림 데이터 로드 (모든 센서의 eve.json + 과거 알림 저장소, sensor 지정 시 해당 센서만)
+    since(epoch) 지정 시 eve.json 은 해당 시점 이후 구간만 읽고, 저장소 조회에도 반영
+    """
+    alerts_list = []
+    store = get_alert_store()
+    live_sensors = set()
+    
+    for path, name in get_sources():
+        if sensor and name != sensor:
+            continue
+        live_sensors.add(name)
+        live = read_eve_alerts(path, name, since)
+        
+        # 현재 eve.json 보다 이전 구간만 저장소에서 가져와 앞에 붙임 (현재 파일을 가져왔어도 중복 없음)
+        if store:
+            try:
+                first_live = to_epoch(live[0]["timestamp"]) if live else None
+                alerts_list.extend(store.query(since=since, until=first_live, sensor=name))
+            except Exception as e:
+                print(f"[API] ❌ 알림 저장소 조회 실패: {e}")
+        alerts_list.extend(live)
+    
+    # 현재 tail 중이 아닌 센서(아카이브만 가져온 센서)의 과거 알림
+    if store:
+        try:
+            for name in store.sensors():
+                if name not in live_sensors and (not sensor or name == sensor):
+                    alerts_list.extend(store.query(since=since, sensor=name))
+        except Exception as e:
+            print(f"[API] ❌ 알림 저장소 조회 실패: {e}")
+    
     return alerts_list
 
 def parse_rule_metadata(metadata_str: str) -> dict:
@@ -115,16 +260,51 @@ def parse_rule_metadata(metadata_str: str) -> dict:
         print(f"[API] ⚠️ 메타데이터 파싱 에러: {e} | on: {metadata_str[:50]}...")
     return meta_dict
 
+# 룰 파일 파싱 결과 캐시 (파일이 바뀔 때만 다시 파싱, 요약도 그때 한 번만 계산)
+_rules_cache: dict = {"version": None, "rules": [], "summary": None}
+
+# MCP 서버가 메인 룰 파일에 룰을 추가할 때 붙이는 주석 / LLM 룰 sid 범위
+GENERATED_MARKER = "# Auto-generated:"
+GENERATED_SID_RANGE = range(9000000, 10000000)
+
+def rules_version() -> Optional[tuple]:
+    """룰 파일 버전 (inode, 크기, mtime) — 파일이 없으면 None"""
+    try:
+        stat = RULES_FILE.stat()
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+def rule_origin(sid: str, after_marker: bool) -> str:
+    """MCP 가 생성한 룰이면 'generated', 아니면 'upstream'"""
+    if after_marker:
+        return "generated"
+    return "generated" if sid.isdigit() and int(sid) in GENERATED_SID_RANGE else "upstream"
+
 def load_rules() -> list[dict]:
-    """생성된 룰 로드 (JSON이 아닌 .rules 텍스트 파일 파서로 변경)"""
+    """룰 로드 (.rules 텍스트 파일 파서, 파일이 그대로면 캐시된 목록 반환 — 수정하지 말 것)"""
+    version = rules_version()
+    if version is not None and version == _rules_cache["version"]:
+        return _rules_cache["rules"]
+    rules_list = parse_rules_file()
+    _rules_cache.update(version=version, rules=rules_list, summary=None)
+    return rules_list
+
+def parse_rules_file() -> list[dict]:
+    """룰 파일 전체 파싱 (JSON이 아닌 .rules 텍스트 파일 파서로 변경)"""
     rules_list = []
     try:
         if RULES_FILE.exists():
             with open(RULES_FILE, "r") as f:
+                after_marker = False
                 for i, line in enumerate(f):
                     line = line.strip()
-                    # 주석(#)이나 빈 줄 건너뛰기
-                    if not line or line.startswith('#'):
+                    # 주석(#)이나 빈 줄 건너뛰기 (자동 생성 표시 주석은 다음 룰에 적용)
+                    if not line:
+                        continue
+                    if line.startswith('#'):
+                        if line.startswith(GENERATED_MARKER):
+                            after_marker = True
                         continue
                     
                     try:
@@ -139,19 +319,22 @@ def load_rules() -> list[dict]:
                         
                         # 메타데이터 파싱
                         metadata = parse_rule_metadata(metadata_str)
+                        sid = metadata.get("sid", f"no-sid-{i}")
                         
                         rules_list.append({
-                            "sid": metadata.get("sid", f"no-sid-{i}"),
+                            "sid": sid,
                             "action": action.lower(), # 'alert', 'drop' 등
                             "message": metadata.get("msg", "N/A"),
                             "category": metadata.get("classtype", "N/A"),
                             "file": "suricata.rules", # 파일명
+                            "origin": rule_origin(sid, after_marker), # generated / upstream
                             "rule": line, # 전체 룰 텍스트
                             # (선택) 타임스탬프 정보가 있다면 추가
                             "timestamp": metadata.get("updated_at", metadata.get("created_at", "")) 
                         })
                     except Exception as e:
                         print(f"[API] ⚠️ 룰 파싱 중 에러: {e} | 라인: {line[:50]}...")
+                    after_marker = False
         else:
             print(f"[API] ❌ 룰 파일 없음: {RULES_FILE}")
             
@@ -160,6 +343,109 @@ def load_rules() -> list[dict]:
     
     return rules_list
 
+def rules_summary() -> dict:
+    """action / 파일 / classtype / origin 별 룰 개수 (룰 파일 버전마다 한 번만 계산)"""
+    rules = load_rules()
+    summary = _rules_cache["summary"]
+    if summary is None:
+        summary = {
+            "total": len(rules),
+            "by_action": dict(Counter(r["action"] for r in rules)),
+            "by_file": dict(Counter(r["file"] for r in rules)),
+            "by_classtype": dict(Counter(r["category"] for r in rules).most_common()),
+            "by_origin": dict(Counter(r["origin"] for r in rules)),
+            "computed_at": datetime.now().isoformat(),
+        }
+        _rules_cache["summary"] = summary
+    return summary
+
+class AlertSummaries:
+    """센서 하나의 스트리밍 요약 (상위 위협 + 고유 개수), 알림마다 add()"""
+
+    def __init__(self):
+        self.threats = WindowedTopK(TOP_K_FIELDS, TOP_K_WINDOWS)
+        self.distinct = WindowedDistinct(DISTINCT_NAMES, retention=DISTINCT_RETENTION_HOURS * 3600)
+
+    def add(self, alert: dict):
+        epoch = to_epoch(alert["timestamp"])
+        self.threats.add(alert, epoch)
+        src_ip = alert.get("src_ip")
+        self.distinct.add({
+            "src_ip": src_ip,
+            "dest_ip": alert.get("dest_ip"),
+            "src_sid": f"{src_ip}|{alert.get('sid')}" if src_ip else None,
+        }, epoch)
+
+def backfill_summaries(path: Path, sensor: str, end: int) -> AlertSummaries:
+    """tail 시작 전 보존 기간 안의 알림으로 요약 채우기 (end offset 까지, 이후는 tail 이 갱신)"""
+    summaries = AlertSummaries()
+    since = time.time() - max(TOP_K_WINDOWS[-1], DISTINCT_RETENTION_HOURS * 3600)
+    try:
+        if path.exists():
+            for line in iter_lines_since(path, since, end=end):
+                if b'"alert"' not in line:
+                    continue
+                try:
+                    alert = normalize_alert(json.loads(line), sensor)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if alert:
+                    summaries.add(alert)
+    except Exception as e:
+        print(f"[API] ❌ 알림 요약 초기 집계 실패 ({sensor}): {e}")
+    return summaries
+
+def alerts_version() -> tuple:
+    """알림 데이터 high-water mark: 소스별 (inode, 크기) + 알림 저장소 파일 (크기, mtime)"""
+    parts = []
+    for path, sensor in get_sources():
+        try:
+            stat = path.stat()
+            parts.append((sensor, stat.st_ino, stat.st_size))
+        except OSError:
+            parts.append((sensor, None, None))
+    for path in (ALERT_STORE_FILE, ALERT_STORE_FILE.with_name(ALERT_STORE_FILE.name + "-wal")):
+        try:
+            stat = path.stat()
+            parts.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            pass
+    return tuple(parts)
+
+# If-None-Match 의 entity-tag 하나 ("..." / W/"..." / *)
+_ENTITY_TAG_RE = re.compile(r'\s*(\*|(?:W/)?"[^"]*")\s*(?:,|$)')
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 목록에 etag 가 있는지 (약한 비교: W/ 무시, * 는 모두 일치)"""
+    if not if_none_match:
+        return False
+    for tag in _ENTITY_TAG_RE.findall(if_none_match):
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def not_modified(request: Request, response: Response, *version) -> Optional[Response]:
+    """
+    version 으로 ETag 를 만들어 응답 헤더에 설정
+    If-None-Match 가 같으면 본문 계산 없이 바로 반환할 304 응답, 아니면 None
+    """
+    etag = '"' + hashlib.blake2b(repr(version).encode(), digest_size=8).hexdigest() + '"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+def json_response(content, response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    큰 응답용: jsonable_encoder 를 거치지 않고 바로 직렬화 (content 는 JSON 기본 타입만)
+    response 에 설정한 ETag / Cache-Control 은 유지
+    """
+    headers = {}
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k in ("etag", "cache-control")}
+    return FastJSONResponse(content, headers=headers)
+
 # ================== API 엔드포인트 ==================
 
 @app.get("/")
@@ -177,9 +463,16 @@ async def root():
     }
 
 @app.get("/api/stats/overview")
-async def get_stats_overview():
-    """전체 통계"""
-    alerts = load_alerts()
+async def get_stats_overview(request: Request, response: Response, sensor: Optional[str] = None):
+    """전체 통계 (sensor 지정 시 해당 센서만)"""
+    cached = not_modified(request, response, "overview", sensor, alerts_version(), rules_version(),
+                          int(time.time() // ETAG_TIME_BUCKET))
+    if cached:
+        return cached
+    
+    # (수정) 현재 시간을 UTC(시간대 정보 포함) 기준으로 변경
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
+    alerts = load_alerts(sensor, since=cutoff.timestamp())
     
     if not alerts:
         return {
@@ -195,8 +488,6 @@ async def get_stats_overview():
             }
         }
     
-    # (수정) 현재 시간을 UTC(시간대 정보 포함) 기준으로 변경
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
     recent_alerts = []
     
     for a in alerts:
@@ -215,6 +506,9 @@ async def get_stats_overview():
         "total_alerts_24h": len(recent_alerts),
         "total_attacks_24h": len(recent_alerts),
         "critical_alerts_24h": by_severity.get(1, 0),
+        "unique_src_ips_24h": distinct_counts(
+            [t for name, t in _distinct_trackers.items() if sensor is None or name == sensor], 24 * 3600
+        ).get("src_ip", 0),
         "detection_rate": 100,
         "active_rules_count": len(load_rules()),
         "severity_distribution": {
@@ -226,12 +520,17 @@ async def get_stats_overview():
     }
 
 @app.get("/api/stats/timeline")
-async def get_stats_timeline(hours: int = 24):
+async def get_stats_timeline(request: Request, response: Response, hours: int = 24, sensor: Optional[str] = None):
     """시간대별 타임라인"""
-    alerts = load_alerts()
+    cached = not_modified(request, response, "timeline", hours, sensor, alerts_version(),
+                          int(time.time() // ETAG_TIME_BUCKET))
+    if cached:
+        return cached
     
     # (수정) 현재 시간을 UTC(시간대 정보 포함) 기준으로 변경
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    alerts = load_alerts(sensor, since=cutoff.timestamp())
+    
     recent_alerts = []
 
     for a in alerts:
@@ -253,10 +552,82 @@ async def get_stats_timeline(hours: int = 24):
     
     return {"timeline": timeline_list}
 
+@app.get("/api/stats/top-threats")
+async def get_top_threats(limit: int = Query(10, ge=1, le=100), hours: int = 24, sensor: Optional[str] = None):
+    """상위 위협 (src_ip / signature / dest_port / category), 1 / 6 / 24시간 중 hours 이상인 가장 작은 창"""
+    trackers = [t for name, t in _threat_trackers.items() if sensor is None or name == sensor]
+    window = next((w for w in TOP_K_WINDOWS if w >= hours * 3600), TOP_K_WINDOWS[-1])
+    top = top_k(trackers, window, limit)
+    
+    def rows(field: str, name: str) -> list[dict]:
+        # count 는 근사치 (과대 추정), count - error 가 실제 빈도의 하한
+        return [{name: item, "count": count, "error": error} for item, count, error in top.get(field, [])]
+    
+    threats = rows("src_ip", "ip")
+    return {
+        "window_hours": window // 3600,
+        "threats": threats,
+        "count": len(threats),
+        "signatures": rows("signature", "signature"),
+        "dest_ports": rows("dest_port", "port"),
+        "categories": rows("category", "category"),
+    }
+
+@app.get("/api/stats/distinct")
+async def get_stats_distinct(hours: int = Query(24, ge=1), sensor: Optional[str] = None):
+    """최근 hours 시간의 고유 src_ip / dest_ip / (src_ip, sid) 개수 (HyperLogLog 근사, 센서 합산 가능)"""
+    hours = min(hours, DISTINCT_RETENTION_HOURS)
+    trackers = [t for name, t in _distinct_trackers.items() if sensor is None or name == sensor]
+    counts = distinct_counts(trackers, hours * 3600)
+    return {
+        "window_hours": hours,
+        "unique_src_ips": counts.get("src_ip", 0),
+        "unique_dest_ips": counts.get("dest_ip", 0),
+        "unique_src_sid_pairs": counts.get("src_sid", 0),
+        "error_rate": round(HyperLogLog().error_rate, 4),
+    }
+
+@app.get("/api/stats/sensors")
+async def get_stats_sensors(request: Request, response: Response, hours: int = Query(24, ge=1)):
+    """최근 hours 시간의 센서별 알림 수 / 심각도 분포 (since 로 해당 구간만 읽어 한 번의 순회로 집계)"""
+    cached = not_modified(request, response, "sensors", hours, alerts_version(),
+                          int(time.time() // ETAG_TIME_BUCKET))
+    if cached:
+        return cached
+    
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    sensors: Dict[str, dict] = {
+        name: {"sensor": name, "path": str(path), "total": 0, "severity": Counter()}
+        for path, name in get_sources()
+    }
+    
+    for a in load_alerts(since=cutoff.timestamp()):
+        try:
+            if datetime.fromisoformat(a['timestamp']) <= cutoff:
+                continue
+        except (ValueError, TypeError):
+            continue
+        name = a.get("sensor") or "unknown"
+        entry = sensors.setdefault(name, {"sensor": name, "path": None, "total": 0, "severity": Counter()})
+        entry["total"] += 1
+        entry["severity"][a.get("severity")] += 1
+    
+    return {
+        "hours": hours,
+        "sensors": [
+            {**entry, "severity": {
+                "critical": entry["severity"].get(1, 0),
+                "high": entry["severity"].get(2, 0),
+                "medium": entry["severity"].get(3, 0),
+            }}
+            for entry in sorted(sensors.values(), key=lambda e: e["total"], reverse=True)
+        ],
+    }
+
 @app.get("/api/logs/suricata")
-async def get_suricata_logs(count: int = 50, severity: Optional[str] = None):
+async def get_suricata_logs(count: int = 50, severity: Optional[str] = None, sensor: Optional[str] = None):
     """Suricata 로그 조회"""
-    alerts = load_alerts()
+    alerts = load_alerts(sensor)
     
     # 최신순 정렬
     alerts_sorted = sorted(alerts, key=lambda x: x['timestamp'], reverse=True)
@@ -268,12 +639,12 @@ async def get_suricata_logs(count: int = 50, severity: Optional[str] = None):
         if sev_num:
             logs = [log for log in logs if log['severity'] == sev_num]
     
-    return {"count": len(logs), "logs": logs}
+    return json_response({"count": len(logs), "logs": logs})
 
 @app.get("/api/logs/search")
-async def search_logs(query: str):
+async def search_logs(query: str, sensor: Optional[str] = None):
     """로그 검색"""
-    alerts = load_alerts()
+    alerts = load_alerts(sensor)
     query_lower = query.lower()
     results = []
     
@@ -287,11 +658,14 @@ async def search_logs(query: str):
     # 최신순 정렬
     results_sorted = sorted(results, key=lambda x: x['timestamp'], reverse=True)
     
-    return {"query": query, "count": len(results_sorted), "results": results_sorted[:50]}
+    return json_response({"query": query, "count": len(results_sorted), "results": results_sorted[:50]})
 
 @app.get("/api/rules/active")
-async def get_active_rules(category: str = "all"):
+async def get_active_rules(request: Request, response: Response, category: str = "all"):
     """활성 룰 조회 (실제 파싱된 룰 사용)"""
+    cached = not_modified(request, response, "rules", category, rules_version())
+    if cached:
+        return cached
     
     all_rules = load_rules() # <--- 실제 파싱된 룰을 가져옴
 
@@ -300,7 +674,34 @@ async def get_active_rules(category: str = "all"):
         all_rules = [r for r in all_rules if r.get('category') == category]
     
     # 프론트엔드가 total 값을 사용할 수 있도록 total도 함께 반환
-    return {"rules": all_rules, "total": len(all_rules)}
+    return json_response({"rules": all_rules, "total": len(all_rules)}, response)
+
+@app.get("/api/rules/summary")
+async def get_rules_summary(request: Request, response: Response):
+    """룰 개수 요약 (전체 룰 목록 대신 대시보드 통계 카드용)"""
+    cached = not_modified(request, response, "rules-summary", rules_version())
+    if cached:
+        return cached
+    return rules_summary()
+
+@app.get("/api/rules/perf")
+async def get_rules_perf(
+    sort: str = "ticks_total",
+    limit: int = Query(50, ge=1, le=1000),
+    threshold: float = Query(100000.0, ge=0),
+):
+    """룰 성능 순위 (rule_perf.log + eve.json stats, sid 기준 조인)"""
+    perf = load_rule_perf(RULE_PERF_FILE)
+    if not perf:
+        return {
+            "error": f"룰 프로파일 데이터 없음: {RULE_PERF_FILE}",
+            "hint": "suricata.yaml 의 profiling.rules (enabled: yes, json: yes) 설정 필요",
+            "rules": [],
+            "flagged": []
+        }
+    
+    stats = load_latest_stats(ALERTS_FILE)
+    return build_perf_report(perf, load_rules(), stats, sort=sort, limit=limit, cost_threshold=threshold)
 
 @app.get("/api/rules/search")
 async def search_rules(query: str):
@@ -327,6 +728,112 @@ async def search_rules(query: str):
     
     return {"query": query, "count": len(results), "results": results}
 
+# ================== 액션 ==================
+
+class BlockIPRequest(BaseModel):
+    ip: str
+    reason: str = "Security threat"
+    duration: int = Field(0, ge=0)  # 초, 0 = 영구
+
+class BlockIPsRequest(BaseModel):
+    ips: List[str]
+    reason: str = "Security threat"
+    duration: int = Field(0, ge=0)
+
+class UnblockIPRequest(BaseModel):
+    ip: str
+
+def require_action_token(x_api_token: Optional[str] = Header(None)):
+    """차단 / 해제 액션 인증 (ACTION_API_TOKEN 미설정이면 액션 비활성)"""
+    if not ACTION_API_TOKEN:
+        raise HTTPException(status_code=403, detail="차단 액션이 비활성화되어 있습니다 (ACTION_API_TOKEN 미설정)")
+    if not x_api_token or not hmac.compare_digest(x_api_token, ACTION_API_TOKEN):
+        raise HTTPException(status_code=401, detail="잘못된 API 토큰")
+
+def validate_ips(ips: List[str], check_protected: bool = True) -> List[str]:
+    try:
+        ips = list(dict.fromkeys(normalize_ip(ip) for ip in ips))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"잘못된 IP 주소: {e}")
+    if check_protected:
+        protected = get_protected()
+        for ip in ips:
+            reason = protected.reason(ip)
+            if reason:
+                raise HTTPException(status_code=400, detail=f"{ip} 차단 거부: {reason}")
+    return ips
+
+async def apply_blocks(ips: List[str], reason: str, duration: int) -> dict:
+    """
+    ips 를 차단 목록에 먼저 저장한 뒤 방화벽 집합에 한 트랜잭션으로 추가
+    (그 사이 동기화가 돌아도 IP 가 지워지지 않도록), 방화벽 적용이 실패하면 저장 내용을 되돌림
+    """
+    firewall = get_firewall()
+    blocklist = get_blocklist()
+    entries = [(ip, duration) for ip in ips]
+    previous = [entry for entry in map(blocklist.get, ips) if entry]
+    blocklist.add(entries, reason, source="manual")
+    try:
+        await asyncio.to_thread(firewall.add, entries)
+    except FirewallError as e:
+        blocklist.remove(ips)
+        blocklist.restore(previous)
+        raise HTTPException(status_code=500, detail=str(e))
+    log_block_action("BLOCK", [{"ip": ip, "reason": reason, "duration": duration} for ip in ips])
+    return {"backend": firewall.name, "dry_run": firewall.dry_run, "duration": duration}
+
+@app.post("/api/action/block-ip", dependencies=[Depends(require_action_token)])
+async def block_ip(request: BlockIPRequest):
+    """IP 차단 (duration 초 뒤 자동 해제, 0 = 영구)"""
+    ip, = validate_ips([request.ip])
+    result = await apply_blocks([ip], request.reason, request.duration)
+    return {"success": True, "message": f"IP {ip} blocked successfully", "ip": ip, **result}
+
+@app.post("/api/action/block-ips", dependencies=[Depends(require_action_token)])
+async def block_ips(request: BlockIPsRequest):
+    """여러 IP 를 한 번에 차단 (ipset restore / nft -f 1회)"""
+    ips = validate_ips(request.ips)
+    result = await apply_blocks(ips, request.reason, request.duration)
+    return {"success": True, "message": f"{len(ips)} IPs blocked successfully", "ips": ips, **result}
+
+@app.post("/api/action/unblock-ip", dependencies=[Depends(require_action_token)])
+async def unblock_ip(request: UnblockIPRequest):
+    """IP 차단 해제"""
+    ip, = validate_ips([request.ip], check_protected=False)
+    # 차단 목록에서 먼저 제거 (그 사이 동기화가 IP 를 다시 추가하지 않도록), 실패하면 되돌림
+    blocklist = get_blocklist()
+    removed = blocklist.remove([ip])
+    try:
+        await asyncio.to_thread(get_firewall().remove, [ip])
+    except FirewallError as e:
+        blocklist.restore(removed)
+        raise HTTPException(status_code=500, detail=str(e))
+    log_block_action("UNBLOCK", [{"ip": ip}])
+    return {"success": True, "message": f"IP {ip} unblocked successfully", "ip": ip}
+
+@app.get("/api/blocked-ips")
+async def get_blocked_ips():
+    """차단된 IP 목록 (차단 목록 저장소의 메모리 캐시, 방화벽 명령 실행 없음)"""
+    blocklist = get_blocklist()
+    entries = blocklist.active()
+    return {
+        "blocked_ips": [e["ip"] for e in entries],
+        "count": len(entries),
+        "entries": entries,
+        "last_reconcile": blocklist.last_reconcile,
+    }
+
+async def reconcile_blocklist():
+    """주기적으로 만료 항목 정리 + 방화벽 집합을 차단 목록에 맞춤 (재부팅 / 수동 변경 복구)"""
+    while True:
+        try:
+            result = await asyncio.to_thread(get_blocklist().reconcile, get_firewall())
+            if result["added"] or result["removed"]:
+                print(f"[API] 🛡 차단 목록 동기화: +{result['added']} / -{result['removed']} ({result['backend']})")
+        except FirewallError as e:
+            print(f"[API] ❌ 차단 목록 동기화 실패: {e}")
+        await asyncio.sleep(BLOCKLIST_RECONCILE_INTERVAL)
+
 @app.get("/api/health")
 async def health_check():
     alerts = load_alerts()
@@ -350,108 +857,151 @@ async def websocket_endpoint(websocket: WebSocket):
     대시보드(클라이언트)가 이 엔드포인트로 WebSocket 연결을 시도합니다.
     """
     await websocket.accept()
-    connected_clients.add(websocket) # 새 클라이언트를 집합에 추가
-    print(f"[API]  WebSocket 클라이언트 연결됨. (총 {len(connected_clients)} 명)")
+    # ?raw=1 이면 집계하지 않은 원본 알림 스트림
+    clients = raw_clients if websocket.query_params.get("raw") in ("1", "true") else connected_clients
+    clients.add(websocket) # 새 클라이언트를 집합에 추가
+    print(f"[API]  WebSocket 클라이언트 연결됨. (총 {len(connected_clients) + len(raw_clients)} 명)")
     try:
         while True:
             # 클라이언트로부터 메시지를 받을 수도 있지만, 지금은 받기만 대기
             await websocket.receive_text()
     except WebSocketDisconnect:
         # 클라이언트 연결이 끊어지면 집합에서 제거
-        connected_clients.remove(websocket)
-        print(f"[API] WebSocket 클라이언트 연결 끊어짐. (남은 {len(connected_clients)} 명)")
+        clients.discard(websocket)
+        print(f"[API] WebSocket 클라이언트 연결 끊어짐. (남은 {len(connected_clients) + len(raw_clients)} 명)")
+
+async def broadcast(clients: Set[WebSocket], payload: dict):
+    """집합의 모든 클라이언트에게 전송 (실패한 클라이언트는 제거)"""
+    if not clients:
+        return
+    message = json.dumps(payload)
+    # 여러 클라이언트가 동시에 연결되어 있을 수 있으므로 리스트 복사 후 전송
+    for client in list(clients):
+        try:
+            await client.send_text(message)
+        except Exception:
+            # 전송 실패 시 (연결 끊김 등) 집합에서 제거
+            clients.discard(client)
 
 # --- 2. eve.json 파일을 실시간 감시(tail)하는 함수 ---
-async def tail_eve_json_file():
+async def tail_eve_json_file(path: Path, sensor: str):
     """
-    FastAPI 서버 시작 시 백그라운드에서 실행될 함수.
+    FastAPI 서버 시작 시 센서(eve.json)마다 백그라운드에서 실행될 함수.
     eve.json 파일의 변경 사항을 감지하여 새 알림을 WebSocket으로 PUSH합니다.
+    반복 알림은 집계 창 동안 처음 1건만 보내고, 창이 닫히면 count / first_seen / last_seen 을
+    담은 갱신 레코드("aggregated": true)를 1건 더 보냅니다.
+    파일은 열어 둔 채 읽고 (inode 로 회전 감지 → 이전 파일을 끝까지 읽은 뒤 새 파일을 처음부터),
+    쓰는 중인 미완성 줄은 다음 읽기까지 이어 붙입니다 (ChunkedLineReader).
     """
-    global last_file_position
-    print("[API] 🚀 실시간 알림 감시 시작 (tail_eve_json_file)")
+    print(f"[API] 🚀 실시간 알림 감시 시작 ({sensor}: {path})")
 
-    # 시작 시 파일의 현재 끝 위치 저장
+    # 시작 시 파일의 현재 끝에서부터 읽음
+    fd = None
+    inode = None
+    last_file_position = 0
     try:
-        if ALERTS_FILE.exists():
-            with open(ALERTS_FILE, "r") as f:
-                f.seek(0, 2) # 파일의 맨 끝으로 이동
-                last_file_position = f.tell() # 현재 위치(파일 크기) 저장
+        if path.exists():
+            fd = open(path, "rb")
+            inode = os.fstat(fd.fileno()).st_ino
+            last_file_position = fd.seek(0, 2)
     except Exception as e:
         print(f"[API] ❌ 초기 파일 위치 읽기 실패: {e}")
+    reader = ChunkedLineReader()
+
+    # inotify 로 파일이 바뀔 때만 깨어남 (사용 불가 시 1초 폴링)
+    watcher = create_watcher(path, poll_interval=1.0)
+    print(f"[API] 👀 감시 방식: {type(watcher).__name__}")
+    aggregator = AlertAggregator(ALERT_AGGREGATION_WINDOW)
+
+    # 상위 위협 / 고유 개수 요약: 현재 위치까지는 한 번에 채우고, 이후는 tail 에서 알림마다 갱신
+    summaries = await asyncio.to_thread(backfill_summaries, path, sensor, last_file_position)
+    _threat_trackers[sensor] = summaries.threats
+    _distinct_trackers[sensor] = summaries.distinct
+
+    async def read_new_lines(f):
+        """f 의 현재 위치부터 EOF 까지 완성된 줄만 처리"""
+        while True:
+            nbytes, lines = reader.read_chunk(f)
+            if not nbytes:
+                return
+            for line in lines:
+                try:
+                    # load_alerts에서 평탄화했던 데이터와 동일한 구조 ('alert' 타입만)
+                    alert_payload = normalize_alert(json.loads(line), sensor)
+                except json.JSONDecodeError:
+                    continue # 파싱 실패한 줄은 무시
+                if not alert_payload:
+                    continue
+
+                summaries.add(alert_payload)
+                await broadcast(raw_clients, alert_payload)
+
+                # (중요) 연결된 모든 클라이언트에게 새 알림 PUSH (같은 창의 반복 알림은 집계만)
+                record, is_new = aggregator.add(alert_payload)
+                if is_new:
+                    await broadcast(connected_clients, record)
 
     while True:
         try:
-            if ALERTS_FILE.exists():
-                with open(ALERTS_FILE, "r") as f:
-                    # 마지막으로 읽은 위치로 이동
-                    f.seek(last_file_position)
-                    new_lines = f.readlines()
-                    
-                    # 파일의 현재 끝 위치를 다음 루프를 위해 갱신
-                    last_file_position = f.tell()
-
-                for line in new_lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        event_data = json.loads(line)
-                        
-                        # (중요) 'alert' 타입만 필터링
-                        if event_data.get("event_type") == "alert":
-                            
-                            alert_details = event_data.get('alert')
-                            if not alert_details:
-                                continue
-
-                            # load_alerts에서 평탄화했던 데이터와 동일한 구조로 만듦
-                            alert_payload = {
-                                "timestamp": event_data.get("timestamp"),
-                                "src_ip": event_data.get("src_ip"),
-                                "dest_ip": event_data.get("dest_ip"),
-                                "src_port": event_data.get("src_port"),
-                                "dest_port": event_data.get("dest_port"),
-                                "proto": event_data.get("proto"),
-                                "signature": alert_details.get("signature"),
-                                "severity": alert_details.get("severity"),
-                                "category": alert_details.get("category"),
-                                "sid": alert_details.get("signature_id") 
-                            }
-                            
-                            # (중요) 연결된 모든 클라이언트에게 새 알림 PUSH
-                            # 여러 클라이언트가 동시에 연결되어 있을 수 있으므로 리스트 복사 후 전송
-                            clients_to_send = list(connected_clients) 
-                            for client in clients_to_send:
-                                try:
-                                    # JSON 문자열로 변환하여 전송
-                                    await client.send_text(json.dumps(alert_payload))
-                                except Exception:
-                                    # 전송 실패 시 (연결 끊김 등) 집합에서 제거
-                                    connected_clients.remove(client)
-                                    
-                    except json.JSONDecodeError:
-                        continue # 파싱 실패한 줄은 무시
+            try:
+                path_inode = path.stat().st_ino
+            except FileNotFoundError:
+                path_inode = None
+
+            if fd is not None and path_inode != inode:
+                # 회전 / 삭제: 열린 이전 파일의 남은 줄을 먼저 처리하고, 다음 파일은 처음부터
+                await read_new_lines(fd)
+                fd.close()
+                fd = None
+                reader.reset()
+
+            if fd is None and path_inode is not None:
+                fd = open(path, "rb")
+                inode = os.fstat(fd.fileno()).st_ino
+                watcher.rewatch()
+
+            if fd is not None:
+                # copytruncate 로 파일이 작아졌으면 처음부터 읽음
+                if os.fstat(fd.fileno()).st_size < fd.tell():
+                    fd.seek(0)
+                    reader.reset()
+                await read_new_lines(fd)
+
+            # 창이 닫힌 집계 레코드 중 반복된 것만 갱신 전송
+            for record in aggregator.expire():
+                if record["count"] > 1:
+                    await broadcast(connected_clients, {**record, "aggregated": True})
                         
         except Exception as e:
             print(f"[API] ❌ 파일 감시(tail) 중 에러: {e}")
         
-        # 1초마다 파일의 변경 사항을 다시 체크
-        await asyncio.sleep(1)
+        # 다음 변경 이벤트까지 대기
+        await watcher.wait()
+
+async def watch_sources():
+    """센서마다 tail 태스크 실행, glob 소스는 주기적으로 재검색해 새 센서 추가"""
+    started: set[str] = set()
+    while True:
+        for path, sensor in get_sources():
+            if sensor not in started:
+                started.add(sensor)
+                asyncio.create_task(tail_eve_json_file(path, sensor))
+        await asyncio.sleep(SOURCE_RESCAN_INTERVAL)
 
 # --- 3. FastAPI 시작 시 tail 함수를 백그라운드 작업으로 등록 ---
 @app.on_event("startup")
 async def on_startup():
     """
-    FastAPI 서버가 시작될 때 `tail_eve_json_file` 함수를 
+    FastAPI 서버가 시작될 때 센서별 `tail_eve_json_file` 함수를 
     백그라운드 태스크로 자동 실행합니다.
     """
-    asyncio.create_task(tail_eve_json_file())
+    asyncio.create_task(watch_sources())
+    asyncio.create_task(reconcile_blocklist())
 
 
 if __name__ == "__main__":
     import uvicorn
     print("🚀 FastAPI Backend (실제 데이터)")
-    print(f"📁 Alerts: {ALERTS_FILE}")
+    print(f"📁 Alerts: {', '.join(EVE_SOURCES)}")
     print(f"📁 Rules: {RULES_FILE}")
     uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+api/rule_perf.py
+Suricata 룰 성능 프로파일러
+- rule_perf.log (profiling.rules.json 출력) 파싱
+- eve.json 의 마지막 stats 이벤트 조회
+- 룰 인덱스와 sid 기준으로 조인하여 비용 순위 / LLM 생성 룰 경고 생성
+"""
+
+import json
+from pathlib import Path
+from typing import Optional
+
+# LLM 이 생성하도록 지시한 SID 범위 (suricata_server.OllamaClient 프롬프트 참고)
+LLM_SID_RANGE = (9000000, 9999999)
+
+SORT_KEYS = ("ticks_total", "ticks_avg", "ticks_max", "checks", "matches", "cost_per_match")
+
+
+def is_llm_sid(sid) -> bool:
+    try:
+        sid = int(sid)
+    except (TypeError, ValueError):
+        return False
+    return LLM_SID_RANGE[0] <= sid <= LLM_SID_RANGE[1]
+
+
+def load_rule_perf(path: Path) -> dict[int, dict]:
+    """
+    rule_perf.log 파싱 → {sid: 프로파일 항목}
+    Suricata 는 덤프마다 정렬 기준(ticks, avgticks, checks ...)별로 한 줄씩 기록하므로
+    가장 최신 timestamp 의 항목을 sid 기준으로 병합한다.
+    logrotate 직후에는 다음 덤프 전까지 새 파일이 없거나 비어 있으므로 회전된 파일(.1)을 대신 읽는다.
+    """
+    perf = _parse_rule_perf(path)
+    if not perf:
+        perf = _parse_rule_perf(path.with_name(path.name + ".1"))
+    return perf
+
+
+def _parse_rule_perf(path: Path) -> dict[int, dict]:
+    perf: dict[int, dict] = {}
+    latest: dict[int, str] = {}
+
+    if not path.exists():
+        return perf
+
+    with open(path, "r", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                dump = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            timestamp = dump.get("timestamp", "")
+            for entry in dump.get("rules", []) or []:
+                try:
+                    sid = int(entry.get("signature_id"))
+                except (TypeError, ValueError):
+                    continue
+                if sid in latest and latest[sid] > timestamp:
+                    continue
+                latest[sid] = timestamp
+                perf[sid] = {
+                    "sid": sid,
+                    "gid": entry.get("gid", 1),
+                    "rev": entry.get("rev", 0),
+                    "checks": int(entry.get("checks", 0) or 0),
+                    "matches": int(entry.get("matches", 0) or 0),
+                    "ticks_total": int(entry.get("ticks_total", 0) or 0),
+                    "ticks_max": int(entry.get("ticks_max", 0) or 0),
+                    "ticks_avg": int(entry.get("ticks_avg", 0) or 0),
+                    "ticks_avg_match": int(entry.get("ticks_avg_match", 0) or 0),
+                    "ticks_avg_nomatch": int(entry.get("ticks_avg_nomatch", 0) or 0),
+                    "percent": float(entry.get("percent", 0) or 0),
+                    "profiled_at": timestamp,
+                }
+    return perf
+
+
+def load_latest_stats(eve_path: Path, block_size: int = 65536, max_blocks: int = 64) -> Optional[dict]:
+    """eve.json 끝에서부터 역방향으로 읽어 가장 최근 stats 이벤트 반환"""
+    if not eve_path.exists():
+        return None
+
+    with open(eve_path, "rb") as f:
+        f.seek(0, 2)
+        pos = f.tell()
+        tail = b""
+        for _ in range(max_blocks):
+            if pos <= 0:
+                break
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+
+            lines = tail.split(b"\n")
+            # 첫 줄은 잘린 줄일 수 있으므로 파일 시작이 아니면 제외
+            candidates = lines if pos == 0 else lines[1:]
+            for raw in reversed(candidates):
+                if b'"event_type":"stats"' not in raw and b'"event_type": "stats"' not in raw:
+                    continue
+                try:
+                    event = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                return event
+            tail = lines[0] if pos > 0 else b""
+    return None
+
+
+def summarize_stats(event: Optional[dict]) -> dict:
+    """stats 이벤트에서 룰 성능 해석에 필요한 값만 추출"""
+    if not event:
+        return {}
+    stats = event.get("stats", {}) or {}
+    detect = stats.get("detect", {}) or {}
+    engines = detect.get("engines", []) or []
+    decoder = stats.get("decoder", {}) or {}
+    return {
+        "timestamp": event.get("timestamp"),
+        "uptime": stats.get("uptime"),
+        "packets": decoder.get("pkts"),
+        "alerts": detect.get("alert"),
+        "rules_loaded": sum(e.get("rules_loaded", 0) for e in engines),
+        "rules_failed": sum(e.get("rules_failed", 0) for e in engines),
+    }
+
+
+def build_perf_report(
+    perf: dict[int, dict],
+    rules: list[dict],
+    stats: Optional[dict] = None,
+    sort: str = "ticks_total",
+    limit: int = 50,
+    cost_threshold: float = 100000.0,
+) -> dict:
+    """
+    프로파일 결과와 룰 인덱스를 sid 로 조인하여 순위 생성
+    - cost_per_match = ticks_total / matches (매치가 없으면 ticks_total)
+    - LLM 생성 룰 중 cost_per_match 가 임계값을 넘으면 flagged
+    """
+    if sort not in SORT_KEYS:
+        sort = "ticks_total"
+
+    rules_by_sid = {}
+    for rule in rules:
+        try:
+            rules_by_sid[int(rule.get("sid"))] = rule
+        except (TypeError, ValueError):
+            continue
+
+    entries = []
+    flagged = []
+    for sid, item in perf.items():
+        rule = rules_by_sid.get(sid, {})
+        matches = item["matches"]
+        cost = item["ticks_total"] / matches if matches else float(item["ticks_total"])
+        llm = is_llm_sid(sid)
+        entry = {
+            **item,
+            "cost_per_match": round(cost, 1),
+            "message": rule.get("message", "N/A"),
+            "action": rule.get("action"),
+            "file": rule.get("file"),
+            "origin": "llm" if llm else "upstream",
+            "in_ruleset": bool(rule),
+            "flagged": llm and cost > cost_threshold,
+        }
+        entries.append(entry)
+        if entry["flagged"]:
+            flagged.append(entry)
+
+    entries.sort(key=lambda e: e[sort], reverse=True)
+    flagged.sort(key=lambda e: e["cost_per_match"], reverse=True)
+
+    return {
+        "sort": sort,
+        "cost_threshold": cost_threshold,
+        "profiled_rules": len(entries),
+        "total_ticks": sum(e["ticks_total"] for e in entries),
+        "stats": summarize_stats(stats),
+        "rules": entries[:limit],
+        "flagged": flagged[:limit],
+        "flagged_count": len(flagged),
+    }
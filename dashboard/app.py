@@ -5,11 +5,16 @@ Flask 웹 대시보드 (SPA - Single Page Application)
 UI 재구성 버전 (v3 - 버그 수정 및 차트 추가)
 """
 
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, send_from_directory
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, send_from_directory, make_response, Response
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user, AnonymousUserMixin
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
 import os
 
+from response_cache import CachedResponse, ResponseCache
+
 # Flask 앱 생성
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production-12345')
@@ -17,6 +22,8 @@ app.config['API_URL'] = os.environ.get('API_URL', 'http://localhost:8000') # <--
 app.config['MFA_ENABLED'] = False
 app.config['ITEMS_PER_PAGE'] = 50
 app.config['REPORT_DIR'] = os.path.join(app.root_path, 'generated_reports') # 보고서 저장 경로 (예시)
+app.config['RESPONSE_CACHE'] = os.environ.get('RESPONSE_CACHE', '1') != '0' # 0 이면 프록시 응답 캐시 끔
+app.config['ACTION_API_TOKEN'] = os.environ.get('ACTION_API_TOKEN', '') # API 차단 액션 토큰 (API 와 같은 값)
 
 # LoginManager 설정
 login_manager = LoginManager()
@@ -58,19 +65,43 @@ def load_user(user_id):
         return User(user_id, USERS[user_id])
     return None
 
+# API 연결 풀 (keep-alive: 요청마다 TCP 연결을 새로 맺지 않음)
+API_POOL_SIZE = int(os.environ.get('API_POOL_SIZE', 16))
+api_session = requests.Session()
+api_session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE))
+api_session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE))
+
+# 독립적인 백엔드 호출을 동시에 보내기 위한 스레드 풀
+api_executor = ThreadPoolExecutor(max_workers=API_POOL_SIZE, thread_name_prefix='api')
+
+# 백엔드 ETag 와 마지막 응답 (GET 재요청 시 If-None-Match → 304 면 본문 재전송 없이 재사용)
+API_ETAG_MAX_ENTRIES = 256
+api_etags = {}
+
 # API 헬퍼 함수
 def api_request(endpoint, method='GET', data=None):
     url = f"{app.config['API_URL']}{endpoint}"
     try:
         if method == 'GET':
-            response = requests.get(url, timeout=5)
+            cached = api_etags.get(endpoint)
+            headers = {'If-None-Match': cached[0]} if cached else {}
+            response = api_session.get(url, timeout=5, headers=headers)
+            if response.status_code == 304 and cached:
+                return cached[1]
         elif method == 'POST':
-            response = requests.post(url, json=data, timeout=5)
+            headers = {'X-API-Token': app.config['ACTION_API_TOKEN']} if app.config['ACTION_API_TOKEN'] else {}
+            response = api_session.post(url, json=data, timeout=5, headers=headers)
         elif method == 'DELETE':
-            response = requests.delete(url, timeout=5)
+            response = api_session.delete(url, timeout=5)
         
         if response.status_code == 200:
-            return response.json()
+            result = response.json()
+            etag = response.headers.get('ETag')
+            if method == 'GET' and etag:
+                if len(api_etags) >= API_ETAG_MAX_ENTRIES:
+                    api_etags.clear()
+                api_etags[endpoint] = (etag, result)
+            return result
         elif response.status_code == 204: # DELETE 성공 (No Content)
              return {"success": True}
         else:
@@ -86,6 +117,42 @@ def api_request(endpoint, method='GET', data=None):
         print(f"API Request Exception: {e}")
         return {"error": str(e)}
 
+def api_requests(*endpoints):
+    """
+    여러 GET 요청을 동시에 실행하고 endpoints 순서대로 결과 반환
+    (전체 지연 = 가장 느린 호출 1개, 각 결과는 api_request 와 같은 형식)
+    """
+    futures = [api_executor.submit(api_request, endpoint) for endpoint in endpoints]
+    return [future.result() for future in futures]
+
+# 프록시 응답 캐시 (분석가 여러 명이 같은 데이터를 폴링해도 백엔드 호출은 TTL 당 한 번)
+response_cache = ResponseCache()
+
+def cached_route(ttl):
+    """
+    라우트 응답을 경로 + 쿼리 기준으로 ttl 초 캐시 (동시 요청은 한 번만 실행)
+    브라우저에는 ETag / Cache-Control 을 보내고 If-None-Match 가 같으면 304
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not app.config['RESPONSE_CACHE']:
+                return view(*args, **kwargs)
+
+            def fetch():
+                response = make_response(view(*args, **kwargs))
+                return CachedResponse(response.get_data(), response.status_code, response.mimetype)
+
+            entry = response_cache.get(request.endpoint, request.full_path, ttl, fetch)
+            response = Response(entry.body, status=entry.status, mimetype=entry.mimetype)
+            if entry.status == 200:
+                response.set_etag(entry.etag)
+                response.headers['Cache-Control'] = f'private, max-age={ttl}'
+                response.make_conditional(request)
+            return response
+        return wrapper
+    return decorator
+
 # --- 인증 라우트 (AJAX 처리) ---
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -150,17 +217,20 @@ def index():
 
 @app.route('/api/get-stats')
 @login_required
+@cached_route(ttl=5)
 def get_stats():
     """대시보드 통계 데이터 (원형 차트 데이터 포함)"""
-    stats = api_request('/api/stats/overview')
-    rules_data = api_request('/api/rules/active?category=all')
+    # 룰은 개수 요약만 받음 (전체 룰 목록을 내려받지 않음)
+    stats, rules_summary = api_requests('/api/stats/overview', '/api/rules/summary')
     
-    stats_summary = stats if stats and 'error' not in stats else {}
-    rules_list = rules_data.get('rules', []) if rules_data else []
+    # (api_request 가 304 시 이전 응답 객체를 그대로 돌려주므로 복사 후 수정)
+    stats_summary = dict(stats) if stats and 'error' not in stats else {}
+    if not rules_summary or 'error' in rules_summary:
+        rules_summary = {}
     
-    stats_summary['active_rules_count'] = len(rules_list)
-    stats_summary['ai_rules_count'] = len([r for r in rules_list if 'auto_generated' in r.get('file', '')])
-    stats_summary['drop_rules_count'] = len([r for r in rules_list if r.get('action') == 'drop'])
+    stats_summary['active_rules_count'] = rules_summary.get('total', 0)
+    stats_summary['ai_rules_count'] = rules_summary.get('by_origin', {}).get('generated', 0)
+    stats_summary['drop_rules_count'] = rules_summary.get('by_action', {}).get('drop', 0)
     
     # (중요) 원형 차트를 위해 /api/stats/overview가 이 'severity_distribution'을 반환해야 함
     # 만약 반환하지 않는다면, 여기서 임시 데이터를 제공하거나 API 서버를 수정해야 함
@@ -176,6 +246,7 @@ def get_stats():
 
 @app.route('/api/get-timeline')
 @login_required
+@cached_route(ttl=10)
 def get_timeline():
     """대시보드 타임라인 차트 데이터"""
     hours = request.args.get('hours', 24, type=int)
@@ -191,6 +262,7 @@ def get_timeline():
 
 @app.route('/api/get-recent-alerts')
 @login_required
+@cached_route(ttl=2)
 def get_recent_alerts():
     """대시보드 최근 알림 (상위 5개)"""
     data = api_request('/api/logs/suricata?count=5')
@@ -198,6 +270,7 @@ def get_recent_alerts():
 
 @app.route('/api/get-alerts')
 @login_required
+@cached_route(ttl=2)
 def get_alerts():
     """알림 페이지 데이터 (필터링 포함)"""
     count = request.args.get('count', 50, type=int)
@@ -212,6 +285,7 @@ def get_alerts():
 
 @app.route('/api/get-rules')
 @login_required
+@cached_route(ttl=30)
 def get_rules():
     """룰 관리 페이지 데이터 (API 서버에서 가져오도록 수정)"""
     
@@ -301,11 +375,19 @@ def get_comparison():
 def block_ip_route():
     """IP 차단"""
     data = request.get_json()
-    # result = api_request('/api/action/block-ip', 'POST', data) # 실제 API 호출
-    print(f"Simulating block IP: {data.get('ip')}")
-    result = {"success": True, "message": f"IP {data.get('ip')} blocked (simulated)"}
+    result = api_request('/api/action/block-ip', 'POST', data)
+    if 'error' in result:
+        detail = result.get('detail', {})
+        message = detail.get('detail', result['error']) if isinstance(detail, dict) else result['error']
+        return jsonify({"success": False, "error": str(message)}), 502
     return jsonify(result)
 
+@app.route('/api/cache-stats')
+@login_required
+def cache_stats():
+    """프록시 응답 캐시 적중률 (엔드포인트별 hits / misses / coalesced)"""
+    return jsonify(response_cache.stats())
+
 # --- 에러 핸들러 ---
 @app.errorhandler(404)
 def page_not_found(e):
@@ -0,0 +1,108 @@
+"""
+dashboard/response_cache.py
+대시보드 프록시 응답 캐시 (짧은 TTL + single-flight)
+- 같은 키(경로 + 쿼리)의 응답을 ttl 초 동안 재사용 → 여러 분석가가 폴링해도 백엔드 호출은 한 번
+- 캐시가 비어 있을 때 동시에 들어온 같은 요청은 진행 중인 호출 1개의 결과를 함께 기다림
+- 응답 본문 해시로 ETag 생성 (브라우저 If-None-Match → 304)
+- 엔드포인트별 hit / miss / coalesced 카운트
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import Future
+from typing import Callable
+
+
+class CachedResponse:
+    """캐시된 응답 (본문 bytes, 상태 코드, Content-Type, ETag, 만료 시각)"""
+
+    __slots__ = ("body", "status", "mimetype", "etag", "expires")
+
+    def __init__(self, body: bytes, status: int = 200, mimetype: str = "application/json"):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        self.expires = 0.0   # 캐시에 넣을 때 설정
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: dict[str, CachedResponse] = {}
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.counts: dict[str, Counter] = defaultdict(Counter)
+
+    def get(self, name: str, key: str, ttl: float,
+            fetch: Callable[[], CachedResponse]) -> CachedResponse:
+        """
+        캐시된 응답 반환, 없거나 만료됐으면 fetch() 호출 (같은 키는 동시에 1번만)
+        200 이 아닌 응답은 기다리던 요청에만 전달하고 캐시하지 않음
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires > time.monotonic():
+                self.counts[name]["hits"] += 1
+                return entry
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counts[name]["coalesced"] += 1
+                leader = False
+            else:
+                future = self._inflight[key] = Future()
+                self.counts[name]["misses"] += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            entry = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            if entry.status == 200:
+                if len(self._entries) >= self.max_entries:
+                    self._evict()
+                entry.expires = time.monotonic() + ttl
+                self._entries[key] = entry
+        future.set_result(entry)
+        return entry
+
+    def _evict(self):
+        """만료된 항목 제거, 그래도 가득 차 있으면 가장 먼저 만료될 항목 제거"""
+        now = time.monotonic()
+        for key in [k for k, e in self._entries.items() if e.expires <= now]:
+            del self._entries[key]
+        if len(self._entries) >= self.max_entries:
+            del self._entries[min(self._entries, key=lambda k: self._entries[k].expires)]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {}
+            total = Counter()
+            for name, counts in self.counts.items():
+                requests = sum(counts.values())
+                endpoints[name] = {
+                    **counts,
+                    "hit_ratio": round((counts["hits"] + counts["coalesced"]) / requests, 3) if requests else 0.0,
+                }
+                total.update(counts)
+            requests = sum(total.values())
+            return {
+                "entries": len(self._entries),
+                "hit_ratio": round((total["hits"] + total["coalesced"]) / requests, 3) if requests else 0.0,
+                "endpoints": endpoints,
+            }
@@ -117,6 +117,12 @@ function connectWebSocket() {
             // newAlert 객체: { timestamp: "...", src_ip: "...", signature: "..." }
             console.log("새 알림 수신:", newAlert);
 
+            // 집계 갱신 레코드: 같은 알림이 창 동안 count 번 반복됨 (첫 1건은 이미 표시/집계됨)
+            if (newAlert.aggregated) {
+                updateDashboardCounters(newAlert, newAlert.count - 1);
+                return;
+            }
+
             // 1. UI 테이블에 새 알림 추가 (양쪽 페이지 모두)
             addAlertToUI(newAlert);
             
@@ -144,9 +150,20 @@ function connectWebSocket() {
 }
 
 // --- AJAX (Fetch) Helper ---
+// GET 응답의 ETag 와 본문 (재요청 시 If-None-Match → 304 면 본문을 다시 받지 않음)
+const etagCache = new Map();
+
 async function apiFetch(url, options = {}) {
     try {
+        const isGet = !options.method || options.method.toUpperCase() === 'GET';
+        const cached = isGet ? etagCache.get(url) : null;
+        if (cached) {
+            options = { ...options, headers: { ...(options.headers || {}), 'If-None-Match': cached.etag } };
+        }
         const response = await fetch(url, options);
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
         if (!response.ok) {
             const errorData = await response.json();
             throw new Error(errorData.error || `HTTP error! status: ${response.status}`);
@@ -155,7 +172,12 @@ async function apiFetch(url, options = {}) {
         if (response.status === 204) {
             return { success: true };
         }
-        return await response.json();
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (isGet && etag) {
+            etagCache.set(url, { etag, data });
+        }
+        return data;
     } catch (error) {
         console.error('API Fetch Error:', error);
         showToast(error.message || 'Network error', 'error');
@@ -426,7 +448,7 @@ async function loadRules() {
         tbody.innerHTML = '<tr><td colspan="6" style="text-align:center; padding: 2rem;">No rules found matching criteria.</td></tr>';
     } else {
         tbody.innerHTML = rules.map(rule => {
-            const isAuto = rule.file && rule.file.includes('auto_generated');
+            const isAuto = rule.origin === 'generated' || (rule.file && rule.file.includes('auto_generated'));
             return `
             <tr>
                 <td><code>${rule.sid}</code></td>
@@ -665,14 +687,16 @@ function addAlertToUI(alert) {
 /**
  * (신규) WebSocket에서 받은 새 알림으로 대시보드 카운터/차트 업데이트
  */
-function updateDashboardCounters(alert) {
+function updateDashboardCounters(alert, increment = 1) {
+    if (increment <= 0) return;
+
     // 1. "Total Alerts (24h)" 카운터 업데이트
-    // (참고: 이 카운트는 24시간 기준이지만, 실시간 알림은 무조건 1을 더합니다.)
+    // (참고: 이 카운트는 24시간 기준이지만, 실시간 알림은 무조건 increment(기본 1, 집계 갱신 시 count-1)를 더합니다.)
     try {
         const totalEl = document.getElementById('totalAlerts');
         if (totalEl && totalEl.textContent !== 'Error') {
             // (1,234 같은 쉼표 제거 후 숫자 변환)
-            totalEl.textContent = (parseInt(totalEl.textContent.replace(/,/g, '')) || 0) + 1;
+            totalEl.textContent = (parseInt(totalEl.textContent.replace(/,/g, '')) || 0) + increment;
         }
     } catch(e) { console.warn('Failed to update total alerts counter', e); }
 
@@ -682,7 +706,7 @@ function updateDashboardCounters(alert) {
         if (alert.severity === 1) {
             const criticalEl = document.getElementById('criticalThreats');
             if (criticalEl && criticalEl.textContent !== 'Error') {
-                criticalEl.textContent = (parseInt(criticalEl.textContent.replace(/,/g, '')) || 0) + 1;
+                criticalEl.textContent = (parseInt(criticalEl.textContent.replace(/,/g, '')) || 0) + increment;
             }
         }
     } catch(e) { console.warn('Failed to update critical threats counter', e); }
@@ -702,7 +726,7 @@ function updateDashboardCounters(alert) {
             else if (alert.severity >= 4) indexToUpdate = 3;
 
             if (indexToUpdate > -1) {
-                charts.severityPie.data.datasets[0].data[indexToUpdate]++;
+                charts.severityPie.data.datasets[0].data[indexToUpdate] += increment;
                 charts.severityPie.update('none'); // 'none'은 부드러운 애니메이션 없이 즉시 업데이트
             }
         } catch(e) { console.warn('Failed to update pie chart', e); }
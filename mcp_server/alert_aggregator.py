@@ -0,0 +1,115 @@
+"""
+mcp_server/alert_aggregator.py
+반복 알림 집계 (시간 창 기반)
+- 같은 키 (센서, sid, src_ip, dest_ip, dest_port) 의 알림을 window 초 동안 하나의 레코드로 합침
+  → first_seen / last_seen / count 만 갱신 (스캐너 폭주 시 메모리, WebSocket 전송, 렌더링 감소)
+- 창은 이벤트 timestamp 기준 (첫 알림부터 window 초), 닫힌 레코드는 expire() 로 반환
+  (max_keys 초과로 밀려난 레코드도 다음 expire() 에서 함께 반환)
+- window <= 0 이면 집계하지 않음 (원본 그대로 통과)
+"""
+
+import time
+from collections import Counter, OrderedDict
+from typing import Iterable, Optional
+
+from alert_store import to_epoch
+
+DEFAULT_KEY_FIELDS = ("sensor", "sid", "src_ip", "dest_ip", "dest_port")
+DEFAULT_MAX_KEYS = 50000
+
+
+class AlertAggregator:
+    """키별로 열린 집계 레코드 (OrderedDict: 첫 알림 순서 → 앞에서부터 만료)"""
+
+    def __init__(self, window: float = 60.0, key_fields: Iterable[str] = DEFAULT_KEY_FIELDS,
+                 max_keys: int = DEFAULT_MAX_KEYS):
+        self.window = window
+        self.key_fields = tuple(key_fields)
+        self.max_keys = max_keys
+        self._open: OrderedDict[tuple, dict] = OrderedDict()
+        self._times: dict[tuple, list[float]] = {}   # key → [창 시작 epoch, 마지막 epoch]
+        self._closed: list[dict] = []
+        self.counts: Counter = Counter()   # alerts, records, collapsed, evicted
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def key(self, alert: dict) -> tuple:
+        return tuple(alert.get(field) for field in self.key_fields)
+
+    def add(self, alert: dict, epoch: Optional[float] = None) -> tuple[dict, bool]:
+        """
+        알림 1개 추가 → (레코드, 새 레코드 여부)
+        새 레코드면 alert 에 first_seen / last_seen / count 를 붙여 그대로 반환,
+        기존 창에 속하면 해당 레코드의 last_seen / count 만 갱신
+        """
+        self.counts["alerts"] += 1
+        if not self.enabled:
+            return alert, True
+
+        if epoch is None:
+            epoch = to_epoch(alert.get("timestamp")) or time.time()
+
+        key = self.key(alert)
+        record = self._open.get(key)
+        if record is not None:
+            times = self._times[key]
+            if epoch - times[0] < self.window:
+                record["count"] += 1
+                if epoch >= times[1]:
+                    times[1] = epoch
+                    record["last_seen"] = alert.get("timestamp") or record["last_seen"]
+                self.counts["collapsed"] += 1
+                return record, False
+            self._close(key)
+
+        timestamp = alert.get("timestamp")
+        record = alert
+        record["first_seen"] = timestamp
+        record["last_seen"] = timestamp
+        record["count"] = 1
+        self._open[key] = record
+        self._times[key] = [epoch, epoch]
+        self.counts["records"] += 1
+
+        while len(self._open) > self.max_keys:
+            self._close(next(iter(self._open)))
+            self.counts["evicted"] += 1
+        return record, True
+
+    def _close(self, key: tuple):
+        self._times.pop(key, None)
+        self._closed.append(self._open.pop(key))
+
+    def expire(self, now: Optional[float] = None) -> list[dict]:
+        """창이 끝난 레코드를 닫고 반환 (now: epoch, 기본 현재 시각)"""
+        if now is None:
+            now = time.time()
+        while self._open:
+            key = next(iter(self._open))
+            if now - self._times[key][0] < self.window:
+                break
+            self._close(key)
+        closed, self._closed = self._closed, []
+        return closed
+
+    def flush(self) -> list[dict]:
+        """열린 레코드를 모두 닫고 반환 (종료 시)"""
+        closed = self._closed + list(self._open.values())
+        self._closed = []
+        self._open.clear()
+        self._times.clear()
+        return closed
+
+    def stats(self) -> dict:
+        alerts = self.counts["alerts"]
+        return {
+            "window": self.window,
+            "open": len(self._open),
+            "alerts": alerts,
+            "records": self.counts["records"],
+            "collapsed": self.counts["collapsed"],
+            "evicted": self.counts["evicted"],
+            "ratio": round(alerts / self.counts["records"], 2) if self.counts["records"] else 0.0,
+        }
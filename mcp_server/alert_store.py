@@ -0,0 +1,162 @@
+"""
+mcp_server/alert_store.py
+과거 알림 저장소 (SQLite)
+- eve.json 알림 이벤트를 API 와 같은 평탄화 형식으로 정규화
+- 원본 줄의 해시(uid)를 UNIQUE 키로 사용 → 같은 아카이브를 다시 가져와도 중복 없음
+- epoch 컬럼 인덱스로 시간 범위 조회, sensor 컬럼으로 센서별 조회
+"""
+
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+DEFAULT_DB = Path("data") / "alerts.db"
+
+COLUMNS = (
+    "uid", "timestamp", "epoch", "src_ip", "dest_ip", "src_port", "dest_port",
+    "proto", "signature", "severity", "category", "gid", "sid", "sensor",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    uid INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    epoch REAL,
+    src_ip TEXT,
+    dest_ip TEXT,
+    src_port INTEGER,
+    dest_port INTEGER,
+    proto TEXT,
+    signature TEXT,
+    severity INTEGER,
+    category TEXT,
+    gid INTEGER,
+    sid INTEGER,
+    sensor TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_epoch ON alerts(epoch);
+"""
+
+SENSOR_INDEX = "CREATE INDEX IF NOT EXISTS idx_alerts_sensor_epoch ON alerts(sensor, epoch)"
+
+
+def line_uid(line: bytes) -> int:
+    """원본 줄 해시 (부호 있는 64비트 → SQLite INTEGER)"""
+    return int.from_bytes(hashlib.blake2b(line.strip(), digest_size=8).digest(), "big", signed=True)
+
+
+def to_epoch(timestamp: Optional[str]) -> Optional[float]:
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        return None
+
+
+def normalize_alert(event: dict, sensor: Optional[str] = None) -> Optional[dict]:
+    """eve.json 이벤트 → 평탄화된 알림 (alert 이벤트가 아니면 None)"""
+    if event.get("event_type") != "alert":
+        return None
+    alert = event.get("alert")
+    if not alert:
+        return None
+    return {
+        "timestamp": event.get("timestamp"),
+        "src_ip": event.get("src_ip"),
+        "dest_ip": event.get("dest_ip"),
+        "src_port": event.get("src_port"),
+        "dest_port": event.get("dest_port"),
+        "proto": event.get("proto"),
+        "signature": alert.get("signature"),
+        "severity": alert.get("severity"),
+        "category": alert.get("category"),
+        "gid": alert.get("gid"),
+        "sid": alert.get("signature_id"),
+        "sensor": sensor,
+    }
+
+
+def parse_line(line: bytes, sensor: Optional[str] = None) -> Optional[tuple]:
+    """eve.json 한 줄 → 저장용 row (알림이 아니거나 파싱 실패 시 None)"""
+    if b'"alert"' not in line:
+        return None
+    try:
+        alert = normalize_alert(json.loads(line), sensor)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if alert is None:
+        return None
+    return (
+        line_uid(line), alert["timestamp"], to_epoch(alert["timestamp"]),
+        alert["src_ip"], alert["dest_ip"], alert["src_port"], alert["dest_port"],
+        alert["proto"], alert["signature"], alert["severity"], alert["category"],
+        alert["gid"], alert["sid"], sensor,
+    )
+
+
+class AlertStore:
+    """SQLite 알림 저장소 (WAL 모드: 가져오는 중에도 API 조회 가능)"""
+
+    def __init__(self, path: Path = DEFAULT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(alerts)")}
+        if "sensor" not in columns:
+            self.conn.execute("ALTER TABLE alerts ADD COLUMN sensor TEXT")
+        self.conn.execute(SENSOR_INDEX)
+
+    def insert_rows(self, rows: Iterable[tuple]) -> int:
+        """row 일괄 삽입 (한 트랜잭션), 새로 추가된 개수 반환"""
+        before = self.conn.total_changes
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO alerts ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows,
+            )
+        return self.conn.total_changes - before
+
+    def query(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+        sensor: Optional[str] = None,
+    ) -> list[dict]:
+        """epoch 범위 [since, until) 의 알림 (시간순, sensor 지정 시 해당 센서만)"""
+        clauses, params = [], []
+        if sensor is not None:
+            clauses.append("sensor = ?")
+            params.append(sensor)
+        if since is not None:
+            clauses.append("epoch >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("epoch < ?")
+            params.append(until)
+        sql = f"SELECT {', '.join(COLUMNS[1:])} FROM alerts"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY epoch"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        cursor = self.conn.execute(sql, params)
+        names = [c[0] for c in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def sensors(self) -> list[str]:
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT sensor FROM alerts") if row[0] is not None]
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,166 @@
+"""
+mcp_server/blocklist.py
+차단 IP 목록 저장소 (SQLite)
+- 재시작해도 유지되는 차단 상태 (IP, 사유, 출처, 만료 시각) — 방화벽 명령 출력을 매번 파싱하지 않음
+- 메모리 dict 캐시로 contains() O(1) (위협 점수 콜백에서 사용)
+- 다른 프로세스(API / MCP)의 변경은 PRAGMA data_version 으로 감지해 다시 읽음 (최대 refresh_interval 초마다)
+- reconcile(): 저장소를 기준으로 방화벽 집합을 맞춤 (주기적 / 변경 후에만 호출)
+"""
+
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from firewall import FirewallBackend
+
+DEFAULT_DB = Path("data") / "blocklist.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocked (
+    ip TEXT PRIMARY KEY,
+    reason TEXT,
+    source TEXT,
+    created REAL,
+    expires REAL
+);
+"""
+
+COLUMNS = ("ip", "reason", "source", "created", "expires")
+
+
+class BlockList:
+    def __init__(self, path: Path = DEFAULT_DB, refresh_interval: float = 1.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.refresh_interval = refresh_interval
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._data_version = None
+        self._checked = 0.0
+        self.version = 0   # 캐시가 바뀔 때마다 증가
+        self.last_reconcile: Optional[dict] = None
+        self._load()
+
+    def _load(self):
+        cursor = self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM blocked")
+        self._entries = {row[0]: dict(zip(COLUMNS, row)) for row in cursor}
+        self._data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        self.version += 1
+
+    def refresh(self, force: bool = False):
+        """다른 프로세스가 커밋했으면 캐시 다시 읽기 (refresh_interval 안에서는 확인 생략)"""
+        now = time.monotonic()
+        if not force and now - self._checked < self.refresh_interval:
+            return
+        with self._lock:
+            self._checked = now
+            if force or self.conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+                self._load()
+
+    def contains(self, ip: str, now: Optional[float] = None) -> bool:
+        """차단 중인지 (만료된 항목은 False)"""
+        self.refresh()
+        entry = self._entries.get(ip)
+        if entry is None:
+            return False
+        expires = entry["expires"]
+        return expires is None or expires > (time.time() if now is None else now)
+
+    def add(self, entries: Iterable[tuple[str, int]], reason: str = "", source: str = "manual",
+            now: Optional[float] = None) -> list[dict]:
+        """(IP, duration 초 — 0 = 영구) 목록 저장 (이미 있으면 사유 / 만료 갱신)"""
+        now = time.time() if now is None else now
+        rows = [(ip, reason, source, now, now + duration if duration else None) for ip, duration in entries]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO blocked ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            for row in rows:
+                self._entries[row[0]] = dict(zip(COLUMNS, row))
+            self.version += 1
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def remove(self, ips: Iterable[str]) -> list[dict]:
+        """항목 삭제, 삭제된 항목 반환 (restore() 로 되돌릴 수 있음)"""
+        ips = list(ips)
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM blocked WHERE ip = ?", [(ip,) for ip in ips])
+            removed = [entry for entry in (self._entries.pop(ip, None) for ip in ips) if entry is not None]
+            self.version += 1
+        return removed
+
+    def get(self, ip: str) -> Optional[dict]:
+        entry = self._entries.get(ip)
+        return dict(entry) if entry else None
+
+    def restore(self, entries: Iterable[dict]):
+        """get() / remove() 로 얻은 항목을 그대로 다시 저장 (방화벽 적용 실패 시 되돌리기용)"""
+        rows = [tuple(entry[c] for c in COLUMNS) for entry in entries]
+        if not rows:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO blocked ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            for row in rows:
+                self._entries[row[0]] = dict(zip(COLUMNS, row))
+            self.version += 1
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock, self.conn:
+            removed = self.conn.execute(
+                "DELETE FROM blocked WHERE expires IS NOT NULL AND expires <= ?", (now,)
+            ).rowcount
+            if removed:
+                self._entries = {ip: e for ip, e in self._entries.items()
+                                 if e["expires"] is None or e["expires"] > now}
+                self.version += 1
+        return removed
+
+    def active(self, now: Optional[float] = None) -> list[dict]:
+        """만료되지 않은 항목 (최근 차단 순, remaining = 남은 초 / 영구면 None)"""
+        self.refresh()
+        return self._active(time.time() if now is None else now)
+
+    def _active(self, now: float) -> list[dict]:
+        result = []
+        for entry in self._entries.values():
+            if entry["expires"] is not None and entry["expires"] <= now:
+                continue
+            remaining = None if entry["expires"] is None else math.ceil(entry["expires"] - now)
+            result.append({**entry, "remaining": remaining})
+        result.sort(key=lambda e: e["created"] or 0, reverse=True)
+        return result
+
+    def reconcile(self, backend: FirewallBackend, now: Optional[float] = None) -> dict:
+        """
+        방화벽 집합을 저장소에 맞춤: 빠진 IP 는 남은 시간으로 다시 추가, 저장소에 없는 IP 는 제거
+        (집합 조회 1번 + 추가 / 제거 트랜잭션 각 1번)
+        차단 / 해제는 저장소를 먼저 바꾸므로, 집합을 먼저 조회한 뒤 저장소를 refresh_interval 과 관계없이
+        다시 읽어야 다른 프로세스가 방금 추가한 IP 를 extra 로 지우지 않음
+        """
+        now = time.time() if now is None else now
+        actual = backend.list()
+        self.refresh(force=True)
+        self.purge_expired(now)
+        desired = {e["ip"]: e["remaining"] or 0 for e in self._active(now)}
+        missing = [(ip, duration) for ip, duration in desired.items() if ip not in actual]
+        extra = [ip for ip in actual if ip not in desired]
+        if missing:
+            backend.add(missing)
+        if extra:
+            backend.remove(extra)
+        self.last_reconcile = {"timestamp": now, "added": len(missing), "removed": len(extra),
+                               "backend": backend.name}
+        return self.last_reconcile
+
+    def close(self):
+        self.conn.close()
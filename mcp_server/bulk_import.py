@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+mcp_server/bulk_import.py
+과거 eve.json 아카이브 일괄 가져오기 (eve.json.1, eve.json.2.gz …)
+- 일반 파일: 줄 경계에 맞춘 바이트 구간으로 나눠 ProcessPoolExecutor 에서 병렬 파싱
+- seekable zstd: 해제 offset 기준 구간으로 나눠 병렬 처리 (구간마다 필요한 프레임만 해제)
+- gzip / 일반 zstd: 임의 접근이 불가능하므로 메인 프로세스가 순차 해제하며 줄 경계 청크로 잘라
+  워커에 분배 (해제는 직렬, 파싱만 병렬 — 파일 내부의 해제까지 병렬화되는 형식은 seekable zstd 뿐)
+  처리 중인 청크 수를 워커 수의 2배로 제한해 메모리는 해제 후 크기와 무관
+  (형식은 확장자가 아니라 매직 바이트로 판별, zstd 는 zstandard 패키지 필요)
+- 파싱 결과는 메인 프로세스가 AlertStore 에 일괄 삽입 (SQLite 단일 writer)
+- 센서 이름은 경로에서 추출 (sensors.sensor_name), --sensor 로 지정 가능
+
+사용법:
+    python mcp_server/bulk_import.py /var/log/suricata/eve.json.* [--db data/alerts.db] [--workers 8] [--sensor eth0]
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from alert_store import DEFAULT_DB, AlertStore, parse_line
+from eve_archive import (GZIP, PLAIN, SEEKABLE_ZSTD, ZSTD, ZSTD_AVAILABLE, archive_kind, open_seekable,
+                         seekable_size, zstandard)
+from sensors import sensor_name
+
+RANGE_BYTES = 64 * 1024 * 1024       # 작업 단위 구간 크기
+MIN_RANGE_BYTES = 4 * 1024 * 1024    # 너무 잘게 나누지 않도록 하한
+STREAM_CHUNK_BYTES = 16 * 1024 * 1024  # 압축 스트림을 워커에 넘기는 청크 크기 (해제 후 기준)
+
+
+def split_ranges(size: int, workers: int) -> list[tuple[int, int]]:
+    """크기 size 를 [start, end) 구간으로 분할 (경계 조정은 워커가 수행)"""
+    if size == 0:
+        return []
+    step = min(RANGE_BYTES, max(MIN_RANGE_BYTES, size // (workers * 4) + 1))
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def _parse_lines(f: BinaryIO, start: int, end: int, sensor: str) -> list[tuple]:
+    """
+    start 이후 첫 줄 시작부터 end 를 넘겨 시작하지 않는 줄까지 파싱
+    (줄은 시작 위치가 속한 구간이 담당 → 구간 사이 누락 / 중복 없음)
+    """
+    rows = []
+    if start:
+        f.seek(start - 1)
+        f.readline()   # start-1 이 줄바꿈이면 아무것도 버리지 않음
+    position = f.tell()
+    while position < end:
+        line = f.readline()
+        if not line:
+            break
+        position += len(line)
+        row = parse_line(line, sensor)
+        if row:
+            rows.append(row)
+    rows.sort()   # uid 순 정렬 → 메인 프로세스의 B-tree 삽입 지역성 향상
+    return rows
+
+
+def parse_range(path: str, start: int, end: int, sensor: str) -> list[tuple]:
+    with open(path, "rb") as f:
+        return _parse_lines(f, start, end, sensor)
+
+
+def parse_seekable_range(path: str, start: int, end: int, sensor: str) -> list[tuple]:
+    """seekable zstd 의 해제 offset 구간 [start, end) 파싱"""
+    with open_seekable(path) as f:
+        return _parse_lines(f, start, end, sensor)
+
+
+def parse_chunk(data: bytes, sensor: str) -> list[tuple]:
+    """줄 경계로 잘린 해제 데이터 청크 파싱"""
+    rows = [row for row in (parse_line(line, sensor) for line in data.split(b"\n")) if row]
+    rows.sort()
+    return rows
+
+
+def stream_chunks(path: str, kind: str, chunk_bytes: int = STREAM_CHUNK_BYTES) -> Iterator[tuple[bytes, int]]:
+    """
+    gzip / 일반 zstd 를 순차 해제하며 (줄 경계로 자른 청크, 그 청크까지 새로 읽은 압축 bytes) 반환
+    (압축 bytes 는 진행률 가중치 — 디스크 크기 기준 구간 작업과 같은 단위)
+    """
+    with open(path, "rb") as raw:
+        if kind == GZIP:
+            reader = gzip.GzipFile(fileobj=raw, mode="rb")
+        else:
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        with reader:
+            carry = b""
+            consumed = 0
+            while True:
+                data = reader.read(chunk_bytes)
+                if not data:
+                    break
+                data = carry + data
+                cut = data.rfind(b"\n") + 1
+                carry = data[cut:]
+                if cut:
+                    position = raw.tell()
+                    yield data[:cut], position - consumed
+                    consumed = position
+            remaining = os.fstat(raw.fileno()).st_size - consumed
+            if carry or remaining:
+                yield carry, remaining
+
+
+def stream_tasks(path: str, kind: str, sensor: str) -> Iterator[tuple]:
+    """압축 스트림 → 청크별 (parse_chunk, 인자, 가중치) 작업 (해제하면서 하나씩 생성)"""
+    for data, weight in stream_chunks(path, kind, STREAM_CHUNK_BYTES):
+        yield parse_chunk, (data, sensor), weight
+
+
+def build_tasks(paths: list[Path], workers: int, sensor: Optional[str] = None) -> list[tuple]:
+    """(함수, 인자, 진행률 가중치 bytes) 목록"""
+    tasks = []
+    for path in paths:
+        name = sensor or sensor_name(path)
+        kind = archive_kind(path)
+        disk_size = path.stat().st_size
+        if kind in (ZSTD, SEEKABLE_ZSTD) and not ZSTD_AVAILABLE:
+            print(f"[Import] ⚠ zstandard 미설치, 건너뜀: {path}", file=sys.stderr)
+        elif kind == PLAIN:
+            for start, end in split_ranges(disk_size, workers):
+                tasks.append((parse_range, (str(path), start, end, name), end - start))
+        elif kind == SEEKABLE_ZSTD:
+            # 진행률 가중치는 디스크 크기 기준으로 환산
+            size = seekable_size(path)
+            for start, end in split_ranges(size, workers):
+                tasks.append((parse_seekable_range, (str(path), start, end, name), disk_size * (end - start) // size))
+        else:
+            # 워커 작업은 import_files 가 stream_tasks 로 해제하면서 만듦
+            tasks.append((stream_tasks, (str(path), kind, name), disk_size))
+    return tasks
+
+
+def _progress(done: int, total: int, inserted: int, started: float):
+    width = 30
+    ratio = done / total if total else 1.0
+    elapsed = time.monotonic() - started
+    rate = done / elapsed / 1024 / 1024 if elapsed else 0.0
+    bar = "#" * int(width * ratio) + "-" * (width - int(width * ratio))
+    sys.stderr.write(f"\r[Import] [{bar}] {ratio * 100:5.1f}% {rate:7.1f} MB/s  {inserted:,} alerts")
+    sys.stderr.flush()
+
+
+def import_files(paths: list[Path], db_path: Path = DEFAULT_DB, workers: int = 0,
+                 sensor: Optional[str] = None) -> dict:
+    workers = workers or os.cpu_count() or 1
+    tasks = build_tasks(paths, workers, sensor)
+    total = sum(weight for _, _, weight in tasks)
+    store = AlertStore(db_path)
+    started = time.monotonic()
+    done = parsed = inserted = 0
+    # 결과(rows)를 기다리는 작업 수 상한 → 메인 프로세스 / 워커에 쌓이는 데이터가 워커 수에 비례
+    max_pending = workers * 2
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+
+        def collect(return_when):
+            nonlocal done, parsed, inserted
+            finished, _ = wait(pending, return_when=return_when)
+            for future in finished:
+                rows = future.result()
+                parsed += len(rows)
+                inserted += store.insert_rows(rows)
+                done += pending.pop(future)
+                _progress(done, total, inserted, started)
+
+        def submit(func, args, weight):
+            while len(pending) >= max_pending:
+                collect(FIRST_COMPLETED)
+            pending[pool.submit(func, *args)] = weight
+
+        for func, args, weight in tasks:
+            if func is stream_tasks:
+                for task in stream_tasks(*args):
+                    submit(*task)
+            else:
+                submit(func, args, weight)
+        if pending:
+            collect(ALL_COMPLETED)
+
+    sys.stderr.write("\n")
+    elapsed = time.monotonic() - started
+    store.close()
+    return {
+        "files": len(paths),
+        "tasks": len(tasks),
+        "bytes": total,
+        "parsed": parsed,
+        "inserted": inserted,
+        "duplicates": parsed - inserted,
+        "seconds": round(elapsed, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="eve.json 아카이브를 알림 저장소로 일괄 가져오기")
+    parser.add_argument("files", nargs="+", type=Path, help="eve.json / eve.json.N / *.gz / *.zst")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"SQLite 경로 (기본: {DEFAULT_DB})")
+    parser.add_argument("--workers", type=int, default=0, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--sensor", default=None, help="센서 이름 (기본: 경로에서 추출)")
+    args = parser.parse_args()
+
+    paths = [p for p in args.files if p.is_file()]
+    for missing in set(args.files) - set(paths):
+        print(f"[Import] ⚠ 파일 없음: {missing}", file=sys.stderr)
+    if not paths:
+        sys.exit(1)
+
+    result = import_files(paths, args.db, args.workers, args.sensor)
+    print(
+        f"[Import] ✓ {result['inserted']:,}개 추가 (중복 {result['duplicates']:,}), "
+        f"{result['bytes'] / 1024 / 1024:.1f} MB / {result['seconds']}초",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+mcp_server/checkpoint.py
+eve.json 읽기 위치 체크포인트
+- (inode, offset, 마지막 이벤트 timestamp) 를 주기적으로 디스크에 기록 (원자적 교체)
+- 재시작 시 같은 inode 면 offset 부터, 회전됐으면 inode 로 회전 파일(eve.json.1 등)을 찾아 이어 읽기
+  (찾지 못하면 호출 측이 last_timestamp 기준으로 이어 읽음)
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+
+class Checkpoint:
+    """읽기 위치 체크포인트 (메모리 갱신은 매번, 디스크 기록은 flush_interval 마다)"""
+
+    def __init__(self, path: Path, flush_interval: float = 5.0):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.state: Optional[dict] = None
+        self._dirty = False
+        self._last_flush = 0.0
+        self.load()
+
+    def load(self) -> Optional[dict]:
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            if isinstance(state.get("inode"), int) and isinstance(state.get("offset"), int):
+                self.state = state
+        except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+            self.state = None
+        return self.state
+
+    def update(self, source: Path, inode: Optional[int], offset: int, last_timestamp: Optional[str] = None):
+        if inode is None:
+            return
+        previous_ts = self.state.get("last_timestamp") if self.state else None
+        self.state = {
+            "path": str(source),
+            "inode": inode,
+            "offset": offset,
+            "last_timestamp": last_timestamp or previous_ts,
+        }
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """임시 파일에 쓰고 os.replace 로 교체 (중간에 죽어도 이전 체크포인트 유지)"""
+        if not self._dirty or not self.state:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({**self.state, "updated_at": datetime.now().isoformat()}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+
+# 회전 파일이 아닌 같은 이름 접두사 파일 (사이드카 인덱스 / 체크포인트 임시 파일 등)
+NON_ROTATED_SUFFIXES = (".idx", ".lock", ".tmp")
+
+
+def find_rotated(path: Path, inode: int) -> Optional[Path]:
+    """같은 디렉토리의 회전 파일(eve.json.1, eve.json-20250101 …) 중 inode 가 일치하는 파일"""
+    path = Path(path)
+    try:
+        candidates = sorted(path.parent.glob(path.name + "*"))
+    except OSError:
+        return None
+    for candidate in candidates:
+        if candidate == path or candidate.name.endswith(NON_ROTATED_SUFFIXES):
+            continue
+        try:
+            if candidate.stat().st_ino == inode:
+                return candidate
+        except OSError:
+            continue
+    return None
@@ -0,0 +1,177 @@
+"""
+mcp_server/eve_archive.py
+압축된 eve.json 아카이브 읽기 (logrotate 의 eve.json.2.gz, eve.json.3.zst …)
+- 확장자가 아니라 매직 바이트로 형식 판별: 일반 / gzip / zstd / seekable zstd
+- zstandard 패키지가 있으면 zstd 스트리밍 해제, 없으면 zstd 파일은 건너뜀 (gzip 은 표준 라이브러리)
+- seekable zstd (zstd contrib seekable format): 끝의 seek table 로 프레임 단위 임의 접근
+  → 압축 해제 후 offset 기준의 시간 인덱스로 아카이브 중간에서 바로 읽기 시작
+"""
+
+import gzip
+import io
+import struct
+from bisect import bisect_right
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+SKIPPABLE_MAGIC = 0x184D2A5E
+SEEKABLE_MAGIC = 0x8F92EAB1
+SEEK_FOOTER = struct.Struct("<IBI")   # Number_Of_Frames, Seek_Table_Descriptor, Seekable_Magic_Number
+
+PLAIN, GZIP, ZSTD, SEEKABLE_ZSTD = "plain", "gzip", "zstd", "seekable_zstd"
+
+
+class SeekTable:
+    """seekable zstd 의 프레임 목록 (압축 offset, 압축 크기, 해제 offset, 해제 크기)"""
+
+    def __init__(self, frames: list[tuple[int, int]]):
+        self.c_offsets, self.c_sizes, self.d_offsets, self.d_sizes = [], [], [], []
+        c_offset = d_offset = 0
+        for c_size, d_size in frames:
+            self.c_offsets.append(c_offset)
+            self.c_sizes.append(c_size)
+            self.d_offsets.append(d_offset)
+            self.d_sizes.append(d_size)
+            c_offset += c_size
+            d_offset += d_size
+        self.size = d_offset
+
+    def __len__(self) -> int:
+        return len(self.d_offsets)
+
+    def frame_for(self, offset: int) -> int:
+        return max(0, bisect_right(self.d_offsets, offset) - 1)
+
+    @classmethod
+    def read(cls, f: BinaryIO) -> Optional["SeekTable"]:
+        """파일 끝의 seek table 파싱 (seekable 형식이 아니면 None)"""
+        try:
+            f.seek(-SEEK_FOOTER.size, io.SEEK_END)
+            count, descriptor, magic = SEEK_FOOTER.unpack(f.read(SEEK_FOOTER.size))
+            if magic != SEEKABLE_MAGIC:
+                return None
+            entry_size = 12 if descriptor & 0x80 else 8
+            table_size = count * entry_size + SEEK_FOOTER.size
+            f.seek(-(table_size + 8), io.SEEK_END)
+            skippable, frame_size = struct.unpack("<II", f.read(8))
+            if skippable != SKIPPABLE_MAGIC or frame_size != table_size:
+                return None
+            raw = f.read(count * entry_size)
+        except (OSError, struct.error):
+            return None
+        frames = [struct.unpack_from("<II", raw, i * entry_size) for i in range(count)]
+        return cls(frames)
+
+
+class SeekableZstdReader(io.RawIOBase):
+    """seekable zstd 를 해제된 바이트 기준으로 seek / read 하는 파일 객체 (프레임 1개만 캐시)"""
+
+    def __init__(self, f: BinaryIO, table: SeekTable):
+        self._f = f
+        self.table = table
+        self._dctx = zstandard.ZstdDecompressor()
+        self._pos = 0
+        self._frame = -1
+        self._data = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self.table.size
+        self._pos = max(0, offset)
+        return self._pos
+
+    def _load(self, frame: int):
+        self._f.seek(self.table.c_offsets[frame])
+        compressed = self._f.read(self.table.c_sizes[frame])
+        self._data = self._dctx.decompress(compressed, max_output_size=self.table.d_sizes[frame])
+        self._frame = frame
+
+    def readinto(self, b) -> int:
+        if self._pos >= self.table.size:
+            return 0
+        frame = self.table.frame_for(self._pos)
+        if frame != self._frame:
+            self._load(frame)
+        start = self._pos - self.table.d_offsets[frame]
+        n = min(len(b), len(self._data) - start)
+        if n <= 0:
+            return 0
+        b[:n] = self._data[start:start + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        self._f.close()
+        super().close()
+
+
+def archive_kind(path: Path) -> str:
+    """매직 바이트로 형식 판별"""
+    with open(path, "rb") as f:
+        head = f.read(4)
+        if head.startswith(GZIP_MAGIC):
+            return GZIP
+        if head == ZSTD_MAGIC:
+            return SEEKABLE_ZSTD if SeekTable.read(f) else ZSTD
+    return PLAIN
+
+
+def is_compressed(path: Path) -> bool:
+    return archive_kind(path) != PLAIN
+
+
+def open_seekable(path: Path) -> Optional[io.BufferedReader]:
+    """seekable zstd 면 해제 offset 으로 seek 가능한 버퍼 리더, 아니면 None"""
+    if not ZSTD_AVAILABLE:
+        return None
+    f = open(path, "rb")
+    table = SeekTable.read(f)
+    if table is None:
+        f.close()
+        return None
+    return io.BufferedReader(SeekableZstdReader(f, table), buffer_size=256 * 1024)
+
+
+def seekable_size(path: Path) -> int:
+    """seekable zstd 의 해제 후 전체 크기"""
+    with open(path, "rb") as f:
+        table = SeekTable.read(f)
+    return table.size if table else 0
+
+
+def open_eve(path: Path) -> BinaryIO:
+    """
+    형식에 맞는 스트리밍 바이너리 리더 (줄 단위 반복 가능)
+    zstd 인데 zstandard 가 없으면 RuntimeError
+    """
+    kind = archive_kind(path)
+    if kind == GZIP:
+        return gzip.open(path, "rb")
+    if kind in (ZSTD, SEEKABLE_ZSTD):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"zstd 아카이브를 읽으려면 zstandard 설치 필요: {path}")
+        if kind == SEEKABLE_ZSTD:
+            return open_seekable(path)
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+        return io.BufferedReader(reader, buffer_size=256 * 1024)
+    return open(path, "rb")
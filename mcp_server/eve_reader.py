@@ -0,0 +1,97 @@
+"""
+mcp_server/eve_reader.py
+eve.json 읽기 유틸
+- ChunkedLineReader: 고정 크기 bytearray + readinto 로 청크 단위 읽기
+  (밀린 양과 관계없이 메모리 사용량 일정, 전체 버퍼 복사 / splitlines 없음)
+- 초당 처리 바이트 상한(catch-up rate)으로 대량 밀림 시 CPU 독점 방지
+"""
+
+import asyncio
+import time
+from typing import BinaryIO
+
+
+class ChunkedLineReader:
+    """고정 버퍼 기반 줄 단위 리더"""
+
+    def __init__(self, chunk_size: int = 1024 * 1024, max_rate: int = 0):
+        self.chunk_size = chunk_size
+        self.max_rate = max_rate            # bytes/sec, 0 이면 무제한
+        self._buf = bytearray(chunk_size)
+        self._view = memoryview(self._buf)
+        self._filled = 0                    # 버퍼 앞쪽의 미완성 줄 길이
+        self._skipping = False              # 버퍼보다 긴 줄을 버리는 중
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self.bytes_read = 0
+        self.lines = 0
+        self.oversized_lines = 0
+
+    def reset(self):
+        """트렁케이트 / 회전 시 미완성 줄 폐기"""
+        self._filled = 0
+        self._skipping = False
+
+    @property
+    def pending(self) -> int:
+        return self._filled
+
+    def read_chunk(self, fd: BinaryIO) -> tuple[int, list[str]]:
+        """
+        readinto 1회 → (읽은 바이트 수, 완성된 줄 목록)
+        미완성 줄은 버퍼 앞쪽으로 옮겨 다음 호출에서 이어 붙임
+        """
+        n = fd.readinto(self._view[self._filled:])
+        if not n:
+            return 0, []
+        self.bytes_read += n
+        end = self._filled + n
+        buf = self._buf
+        lines = []
+
+        start = 0
+        if self._skipping:
+            newline = buf.find(b"\n", 0, end)
+            if newline == -1:
+                self._filled = 0
+                return n, lines
+            start = newline + 1
+            self._skipping = False
+
+        while True:
+            newline = buf.find(b"\n", start, end)
+            if newline == -1:
+                break
+            if newline > start:
+                lines.append(str(self._view[start:newline], "utf-8", "ignore"))
+            start = newline + 1
+
+        remaining = end - start
+        if remaining >= self.chunk_size:
+            # 버퍼 전체가 한 줄: 다음 줄바꿈까지 버림
+            self.oversized_lines += 1
+            self._skipping = True
+            remaining = 0
+        elif remaining and start:
+            # 미완성 줄(최대 1줄)만 앞으로 이동
+            buf[:remaining] = buf[start:end]
+        self._filled = remaining
+        self.lines += len(lines)
+        return n, lines
+
+    async def throttle(self, nbytes: int):
+        """max_rate 를 넘으면 잠시 대기, 아니면 이벤트 루프에 양보만"""
+        if not self.max_rate:
+            await asyncio.sleep(0)
+            return
+        now = time.monotonic()
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_bytes = 0
+        self._window_bytes += nbytes
+        if self._window_bytes >= self.max_rate:
+            await asyncio.sleep(max(0.0, 1.0 - (now - self._window_start)))
+            self._window_start = time.monotonic()
+            self._window_bytes = 0
+        else:
+            await asyncio.sleep(0)
@@ -0,0 +1,294 @@
+"""
+mcp_server/eve_scan.py
+eve.json 시간 범위 스캐너 (mmap)
+- eve.json 은 대체로 시간순 → timestamp 로 이진 탐색해 cutoff 의 바이트 offset 을 찾음
+- cutoff 이후 구간만 줄 단위로 잘라 반환 (앞부분은 읽지도 디코딩하지도 않음,
+  반환하는 줄은 mmap 에서 복사한 bytes — 호출 측이 mmap 을 닫은 뒤에도 보관 / json.loads 가능)
+- 희소 인덱스 (epoch, offset) 를 data/index/ 아래 파일에 저장 → 다음 탐색 범위 축소
+  (API / MCP 가 같은 파일을 공유: 같은 min_gap, 저장 시 디스크 내용과 병합, 프로세스별 임시 파일)
+- 압축 아카이브: seekable zstd 는 해제 offset 기준으로 같은 방식의 이진 탐색,
+  gzip / 일반 zstd 는 처음부터 스트리밍하며 timestamp 로 필터
+"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from eve_archive import PLAIN, SEEKABLE_ZSTD, archive_kind, open_eve, open_seekable
+
+# 대략적인 시간순이므로 cutoff 보다 이만큼 앞에서부터 읽고 정확히 걸러냄
+ORDER_SLACK_SECONDS = 60
+# 이진 탐색 종료 구간 크기 (이후는 순차 스캔)
+MIN_SEARCH_SPAN = 64 * 1024
+# 인덱스 항목 최소 간격 (바이트) — 인덱스를 쓰는 모든 프로세스가 같은 값 사용
+INDEX_MIN_GAP = 1024 * 1024
+
+INDEX_DIR = Path("data") / "index"
+
+_TS_RE = re.compile(rb'"timestamp"\s*:\s*"([^"]+)"')
+
+
+def line_timestamp(line: bytes) -> Optional[str]:
+    """줄 앞부분의 timestamp 문자열만 정규식으로 추출 (JSON 전체 파싱 없음)"""
+    match = _TS_RE.search(line, 0, 128)
+    return match.group(1).decode() if match else None
+
+
+def line_epoch(line: bytes) -> Optional[float]:
+    timestamp = line_timestamp(line)
+    if timestamp is None:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        return None
+
+
+def sidecar_path(path: Path) -> Path:
+    """data/index/<이름>-<경로 해시>.idx (로그 디렉토리에는 쓰지 않음 — 회전 파일 glob 에 섞이지 않도록)"""
+    path = Path(path)
+    digest = hashlib.blake2b(str(path.resolve()).encode(), digest_size=6).hexdigest()
+    return INDEX_DIR / f"{path.name}-{digest}.idx"
+
+
+class SparseIndex:
+    """(epoch, offset) 희소 인덱스 — inode 가 바뀌었거나 파일이 줄었으면 무효화"""
+
+    def __init__(self, path: Path, min_gap: int = INDEX_MIN_GAP):
+        self.path = Path(path)
+        self.file = sidecar_path(self.path)
+        self.min_gap = min_gap
+        self.inode: Optional[int] = None
+        self.epochs: list[float] = []
+        self.offsets: list[int] = []
+        self.dirty = False
+        self.rebuilt = False   # validate 로 초기화됨 → 저장 시 디스크의 (무효한) 항목과 병합하지 않음
+
+    def load(self) -> "SparseIndex":
+        try:
+            with open(self.file) as f:
+                data = json.load(f)
+            entries = data.get("entries", [])
+            self.inode = data.get("inode")
+            self.epochs = [e for e, _ in entries]
+            self.offsets = [o for _, o in entries]
+        except (FileNotFoundError, json.JSONDecodeError, ValueError, TypeError):
+            self.inode, self.epochs, self.offsets = None, [], []
+        return self
+
+    def validate(self, inode: int, size: int):
+        if self.inode != inode or (self.offsets and self.offsets[-1] > size):
+            self.inode, self.epochs, self.offsets = inode, [], []
+            self.dirty = True
+            self.rebuilt = True
+
+    def add(self, epoch: float, offset: int):
+        """offset 순서를 유지하며 추가 (기존 항목과 min_gap 이내면 생략)"""
+        i = bisect_right(self.offsets, offset)
+        if i and offset - self.offsets[i - 1] < self.min_gap:
+            return
+        if i < len(self.offsets) and self.offsets[i] - offset < self.min_gap:
+            return
+        self.offsets.insert(i, offset)
+        self.epochs.insert(i, epoch)
+        self.dirty = True
+
+    def bounds(self, cutoff: float, size: int) -> tuple[int, int]:
+        """cutoff 가 들어 있는 [lo, hi) 바이트 구간 (epoch 기준 앞뒤 인덱스 항목)"""
+        lo, hi = 0, size
+        for epoch, offset in zip(self.epochs, self.offsets):
+            if epoch < cutoff:
+                lo = offset
+            else:
+                hi = min(hi, offset)
+                break
+        return lo, max(lo, hi)
+
+    def save(self):
+        """
+        디스크의 인덱스(같은 inode)와 병합 후 원자적으로 교체
+        (파일 잠금으로 병합 → 교체를 직렬화, 임시 파일은 프로세스마다 다른 이름)
+        copytruncate 로 같은 inode 가 줄어든 뒤 다시 만든 인덱스는 이전 항목과 병합하지 않고 덮어씀
+        """
+        if not self.dirty:
+            return
+        tmp = None
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.file.with_name(self.file.name + ".lock"), "a") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                on_disk = SparseIndex(self.path, self.min_gap).load()
+                if on_disk.inode == self.inode and not self.rebuilt:
+                    for epoch, offset in zip(on_disk.epochs, on_disk.offsets):
+                        self.add(epoch, offset)
+                with tempfile.NamedTemporaryFile("w", dir=self.file.parent, prefix=self.file.name + ".",
+                                                 suffix=".tmp", delete=False) as f:
+                    tmp = f.name
+                    json.dump({"inode": self.inode, "entries": list(zip(self.epochs, self.offsets))}, f)
+                os.replace(tmp, self.file)
+                tmp = None
+            self.dirty = False
+            self.rebuilt = False
+        except OSError:
+            pass
+        finally:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+
+def _next_line_start(mm: mmap.mmap, pos: int) -> int:
+    if pos == 0:
+        return 0
+    newline = mm.find(b"\n", pos - 1)
+    return len(mm) if newline == -1 else newline + 1
+
+
+def _epoch_from(mm: mmap.mmap, start: int, end: int, probes: int = 8) -> tuple[Optional[float], int]:
+    """start 이후 처음으로 timestamp 가 있는 줄의 (epoch, 줄 시작 offset)"""
+    for _ in range(probes):
+        if start >= end:
+            break
+        newline = mm.find(b"\n", start, end)
+        stop = end if newline == -1 else newline
+        epoch = line_epoch(mm[start:min(stop, start + 256)])
+        if epoch is not None:
+            return epoch, start
+        start = stop + 1
+    return None, start
+
+
+def find_offset(mm: mmap.mmap, cutoff: float, index: Optional[SparseIndex] = None) -> int:
+    """timestamp >= cutoff 가 시작되는 대략적인 줄 시작 offset (이진 탐색, 탐색 지점은 인덱스에 기록)"""
+    size = len(mm)
+    lo, hi = index.bounds(cutoff, size) if index else (0, size)
+
+    while hi - lo > MIN_SEARCH_SPAN:
+        mid = _next_line_start(mm, (lo + hi) // 2)
+        if mid >= hi:
+            break
+        epoch, line_start = _epoch_from(mm, mid, hi)
+        if epoch is None:
+            break
+        if index is not None:
+            index.add(epoch, line_start)
+        if epoch < cutoff:
+            lo = line_start
+        else:
+            hi = mid
+    return _next_line_start(mm, lo)
+
+
+def _stream_epoch_from(f: BinaryIO, pos: int, probes: int = 8) -> tuple[Optional[float], int]:
+    """seek 가능한 스트림에서 pos 이후 첫 완성된 줄부터 timestamp 가 있는 줄의 (epoch, 줄 시작 offset)"""
+    if pos:
+        f.seek(pos - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    for _ in range(probes):
+        start = f.tell()
+        line = f.readline()
+        if not line:
+            break
+        epoch = line_epoch(line[:256])
+        if epoch is not None:
+            return epoch, start
+    return None, f.tell()
+
+
+def find_stream_offset(f: BinaryIO, size: int, cutoff: float, index: Optional[SparseIndex] = None) -> int:
+    """find_offset 의 스트림 버전 (seekable zstd: 탐색 1회당 프레임 1개만 해제)"""
+    lo, hi = index.bounds(cutoff, size) if index else (0, size)
+
+    while hi - lo > MIN_SEARCH_SPAN:
+        mid = (lo + hi) // 2
+        epoch, line_start = _stream_epoch_from(f, mid)
+        if epoch is None or line_start >= hi:
+            break
+        if index is not None:
+            index.add(epoch, line_start)
+        if epoch < cutoff:
+            lo = line_start
+        else:
+            hi = mid
+    return _stream_epoch_from(f, lo, probes=0)[1]
+
+
+def _filter_since(lines: Iterable[bytes], cutoff: float) -> Iterator[bytes]:
+    for line in lines:
+        if not line.endswith(b"\n"):
+            break   # 마지막 미완성 줄은 제외
+        epoch = line_epoch(line)
+        if epoch is not None and epoch >= cutoff:
+            yield line
+
+
+def _iter_archive_since(path: Path, kind: str, cutoff: float, use_index: bool) -> Iterator[bytes]:
+    f = open_seekable(path) if kind == SEEKABLE_ZSTD else None
+    if f is None:
+        # gzip / 일반 zstd: 임의 접근 불가 → 처음부터 스트리밍
+        with open_eve(path) as stream:
+            yield from _filter_since(stream, cutoff)
+        return
+
+    with f:
+        size = f.raw.table.size
+        index = None
+        if use_index:
+            index = SparseIndex(path).load()
+            index.validate(os.stat(path).st_ino, size)
+        start = find_stream_offset(f, size, cutoff - ORDER_SLACK_SECONDS, index)
+        if index is not None:
+            index.save()
+        f.seek(start)
+        yield from _filter_since(f, cutoff)
+
+
+def iter_lines_since(path: Path, cutoff: float, use_index: bool = True,
+                     end: Optional[int] = None) -> Iterator[bytes]:
+    """
+    cutoff(epoch) 이후의 줄만 반환 (줄바꿈 제외, 줄마다 bytes 복사본)
+    (대략적 시간순 대비 ORDER_SLACK_SECONDS 앞에서부터 읽고 timestamp 로 정확히 필터)
+    end: 일반 파일에서 이 offset 까지만 읽음 (이후는 tail 이 이어서 읽을 때)
+    """
+    path = Path(path)
+    kind = archive_kind(path)
+    if kind != PLAIN:
+        yield from _iter_archive_since(path, kind, cutoff, use_index)
+        return
+
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size == 0:
+            return
+        index = None
+        if use_index:
+            index = SparseIndex(path).load()
+            index.validate(stat.st_ino, stat.st_size)
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = find_offset(mm, cutoff - ORDER_SLACK_SECONDS, index)
+            if index is not None:
+                index.save()
+
+            size = len(mm) if end is None else min(len(mm), end)
+            while start < size:
+                newline = mm.find(b"\n", start, size)
+                if newline == -1:
+                    break   # 마지막 미완성 줄은 제외
+                line = mm[start:newline]
+                start = newline + 1
+                epoch = line_epoch(line)
+                if epoch is not None and epoch >= cutoff:
+                    yield line
@@ -0,0 +1,187 @@
+"""
+mcp_server/eve_watch.py
+eve.json 변경 감시기
+- Linux: inotify (ctypes) 로 IN_MODIFY / IN_MOVE_SELF / IN_DELETE_SELF / IN_CREATE 때만 깨어남
+- 그 외 / inotify 사용 불가: 주기적 폴링으로 대체
+- asyncio 이벤트 루프의 add_reader 로 통합 (별도 스레드 없음)
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Optional
+
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+FILE_MASK = IN_MODIFY | IN_MOVE_SELF | IN_DELETE_SELF
+DIR_MASK = IN_CREATE | IN_MOVED_TO
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# wait() 가 반환하는 이벤트 종류
+MODIFY = "modify"
+ROTATE = "rotate"        # 파일 이동 / 삭제
+CREATE = "create"        # 같은 이름의 새 파일 생성 (로그 회전 후)
+TIMEOUT = "timeout"      # 안전망: 일정 시간 이벤트가 없으면 한 번 깨어남
+POLL = "poll"            # 폴링 모드
+
+# 이 이벤트들이 오면 경로 stat 으로 회전 여부 재확인
+RECHECK_EVENTS = {ROTATE, CREATE, TIMEOUT, POLL}
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class InotifyWatcher:
+    """inotify 기반 감시기 (파일 inode + 상위 디렉토리 감시)"""
+
+    def __init__(self, path: Path, timeout: float = 5.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._fd: Optional[int] = None
+        self._file_wd: Optional[int] = None
+        self._dir_wd: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._pending: set[str] = set()
+        self._event = asyncio.Event()
+        self.wakeups = 0
+
+    def start(self):
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        self._fd = fd
+        self._dir_wd = self._add_watch(self.path.parent, DIR_MASK)
+        self.rewatch()
+        asyncio.get_running_loop().add_reader(fd, self._on_readable)
+
+    def _add_watch(self, path: Path, mask: int) -> Optional[int]:
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(str(path)), mask)
+        return wd if wd >= 0 else None
+
+    def rewatch(self):
+        """현재 경로의 파일이 바뀌었으면(회전) 새 inode 에 감시 재등록"""
+        try:
+            inode = self.path.stat().st_ino
+        except FileNotFoundError:
+            return
+        if inode == self._inode and self._file_wd is not None:
+            return
+        if self._file_wd is not None:
+            _libc.inotify_rm_watch(self._fd, self._file_wd)
+        self._file_wd = self._add_watch(self.path, FILE_MASK)
+        self._inode = inode
+
+    def _on_readable(self):
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            self._parse(data)
+        if self._pending:
+            self._event.set()
+
+    def _parse(self, data: bytes):
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += _EVENT_HEADER.size + length
+
+            if wd == self._dir_wd:
+                if mask & DIR_MASK and os.fsdecode(name) == self.path.name:
+                    self._pending.add(CREATE)
+            elif wd == self._file_wd:
+                if mask & IN_MODIFY:
+                    self._pending.add(MODIFY)
+                if mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                    self._pending.add(ROTATE)
+                if mask & IN_IGNORED:
+                    self._file_wd = None
+                    self._inode = None
+
+    async def wait(self) -> set[str]:
+        """변경 이벤트가 올 때까지 대기 (timeout 경과 시 {TIMEOUT})"""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._event.wait(), self.timeout)
+            except asyncio.TimeoutError:
+                return {TIMEOUT}
+        self.wakeups += 1
+        events, self._pending = self._pending, set()
+        self._event.clear()
+        return events
+
+    def close(self):
+        if self._fd is None:
+            return
+        try:
+            asyncio.get_running_loop().remove_reader(self._fd)
+        except RuntimeError:
+            pass
+        os.close(self._fd)
+        self._fd = None
+
+
+class PollingWatcher:
+    """inotify 를 쓸 수 없을 때의 폴링 감시기 (호출자가 매번 stat 으로 확인)"""
+
+    def __init__(self, path: Path, interval: float = 0.1):
+        self.path = Path(path)
+        self.interval = interval
+        self.wakeups = 0
+
+    def start(self):
+        pass
+
+    def rewatch(self):
+        pass
+
+    async def wait(self) -> set[str]:
+        await asyncio.sleep(self.interval)
+        self.wakeups += 1
+        return {POLL}
+
+    def close(self):
+        pass
+
+
+def create_watcher(path: Path, poll_interval: float = 0.1, timeout: float = 5.0):
+    """가능하면 InotifyWatcher, 아니면 PollingWatcher 생성 후 시작 (실행 중인 루프 안에서 호출)"""
+    if _libc is not None:
+        watcher = InotifyWatcher(path, timeout=timeout)
+        try:
+            watcher.start()
+            return watcher
+        except OSError:
+            watcher.close()
+    watcher = PollingWatcher(path, interval=poll_interval)
+    watcher.start()
+    return watcher
@@ -0,0 +1,400 @@
+"""
+mcp_server/firewall.py
+IP 차단 백엔드 (ipset / nftables 집합)
+- IP 마다 iptables 규칙을 추가하지 않고 집합 하나 + DROP 규칙 하나만 사용 (조회 O(1), 규칙 체인 길이 고정)
+- 여러 IP 는 한 번의 트랜잭션으로 추가 (ipset restore / nft -f -), 프로세스 실행 1회
+- 항목별 timeout 지원 (duration 초, 0 = 영구)
+- FakeBackend: 실제 방화벽 없이 동작 확인 / 테스트용 (실행할 명령만 기록)
+- IP 는 ipaddress 로 검증 후 전달 (shell 미사용), 루프백 / 자기 주소 / 게이트웨이 / 보호 대역은 차단 거부
+- 집합 / 규칙 생성(setup)은 첫 차단 때 (이미 만든 집합이 있을 때만 조회 / 해제)
+"""
+
+import ipaddress
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+SET_NAME = "suricata_block"
+NFT_TABLE = "suricata_mcp"
+
+Entry = tuple[str, int]   # (IP, timeout 초 — 0 = 영구)
+
+
+class FirewallError(Exception):
+    pass
+
+
+def normalize_ip(ip: str) -> str:
+    """IPv4 / IPv6 주소 검증 및 정규화 (잘못된 값이면 ValueError)"""
+    return str(ipaddress.ip_address(str(ip).strip()))
+
+
+def ip_family(ip: str) -> int:
+    return ipaddress.ip_address(ip).version
+
+
+def local_addresses() -> set[str]:
+    """이 호스트의 주소 + 기본 게이트웨이 (Linux /proc, 읽을 수 없으면 호스트 이름 조회 결과만)"""
+    addresses = set()
+    try:
+        lines = Path("/proc/net/fib_trie").read_text().splitlines()
+        for prev, line in zip(lines, lines[1:]):
+            if "/32 host LOCAL" in line:
+                addresses.add(prev.split()[-1])
+    except OSError:
+        pass
+    try:
+        for line in Path("/proc/net/if_inet6").read_text().splitlines():
+            addresses.add(str(ipaddress.IPv6Address(int(line.split()[0], 16))))
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        for line in Path("/proc/net/route").read_text().splitlines()[1:]:
+            fields = line.split()
+            if len(fields) > 2 and fields[1] == "00000000":
+                addresses.add(str(ipaddress.IPv4Address(int(fields[2], 16).to_bytes(4, "little"))))
+    except (OSError, ValueError):
+        pass
+    try:
+        for info in socket.getaddrinfo(socket.gethostname(), None):
+            addresses.add(info[4][0].split("%")[0])
+    except OSError:
+        pass
+    return addresses
+
+
+class ProtectedNetworks:
+    """차단하면 안 되는 주소 (루프백 / 미지정 / 멀티캐스트 / 링크 로컬 / 자기 주소 / 게이트웨이 / 설정한 대역)"""
+
+    def __init__(self, networks: Iterable[str] = (), include_local: bool = True):
+        self.networks = [ipaddress.ip_network(n, strict=False) for n in networks]
+        self.local = local_addresses() if include_local else set()
+
+    def reason(self, ip: str) -> Optional[str]:
+        """보호 대상이면 사유, 아니면 None"""
+        address = ipaddress.ip_address(ip)
+        if address.is_loopback or address.is_unspecified or address.is_multicast or address.is_link_local:
+            return "예약된 주소"
+        if ip in self.local:
+            return "이 호스트 / 게이트웨이 주소"
+        for network in self.networks:
+            if address.version == network.version and address in network:
+                return f"보호 대역 {network}"
+        return None
+
+
+class FirewallBackend:
+    """차단 집합 인터페이스: setup → add / remove (배치) / list"""
+
+    name = "base"
+    dry_run = False
+
+    def __init__(self, use_sudo: bool = True, timeout: float = 10.0):
+        self.use_sudo = use_sudo
+        self.timeout = timeout
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _run(self, argv: list[str], script: Optional[str] = None) -> str:
+        if self.use_sudo:
+            argv = ["sudo", "-n"] + argv
+        try:
+            result = subprocess.run(argv, input=script, capture_output=True, text=True, timeout=self.timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise FirewallError(f"{argv[0]} 실행 실패: {e}") from e
+        if result.returncode != 0:
+            raise FirewallError(f"{' '.join(argv)} 실패: {result.stderr.strip()}")
+        return result.stdout
+
+    def ensure_ready(self):
+        with self._lock:
+            if not self._ready:
+                self.setup()
+                self._ready = True
+
+    def _prepared(self) -> bool:
+        """
+        조회 / 해제 전 확인: 이전에 만든 집합이 있으면 setup 후 True, 없으면 False
+        (아무것도 차단한 적 없는 호스트에 테이블 / 규칙을 만들지 않음)
+        """
+        if self._ready:
+            return True
+        if not self.exists():
+            return False
+        self.ensure_ready()
+        return True
+
+    def setup(self):
+        raise NotImplementedError
+
+    def exists(self) -> bool:
+        raise NotImplementedError
+
+    def add(self, entries: list[Entry]):
+        raise NotImplementedError
+
+    def remove(self, ips: list[str]):
+        raise NotImplementedError
+
+    def list(self) -> dict[str, Optional[int]]:
+        """{IP: 남은 timeout 초 (영구면 None)}"""
+        raise NotImplementedError
+
+
+class IpsetBackend(FirewallBackend):
+    """ipset hash:ip (IPv4 / IPv6 집합 각각) + iptables / ip6tables DROP 규칙 1개씩"""
+
+    name = "ipset"
+
+    def __init__(self, set_name: str = SET_NAME, **kwargs):
+        super().__init__(**kwargs)
+        self.sets = {4: set_name, 6: set_name + "6"}
+
+    def setup(self):
+        for family, set_name, iptables in ((4, self.sets[4], "iptables"), (6, self.sets[6], "ip6tables")):
+            # timeout 0: 항목별 timeout 사용 가능, 기본은 영구
+            self._run(["ipset", "create", set_name, "hash:ip", "family", "inet" if family == 4 else "inet6",
+                       "timeout", "0", "-exist"])
+            rule = ["INPUT", "-m", "set", "--match-set", set_name, "src", "-j", "DROP"]
+            try:
+                self._run([iptables, "-C"] + rule)
+            except FirewallError:
+                self._run([iptables, "-I"] + rule)
+
+    def exists(self) -> bool:
+        try:
+            return self.sets[4] in self._run(["ipset", "list", "-n"]).split()
+        except FirewallError:
+            return False
+
+    def add(self, entries: list[Entry]):
+        if not entries:
+            return
+        self.ensure_ready()
+        script = "".join(
+            f"add {self.sets[ip_family(ip)]} {ip} timeout {int(timeout)} -exist\n" for ip, timeout in entries
+        )
+        self._run(["ipset", "restore"], script)
+
+    def remove(self, ips: list[str]):
+        if not ips or not self._prepared():
+            return
+        script = "".join(f"del {self.sets[ip_family(ip)]} {ip} -exist\n" for ip in ips)
+        self._run(["ipset", "restore"], script)
+
+    def list(self) -> dict[str, Optional[int]]:
+        if not self._prepared():
+            return {}
+        entries = {}
+        for set_name in self.sets.values():
+            for line in self._run(["ipset", "save", set_name]).splitlines():
+                parts = line.split()
+                if len(parts) >= 3 and parts[0] == "add":
+                    timeout = int(parts[4]) if len(parts) >= 5 and parts[3] == "timeout" else 0
+                    entries[parts[2]] = timeout or None
+        return entries
+
+
+class NftablesBackend(FirewallBackend):
+    """nftables inet 테이블의 timeout 집합 (IPv4 / IPv6) + input 훅 체인"""
+
+    name = "nftables"
+
+    def __init__(self, table: str = NFT_TABLE, **kwargs):
+        super().__init__(**kwargs)
+        self.table = table
+        self.sets = {4: "blocklist4", 6: "blocklist6"}
+
+    def setup(self):
+        self._run(["nft", "-f", "-"], (
+            f"table inet {self.table} {{\n"
+            f"  set {self.sets[4]} {{ type ipv4_addr; flags timeout; }}\n"
+            f"  set {self.sets[6]} {{ type ipv6_addr; flags timeout; }}\n"
+            f"  chain input {{\n"
+            f"    type filter hook input priority -10; policy accept;\n"
+            f"  }}\n"
+            f"}}\n"
+            f"flush chain inet {self.table} input\n"
+            f"add rule inet {self.table} input ip saddr @{self.sets[4]} drop\n"
+            f"add rule inet {self.table} input ip6 saddr @{self.sets[6]} drop\n"
+        ))
+
+    def exists(self) -> bool:
+        try:
+            self._run(["nft", "list", "table", "inet", self.table])
+            return True
+        except FirewallError:
+            return False
+
+    def _elements(self, entries: Iterable[Entry]) -> dict[int, list[str]]:
+        elements: dict[int, list[str]] = {4: [], 6: []}
+        for ip, timeout in entries:
+            elements[ip_family(ip)].append(f"{ip} timeout {int(timeout)}s" if timeout else ip)
+        return elements
+
+    def _delete_script(self, ips: Iterable[str]) -> str:
+        """
+        집합 조회 없이 지우기: add (이미 있으면 무시) → delete 는 항목 유무와 관계없이 성공
+        (없는 항목을 바로 delete 하면 트랜잭션 전체 실패)
+        """
+        script = ""
+        for family, elements in self._elements((ip, 0) for ip in ips).items():
+            if elements:
+                target = f"inet {self.table} {self.sets[family]} {{ {', '.join(elements)} }}"
+                script += f"add element {target}\ndelete element {target}\n"
+        return script
+
+    def add(self, entries: list[Entry]):
+        if not entries:
+            return
+        self.ensure_ready()
+        # 이미 있는 항목은 add 가 timeout 을 바꾸지 않으므로 지우고 다시 추가 (한 트랜잭션, 프로세스 1회)
+        script = self._delete_script(ip for ip, _ in entries)
+        for family, elements in self._elements(entries).items():
+            if elements:
+                script += f"add element inet {self.table} {self.sets[family]} {{ {', '.join(elements)} }}\n"
+        self._run(["nft", "-f", "-"], script)
+
+    def remove(self, ips: list[str]):
+        if not ips or not self._prepared():
+            return
+        self._run(["nft", "-f", "-"], self._delete_script(ips))
+
+    def list(self) -> dict[str, Optional[int]]:
+        if not self._prepared():
+            return {}
+        entries = {}
+        for set_name in self.sets.values():
+            data = json.loads(self._run(["nft", "-j", "list", "set", "inet", self.table, set_name]))
+            for item in data.get("nftables", []):
+                for element in item.get("set", {}).get("elem", []):
+                    if isinstance(element, dict):
+                        elem = element.get("elem", {})
+                        entries[elem.get("val")] = elem.get("expires")
+                    else:
+                        entries[element] = None
+        return entries
+
+
+class FakeBackend(FirewallBackend):
+    """실제 방화벽을 건드리지 않는 백엔드 (트랜잭션마다 스크립트를 batches 에 기록)"""
+
+    name = "fake"
+    dry_run = True
+
+    def __init__(self, **kwargs):
+        super().__init__(use_sudo=False)
+        self.entries: dict[str, Optional[float]] = {}   # IP → 만료 시각 (영구면 None)
+        self.batches: list[list[str]] = []
+
+    def setup(self):
+        pass
+
+    def exists(self) -> bool:
+        return True
+
+    def add(self, entries: list[Entry]):
+        if not entries:
+            return
+        now = time.time()
+        self.batches.append([f"add {ip} timeout {int(timeout)}" for ip, timeout in entries])
+        for ip, timeout in entries:
+            self.entries[ip] = now + timeout if timeout else None
+
+    def remove(self, ips: list[str]):
+        if not ips:
+            return
+        self.batches.append([f"del {ip}" for ip in ips])
+        for ip in ips:
+            self.entries.pop(ip, None)
+
+    def list(self) -> dict[str, Optional[int]]:
+        now = time.time()
+        for ip in [ip for ip, expires in self.entries.items() if expires is not None and expires <= now]:
+            del self.entries[ip]
+        return {ip: (int(expires - now) if expires else None) for ip, expires in self.entries.items()}
+
+
+BACKENDS = {"ipset": IpsetBackend, "nftables": NftablesBackend, "fake": FakeBackend}
+
+
+def create_backend(kind: str = "auto", use_sudo: bool = True) -> FirewallBackend:
+    """
+    kind: ipset / nftables / fake / auto
+    auto 는 nft → ipset 순으로 설치된 것을 사용, 둘 다 없으면 FakeBackend (경고 출력)
+    """
+    if kind == "auto":
+        if shutil.which("nft"):
+            kind = "nftables"
+        elif shutil.which("ipset"):
+            kind = "ipset"
+        else:
+            print("[Firewall] ⚠ nft / ipset 없음 → 차단은 기록만 됨 (FakeBackend)", file=sys.stderr)
+            kind = "fake"
+    if kind not in BACKENDS:
+        raise ValueError(f"알 수 없는 방화벽 백엔드: {kind}")
+    return BACKENDS[kind](use_sudo=use_sudo)
+
+
+class BatchBlocker:
+    """
+    차단 요청을 모았다가 flush() 때 한 트랜잭션으로 적용
+    (폭주 시 임계값 콜백이 IP 마다 프로세스를 띄우지 않도록)
+    """
+
+    def __init__(self, backend: FirewallBackend, max_batch: int = 1000,
+                 protected: Optional[ProtectedNetworks] = None):
+        self.backend = backend
+        self.max_batch = max_batch
+        self.protected = protected
+        self._pending: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.applied = 0
+        self.failed = 0
+
+    def validate(self, ip: str) -> str:
+        """정규화된 IP 반환 (잘못된 주소 / 보호 주소면 ValueError)"""
+        ip = normalize_ip(ip)
+        reason = self.protected.reason(ip) if self.protected else None
+        if reason:
+            raise ValueError(f"{ip} 차단 거부: {reason}")
+        return ip
+
+    def request(self, ip: str, duration: int = 0) -> str:
+        """차단 예약 (같은 IP 가 여러 번 오면 마지막 duration), 정규화된 IP 반환"""
+        ip = self.validate(ip)
+        with self._lock:
+            self._pending[ip] = max(0, int(duration))
+        return ip
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> list[Entry]:
+        """
+        예약된 차단을 max_batch 개씩 적용, 적용한 항목 반환
+        배치가 실패하면 그 배치와 남은 배치를 다시 예약하고 FirewallError (다음 flush 때 재시도,
+        그 사이 같은 IP 가 다시 예약됐으면 새 duration 우선)
+        """
+        with self._lock:
+            entries, self._pending = list(self._pending.items()), {}
+        applied = []
+        for start in range(0, len(entries), self.max_batch):
+            batch = entries[start:start + self.max_batch]
+            try:
+                self.backend.add(batch)
+            except FirewallError:
+                self.failed += len(batch)
+                with self._lock:
+                    self._pending = {**dict(entries[start:]), **self._pending}
+                raise
+            self.applied += len(batch)
+            applied.extend(batch)
+        return applied
@@ -0,0 +1,189 @@
+"""
+mcp_server/llm_client.py
+공유 LLM HTTP 클라이언트
+- base_url 당 하나의 httpx.AsyncClient 공유 (커넥션 풀 / keep-alive 튜닝)
+- h2 패키지가 있으면 HTTP/2 사용 (https 엔드포인트에서 ALPN 협상)
+- 서킷 브레이커: 연속 실패 / 타임아웃 시 쿨다운 동안 즉시 실패, 재오픈마다 지수 백오프
+  (성공은 응답 본문을 끝까지 읽은 뒤에만 기록, half_open 에서는 시험 호출 1개만 통과)
+- 메트릭: 브레이커 상태, 실패 / 차단 횟수, 지연시간 백분위수
+"""
+
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+POOL_LIMITS = httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=60.0)
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출을 보내지 않음"""
+
+
+class CircuitBreaker:
+    """closed → (연속 실패) → open → (쿨다운 경과) → half_open → 성공 시 closed / 실패 시 open"""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 10.0, max_cooldown: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+        self.open_count = 0
+        self.short_circuited = 0
+        self.probing = False   # half_open 시험 호출이 진행 중
+
+    def allow(self) -> bool:
+        if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+            # 쿨다운 경과: 시험 호출 1회 허용
+            self.state = "half_open"
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        if self.state != "closed":
+            # open 이거나, 시험 호출 결과를 기다리는 중
+            self.short_circuited += 1
+            return False
+        return True
+
+    def release(self):
+        """시험 호출이 성공 / 실패 기록 없이 끝났으면 (취소 등) 다음 호출이 다시 시험할 수 있게 함"""
+        self.probing = False
+
+    def record_success(self):
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.probing = False
+        if self.state == "half_open":
+            # 시험 호출 실패: 쿨다운을 두 배로 (지터 포함)
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown) * random.uniform(0.9, 1.1)
+            self._open()
+        elif self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.monotonic()
+        self.open_count += 1
+
+    def retry_in(self) -> float:
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+
+class LLMClient:
+    """서킷 브레이커가 적용된 공유 HTTP 클라이언트"""
+
+    def __init__(self, base_url: str, timeout: httpx.Timeout, breaker: Optional[CircuitBreaker] = None):
+        self.base_url = base_url.rstrip('/')
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=POOL_LIMITS,
+            http2=HTTP2_AVAILABLE,
+        )
+        self.breaker = breaker or CircuitBreaker()
+        self.latencies: deque[float] = deque(maxlen=500)
+        self.calls = 0
+        self.errors = 0
+        self.refs = 0
+
+    @asynccontextmanager
+    async def stream(self, method: str, path: str, **kwargs):
+        """
+        브레이커 검사 후 스트리밍 요청
+        - 5xx 응답 / 본문을 읽는 도중의 예외(읽기 타임아웃, 연결 끊김 포함)는 실패로 기록
+        - 성공은 호출 측이 본문 처리를 예외 없이 마친 뒤에만 기록 (생성이 멈춘 경우도 실패가 누적되도록)
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"LLM 서킷 open ({self.breaker.retry_in():.0f}초 후 재시도)")
+        probe = self.breaker.state == "half_open"
+
+        self.calls += 1
+        started = time.monotonic()
+        failed = False
+        try:
+            async with self.client.stream(method, path, **kwargs) as response:
+                if response.status_code >= 500:
+                    failed = True
+                    self._failure()
+                yield response
+            if not failed:
+                self.breaker.record_success()
+        except Exception:
+            if not failed:
+                self._failure()
+            raise
+        finally:
+            if probe:
+                self.breaker.release()
+            self.latencies.append(time.monotonic() - started)
+
+    def _failure(self):
+        self.errors += 1
+        self.breaker.record_failure()
+
+    def metrics(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> Optional[int]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000)
+
+        return {
+            "base_url": self.base_url,
+            "http2": HTTP2_AVAILABLE,
+            "state": self.breaker.state,
+            "retry_in_s": round(self.breaker.retry_in(), 1),
+            "calls": self.calls,
+            "errors": self.errors,
+            "opened": self.breaker.open_count,
+            "short_circuited": self.breaker.short_circuited,
+            "latency_ms": {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99)},
+        }
+
+
+_clients: dict[str, LLMClient] = {}
+
+
+def get_llm_client(
+    base_url: str,
+    timeout: httpx.Timeout,
+    failure_threshold: int = 3,
+    cooldown: float = 10.0,
+) -> LLMClient:
+    """base_url 별 공유 클라이언트 반환 (참조 카운트 증가)"""
+    key = base_url.rstrip('/')
+    client = _clients.get(key)
+    if client is None:
+        breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown=cooldown)
+        client = _clients[key] = LLMClient(key, timeout, breaker)
+    client.refs += 1
+    return client
+
+
+async def release_llm_client(client: LLMClient):
+    """참조 카운트 감소, 마지막 사용자가 해제하면 커넥션 풀 종료"""
+    client.refs -= 1
+    if client.refs <= 0:
+        _clients.pop(client.base_url, None)
+        await client.client.aclose()
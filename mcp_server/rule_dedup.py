@@ -0,0 +1,319 @@
+"""
+mcp_server/rule_dedup.py
+Suricata 룰 중복 / 유사 룰 탐지
+- msg, sid, rev 등 탐지에 영향 없는 옵션을 제거한 정규형(canonical form) 생성
+- 정규형 해시 인덱스로 완전 중복을 O(1)에 거부
+- MinHash LSH + Jaccard 유사도로 유사 룰(near-duplicate) 플래그
+- 파싱할 수 없는 룰은 sid / rev 를 뺀 원문(공백 정리)으로만 완전 중복 비교
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Optional
+
+# 매칭 결과에 영향을 주지 않는 옵션 (정규화 시 제거)
+NON_MATCHING_KEYWORDS = {"msg", "sid", "rev", "gid", "reference", "metadata"}
+
+# 직전 content/pcre 에 붙는 수정자 (순서 유지 대상)
+CONTENT_MODIFIERS = {
+    "nocase", "depth", "offset", "distance", "within", "fast_pattern",
+    "rawbytes", "startswith", "endswith", "isdataat", "bsize",
+    "http_uri", "http_raw_uri", "http_header", "http_raw_header",
+    "http_cookie", "http_method", "http_client_body", "http_server_body",
+    "http_stat_code", "http_stat_msg", "http_user_agent", "http_host",
+    "http_raw_host",
+}
+
+# 버퍼를 시작하는 키워드 (이후 content 의 의미가 바뀌므로 순서 유지)
+BUFFER_KEYWORDS = {"content", "pcre", "byte_test", "byte_jump", "byte_extract"}
+
+RULE_ACTIONS = ("alert", "drop", "reject", "pass")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+# 따옴표 안의 ';' 와 '\;' 이스케이프를 건너뛰며 옵션 단위로 분리
+_OPTION_RE = re.compile(r'(?:[^;"\\]|\\.|"(?:[^"\\]|\\.)*"?)+')
+
+# 헤더 필드: 공백이 들어갈 수 있는 [..] 그룹 (부정 '!' / 한 단계 중첩 포함) 또는 공백 없는 토큰
+_FIELD = r"(!?\[(?:[^\[\]]|\[[^\[\]]*\])*\]|\S+)"
+_HEADER_RE = re.compile(
+    rf"^\s*(\S+)\s+(\S+)\s+{_FIELD}\s+{_FIELD}\s+(->|<>)\s+{_FIELD}\s+{_FIELD}\s*\((.*)\)\s*;?\s*$", re.S
+)
+
+# 파싱 실패 룰의 원문 비교용: 룰마다 달라지는 sid / rev 제거
+_RAW_SID_RE = re.compile(r"\b(?:sid|rev)\s*:\s*\d+\s*;?", re.I)
+_SID_RE = re.compile(r"\bsid\s*:\s*(\d+)", re.I)
+
+
+def split_options(body: str) -> list[tuple[str, str]]:
+    """룰 옵션 문자열을 (키워드, 값) 리스트로 분리 (따옴표 / 이스케이프 고려)"""
+    return [_split_keyword(token) for token in _OPTION_RE.findall(body) if token.strip()]
+
+
+def _split_keyword(token: str) -> tuple[str, str]:
+    if ":" not in token:
+        return token.strip().lower(), ""
+    key, value = token.split(":", 1)
+    return key.strip().lower(), value.strip()
+
+
+def _normalize_value(value: str) -> str:
+    # 따옴표 밖의 공백만 정리 (content 값 자체는 그대로 유지)
+    if value.startswith('"') and value.endswith('"'):
+        return value
+    return re.sub(r"\s*,\s*", ",", re.sub(r"\s+", " ", value))
+
+
+@dataclass
+class ParsedRule:
+    action: str
+    header: tuple[str, ...]
+    options: list[tuple[str, str]]
+
+    @property
+    def sid(self) -> Optional[int]:
+        for key, value in self.options:
+            if key == "sid":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+
+def parse_rule(rule: str) -> Optional[ParsedRule]:
+    """룰 한 줄을 헤더 / 옵션으로 파싱 (형식이 맞지 않으면 None)"""
+    match = _HEADER_RE.match(rule)
+    if not match:
+        return None
+    action, proto, src, sport, direction, dst, dport, body = match.groups()
+    if action.lower() not in RULE_ACTIONS:
+        return None
+    header = (proto.lower(), *(_normalize_field(f) for f in (src, sport)), direction,
+              *(_normalize_field(f) for f in (dst, dport)))
+    return ParsedRule(action=action.lower(), header=header, options=split_options(body))
+
+
+def _normalize_field(field: str) -> str:
+    # [80, 443] 와 [80,443] 은 같은 헤더
+    return re.sub(r"\s+", "", field) if "[" in field else field
+
+
+def raw_text(rule: str) -> str:
+    """파싱할 수 없는 룰의 비교용 원문 (sid / rev 제거, 공백 정리)"""
+    return re.sub(r"\s+", " ", _RAW_SID_RE.sub("", rule)).strip().rstrip(";").strip()
+
+
+def canonicalize(rule: str) -> Optional[str]:
+    """
+    룰의 정규형 생성
+    - msg / sid / rev 등 비매칭 옵션 제거
+    - 독립 옵션(flow, classtype, threshold 등)은 정렬
+    - content/pcre 와 그 수정자 체인은 상대 위치 의미가 있으므로 순서 유지
+    """
+    parsed = parse_rule(rule)
+    if parsed is None:
+        return None
+    return _canonical(parsed)
+
+
+def _canonical(parsed: ParsedRule) -> str:
+    independent = []
+    chains: list[list[str]] = []
+    in_buffer = False
+
+    for key, value in parsed.options:
+        if key in NON_MATCHING_KEYWORDS:
+            continue
+        item = f"{key}:{_normalize_value(value)}" if value else key
+
+        if key in BUFFER_KEYWORDS or ("." in key and not value):
+            # content/pcre 또는 sticky buffer(http.uri; 등)는 새 체인 시작
+            chains.append([item])
+            in_buffer = True
+        elif key in CONTENT_MODIFIERS and in_buffer:
+            chains[-1].append(item)
+        else:
+            independent.append(item)
+
+    independent.sort()
+    parts = [parsed.action, " ".join(parsed.header)]
+    parts.extend(independent)
+    parts.extend(" ".join(chain) for chain in chains)
+    return " | ".join(parts)
+
+
+def rule_features(rule: str) -> set[str]:
+    """유사도 계산용 특징 집합 (헤더 필드 + 정규화된 옵션 + content 값)"""
+    parsed = parse_rule(rule)
+    if parsed is None:
+        return set()
+    return _features(parsed)
+
+
+def _features(parsed: ParsedRule) -> set[str]:
+    features = {f"action:{parsed.action}"}
+    names = ("proto", "src", "sport", "dir", "dst", "dport")
+    features.update(f"{name}:{value}" for name, value in zip(names, parsed.header))
+
+    for key, value in parsed.options:
+        if key in NON_MATCHING_KEYWORDS:
+            continue
+        features.add(f"{key}:{_normalize_value(value)}" if value else key)
+        if key == "content":
+            # content 값 자체도 대소문자 무시 특징으로 추가
+            features.add("c:" + value.strip('"').lower())
+    return features
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class DedupVerdict:
+    status: str                      # "new" | "duplicate" | "near_duplicate" | "invalid"(파싱 실패, 원문 중복 아님)
+    canonical: Optional[str] = None
+    match_sid: Optional[int] = None
+    similarity: float = 0.0
+
+
+class RuleIndex:
+    """정규형 해시 인덱스 + MinHash LSH 유사 룰 인덱스"""
+
+    HASH_CACHE_SIZE = 20000
+
+    def __init__(self, near_threshold: float = 0.85, num_perm: int = 16, bands: int = 4):
+        self.near_threshold = near_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._perms = [
+            (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "little") | 1,
+             int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "little"))
+            for i in range(num_perm)
+        ]
+
+        self._by_hash: dict[str, Optional[int]] = {}
+        self._raw: dict[str, Optional[int]] = {}    # 파싱 실패 룰: raw_text 해시 → sid
+        self._features: dict[str, set[str]] = {}
+        self._buckets: dict[tuple[int, bytes], set[str]] = {}
+        self._hash_cache: dict[str, tuple[int, ...]] = {}
+        self.sids: set[int] = set()
+
+    def __len__(self):
+        return len(self._by_hash) + len(self._raw)
+
+    @staticmethod
+    def _digest(canonical: str) -> str:
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _minhash(self, features: set[str]) -> list[int]:
+        # 특징 하나당 해시 1회 + (a*x + b) mod p 로 num_perm 개의 순열 근사
+        if not features:
+            return [_MERSENNE_PRIME] * self.num_perm
+        return list(map(min, *(self._feature_hashes(feature) for feature in features)))
+
+    def _feature_hashes(self, feature: str) -> tuple[int, ...]:
+        # 헤더 필드 / flow 등 반복되는 특징이 많으므로 순열 해시를 캐시
+        cached = self._hash_cache.get(feature)
+        if cached is None:
+            x = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            cached = tuple((a * x + b) % _MERSENNE_PRIME for a, b in self._perms)
+            if len(self._hash_cache) < self.HASH_CACHE_SIZE:
+                self._hash_cache[feature] = cached
+        return cached
+
+    def _band_keys(self, signature: list[int]) -> list[tuple[int, bytes]]:
+        keys = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows]
+            keys.append((band, hashlib.blake2b(repr(chunk).encode(), digest_size=8).digest()))
+        return keys
+
+    def check(self, rule: str) -> DedupVerdict:
+        """룰 삽입 전 중복 여부 판정 (인덱스는 변경하지 않음)"""
+        parsed = parse_rule(rule)
+        if parsed is None:
+            # 정규화 / 유사도 비교는 불가능하지만 같은 원문은 중복으로 거부
+            raw = raw_text(rule)
+            digest = self._digest(raw)
+            if digest in self._raw:
+                return DedupVerdict(status="duplicate", canonical=raw,
+                                    match_sid=self._raw[digest], similarity=1.0)
+            return DedupVerdict(status="invalid", canonical=raw)
+        canonical = _canonical(parsed)
+
+        digest = self._digest(canonical)
+        if digest in self._by_hash:
+            return DedupVerdict(status="duplicate", canonical=canonical,
+                                match_sid=self._by_hash[digest], similarity=1.0)
+
+        features = _features(parsed)
+        best_digest, best_score = None, 0.0
+        candidates = set()
+        for key in self._band_keys(self._minhash(features)):
+            candidates |= self._buckets.get(key, set())
+        for candidate in candidates:
+            score = jaccard(features, self._features[candidate])
+            if score > best_score:
+                best_digest, best_score = candidate, score
+
+        if best_digest is not None and best_score >= self.near_threshold:
+            return DedupVerdict(status="near_duplicate", canonical=canonical,
+                                match_sid=self._by_hash.get(best_digest), similarity=round(best_score, 3))
+        return DedupVerdict(status="new", canonical=canonical, similarity=round(best_score, 3))
+
+    def add(self, rule: str) -> bool:
+        """룰을 인덱스에 등록 (이미 있으면 False)"""
+        parsed = parse_rule(rule)
+        if parsed is None:
+            return self._add_raw(rule)
+        canonical = _canonical(parsed)
+
+        sid = parsed.sid
+        if sid is not None:
+            self.sids.add(sid)
+
+        digest = self._digest(canonical)
+        if digest in self._by_hash:
+            return False
+
+        features = _features(parsed)
+        self._by_hash[digest] = sid
+        self._features[digest] = features
+        for key in self._band_keys(self._minhash(features)):
+            self._buckets.setdefault(key, set()).add(digest)
+        return True
+
+    def _add_raw(self, rule: str) -> bool:
+        match = _SID_RE.search(rule)
+        sid = int(match.group(1)) if match else None
+        if sid is not None:
+            self.sids.add(sid)
+        digest = self._digest(raw_text(rule))
+        if digest in self._raw:
+            return False
+        self._raw[digest] = sid
+        return True
+
+    def load_lines(self, lines: Iterable[str]) -> int:
+        loaded = 0
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if self.add(line):
+                loaded += 1
+        return loaded
+
+    def load_file(self, path: Path) -> int:
+        """룰 파일 전체를 인덱스에 적재 (없으면 0)"""
+        if not path.exists():
+            return 0
+        with open(path, "r", errors="ignore") as f:
+            return self.load_lines(f)
@@ -0,0 +1,182 @@
+"""
+mcp_server/rule_templates.py
+룰 템플릿 고속 경로
+- 잘 알려진 공격 유형(포트 스캔, 브루트 포스, SQLi, XSS)은 LLM 없이 템플릿으로 즉시 생성
+- 알림의 category / signature_id 범위 / dest_port 로 템플릿 분류
+- 평판 기반 출발지(ip_block)는 룰을 만들지 않음 → 호출 측이 차단 목록 / 방화벽으로 TTL 차단
+  (차단기가 없으면 LLM 으로 넘기고 skipped_no_blocker 로 집계)
+- 템플릿 적중 / LLM 위임 횟수 집계
+(old backup/mcp_server/rule_manager.py 의 RuleTemplate 이식, sid / rev 추가)
+"""
+
+from collections import Counter
+from typing import Callable, Optional
+
+# 템플릿 룰 전용 SID 범위 (LLM 은 9000000-9999999 전체를 사용하므로 상단 구간을 예약)
+TEMPLATE_SID_RANGE = (9800000, 9899999)
+
+# 평판 기반 룰 SID 범위 (ET DROP / CINS / COMPROMISED / TOR) → 출발지 IP 차단
+REPUTATION_SID_RANGES = [
+    (2400000, 2403999),
+    (2500000, 2500999),
+    (2520000, 2522999),
+]
+
+BRUTE_FORCE_PORTS = {21, 22, 23, 25, 110, 143, 445, 1433, 3306, 3389, 5432, 5900}
+WEB_PORTS = {80, 443, 8000, 8080, 8443}
+
+SCAN_CATEGORIES = {"Detection of a Network Scan", "Attempted Information Leak"}
+WEB_CATEGORIES = {"Web Application Attack", "Attempted User Privilege Gain"}
+ADMIN_CATEGORIES = {
+    "Attempted Administrator Privilege Gain",
+    "Attempted User Privilege Gain",
+    "Misc Attack",
+    "Detection of a Network Scan",
+}
+MALWARE_CATEGORIES = {
+    "A Network Trojan was Detected",
+    "Malware Command and Control Activity Detected",
+    "Known Bad IP",
+}
+
+
+# 룰이 아니라 출발지 IP 차단으로 처리하는 템플릿
+BLOCK_TEMPLATES = {"ip_block"}
+
+
+class RuleTemplate:
+    """룰 템플릿 생성기"""
+
+    @staticmethod
+    def create_port_scan_rule(sid: int) -> str:
+        """포트 스캔 탐지 룰"""
+        return (
+            'alert tcp $EXTERNAL_NET any -> $HOME_NET any '
+            '(msg:"Auto-generated: Possible Port Scan"; '
+            'flags:S; threshold:type threshold,track by_src,count 20,seconds 60; '
+            f'classtype:attempted-recon; priority:2; sid:{sid}; rev:1;)'
+        )
+
+    @staticmethod
+    def create_brute_force_rule(port: int, sid: int) -> str:
+        """브루트 포스 탐지 룰"""
+        return (
+            f'alert tcp $EXTERNAL_NET any -> $HOME_NET {port} '
+            f'(msg:"Auto-generated: Brute Force Attempt on Port {port}"; '
+            f'flow:to_server; flags:S; '
+            f'threshold:type both,track by_src,count 5,seconds 60; '
+            f'classtype:attempted-admin; priority:1; sid:{sid}; rev:1;)'
+        )
+
+    @staticmethod
+    def create_sql_injection_rule(sid: int) -> str:
+        """SQL Injection 탐지 룰"""
+        return (
+            'alert http $EXTERNAL_NET any -> $HOME_NET any '
+            '(msg:"Auto-generated: Possible SQL Injection"; '
+            'flow:to_server,established; '
+            'http.uri; content:"SELECT"; nocase; content:"FROM"; nocase; distance:0; '
+            f'classtype:web-application-attack; priority:1; sid:{sid}; rev:1;)'
+        )
+
+    @staticmethod
+    def create_xss_rule(sid: int) -> str:
+        """XSS 탐지 룰"""
+        return (
+            'alert http $EXTERNAL_NET any -> $HOME_NET any '
+            '(msg:"Auto-generated: Possible XSS Attack"; '
+            'flow:to_server,established; '
+            'http.uri; content:"<script"; nocase; '
+            f'classtype:web-application-attack; priority:2; sid:{sid}; rev:1;)'
+        )
+
+
+def _in_ranges(value: int, ranges: list[tuple[int, int]]) -> bool:
+    return any(low <= value <= high for low, high in ranges)
+
+
+def _signature(alert: dict) -> str:
+    return (alert.get("signature") or "").upper()
+
+
+# (템플릿 이름, 매칭 조건) — 위에서부터 먼저 맞는 템플릿 사용
+CLASSIFIERS: list[tuple[str, Callable[[dict], bool]]] = [
+    ("ip_block", lambda a: _in_ranges(a.get("signature_id") or 0, REPUTATION_SID_RANGES)
+        or (a.get("category") in MALWARE_CATEGORIES and a.get("severity") == 1)),
+    ("sql_injection", lambda a: "SQL" in _signature(a)
+        and (a.get("category") in WEB_CATEGORIES or a.get("dest_port") in WEB_PORTS)),
+    ("xss", lambda a: ("XSS" in _signature(a) or "CROSS SITE SCRIPTING" in _signature(a))
+        and (a.get("category") in WEB_CATEGORIES or a.get("dest_port") in WEB_PORTS)),
+    ("brute_force", lambda a: a.get("dest_port") in BRUTE_FORCE_PORTS
+        and (a.get("category") in ADMIN_CATEGORIES or "BRUTE" in _signature(a) or "LOGIN" in _signature(a))),
+    ("port_scan", lambda a: a.get("category") in SCAN_CATEGORIES or " SCAN " in f" {_signature(a)} "),
+]
+
+
+class TemplateClassifier:
+    """알림 → 템플릿 분류기 (LLM 호출 전 고속 경로)"""
+
+    def __init__(self):
+        self.hits: Counter = Counter()
+        self.llm_fallbacks = 0
+        self.misses = 0
+        self.block_skipped = 0   # 차단 템플릿이지만 차단기(auto_block)가 없어 LLM 으로 넘긴 알림
+        self._next_sid: Optional[int] = None
+
+    def classify(self, alert: dict) -> Optional[str]:
+        for name, matches in CLASSIFIERS:
+            if matches(alert):
+                return name
+        return None
+
+    def render(self, name: str, alert: dict, sid: int) -> str:
+        if name == "brute_force":
+            return RuleTemplate.create_brute_force_rule(alert.get("dest_port"), sid)
+        if name == "sql_injection":
+            return RuleTemplate.create_sql_injection_rule(sid)
+        if name == "xss":
+            return RuleTemplate.create_xss_rule(sid)
+        return RuleTemplate.create_port_scan_rule(sid)
+
+    def generate(self, alert: dict, used_sids: set[int]) -> Optional[tuple[str, str]]:
+        """
+        템플릿이 있으면 (템플릿 이름, 룰) 반환, 없으면 None (LLM 위임)
+        BLOCK_TEMPLATES 는 룰 템플릿이 없으므로 None (호출 측이 차단하거나 LLM 으로 넘김)
+        """
+        name = self.classify(alert)
+        if name is None:
+            self.misses += 1
+            return None
+        if name in BLOCK_TEMPLATES:
+            return None
+        self.hits[name] += 1
+        return name, self.render(name, alert, self.next_sid(used_sids))
+
+    def next_sid(self, used_sids: set[int]) -> int:
+        """
+        템플릿 SID 범위에서 사용되지 않은 다음 SID (최초 1회만 기존 SID 스캔)
+        예약하지 않음: 룰이 실제로 삽입될 때 RuleIndex.add 가 used_sids 에 등록하므로
+        중복으로 거부된 룰의 SID 는 다음 룰이 다시 사용
+        """
+        if self._next_sid is None:
+            low, high = TEMPLATE_SID_RANGE
+            in_range = [sid for sid in used_sids if low <= sid <= high]
+            self._next_sid = max(in_range) + 1 if in_range else low
+        while self._next_sid in used_sids:
+            self._next_sid += 1
+        return self._next_sid
+
+    def record_llm(self):
+        self.llm_fallbacks += 1
+
+    def stats(self) -> dict:
+        template_total = sum(self.hits.values())
+        total = template_total + self.llm_fallbacks
+        return {
+            "template_hits": dict(self.hits),
+            "template_total": template_total,
+            "llm_calls": self.llm_fallbacks,
+            "unclassified": self.misses,
+            "skipped_no_blocker": self.block_skipped,
+            "template_hit_rate": round(template_total / total, 3) if total else None,
+        }
@@ -0,0 +1,72 @@
+"""
+mcp_server/sensors.py
+다중 센서 eve.json 소스 목록
+- 설정의 경로 / glob / {"path", "sensor"} 항목을 (경로, 센서 이름) 목록으로 확장
+- 센서 이름 기본값: eve.json 이면 상위 디렉토리 이름 (/data/sensors/eth0/eve.json → eth0),
+  eve-<이름>.json 이면 <이름>
+- 센서 이름은 표시 / 알림 태그용 (중복 접미사는 발견 순서에 따라 달라질 수 있음),
+  체크포인트 등 상태 파일은 경로에서 만든 sensor_key 로 저장
+"""
+
+import glob
+import hashlib
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+SourceSpec = Union[str, dict]
+
+
+def sensor_name(path: Path) -> str:
+    """경로에서 센서 이름 추출 (회전 / 압축 접미사 무시: eve.json.1, eve-eth0.json.2.gz)"""
+    path = Path(path)
+    base = path.name.split(".json")[0]
+    for prefix in ("eve-", "eve_"):
+        if base.startswith(prefix) and len(base) > len(prefix):
+            return base[len(prefix):]
+    if base in ("eve", ""):
+        return path.parent.name or "default"
+    return base
+
+
+def sensor_key(path: Path) -> str:
+    """<센서 이름>-<절대 경로 해시> — 설정 순서 / glob 결과 순서와 무관하게 같은 파일이면 같은 키"""
+    path = Path(path)
+    digest = hashlib.blake2b(str(path.resolve()).encode(), digest_size=6).hexdigest()
+    return f"{sensor_name(path)}-{digest}"
+
+
+def _unique(name: str, taken: set[str]) -> str:
+    candidate, n = name, 2
+    while candidate in taken:
+        candidate = f"{name}-{n}"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+def expand_sources(specs: Iterable[SourceSpec], taken: Optional[set[str]] = None,
+                   known: Optional[set[Path]] = None) -> list[tuple[Path, str]]:
+    """
+    소스 설정 → [(경로, 센서 이름)]
+    - glob 패턴은 현재 존재하는 파일만, 일반 경로는 아직 없어도 포함 (생성 대기)
+    - known 에 있는 경로는 건너뜀 (주기적 재검색 시 새 파일만 추가)
+    - taken: 이미 사용 중인 센서 이름 (중복 시 -2, -3 … 접미사)
+    """
+    taken = set() if taken is None else taken
+    known = set() if known is None else known
+    sources = []
+    for spec in specs:
+        if isinstance(spec, dict):
+            pattern, explicit = spec.get("path", ""), spec.get("sensor")
+        else:
+            pattern, explicit = spec, None
+        if not pattern:
+            continue
+        paths = [Path(p) for p in sorted(glob.glob(pattern))] if glob.has_magic(pattern) else [Path(pattern)]
+        for path in paths:
+            if path in known:
+                continue
+            known.add(path)
+            name = explicit if explicit and len(paths) == 1 else sensor_name(path)
+            sources.append((path, _unique(name, taken)))
+    return sources
@@ -0,0 +1,312 @@
+"""
+mcp_server/sketches.py
+스트리밍 요약 구조 (메모리 상한이 정해진 근사 집계)
+- SpaceSaving: 상위 K 빈도 항목 (heavy hitter), 항목 수와 무관하게 capacity 개만 유지
+- WindowedTopK: 시간 버킷별 SpaceSaving → 최근 N시간 창의 상위 K (src_ip / signature / dest_port …)
+  닫힌 버킷의 병합 결과는 캐시 → 조회는 캐시 + 현재 버킷 병합 1회 (O(capacity))
+  (창은 버킷 단위로 반올림: 현재 버킷 + 그 이전 window / bucket_seconds 개)
+- HyperLogLog / WindowedDistinct: 버킷별 고유 개수 요약 (고유 src_ip 등), 버킷 / 센서끼리 병합 가능
+"""
+
+import hashlib
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from operator import itemgetter
+from typing import Hashable, Iterable, Optional
+
+
+class SpaceSaving:
+    """
+    Space-Saving (Metwally et al.) — 가득 차면 최소 count 항목을 새 항목으로 교체
+    count 는 과대 추정치, count - error 는 실제 빈도의 하한
+    """
+
+    __slots__ = ("capacity", "counts", "errors", "_heap", "_seq")
+
+    def __init__(self, capacity: int = 128):
+        self.capacity = capacity
+        self.counts: dict[Hashable, int] = {}
+        self.errors: dict[Hashable, int] = {}
+        self._heap: Optional[list] = None   # 가득 찬 뒤에만 사용 (count, 순번, 항목) 지연 삭제 힙
+        self._seq = itertools.count()       # 같은 count 끼리는 순번으로 비교 (int / str 항목 혼재 시 항목 비교 방지)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def full(self) -> bool:
+        return len(self.counts) >= self.capacity
+
+    def offer(self, item: Hashable, weight: int = 1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += weight
+        elif len(counts) < self.capacity:
+            counts[item] = weight
+            self.errors[item] = 0
+            if len(counts) == self.capacity:
+                self._rebuild_heap()
+            return
+        else:
+            victim, floor = self._pop_min()
+            del counts[victim], self.errors[victim]
+            counts[item] = floor + weight
+            self.errors[item] = floor
+        if self._heap is not None:
+            heapq.heappush(self._heap, (counts[item], next(self._seq), item))
+            if len(self._heap) > 4 * self.capacity:
+                self._rebuild_heap()
+
+    def _rebuild_heap(self):
+        self._heap = [(count, next(self._seq), item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _pop_min(self) -> tuple[Hashable, int]:
+        while True:
+            count, _, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return item, count
+
+    def min_count(self) -> int:
+        """가득 찼을 때 최소 count (없는 항목의 빈도 상한), 아니면 0"""
+        if not self.full:
+            return 0
+        while True:
+            count, _, item = self._heap[0]
+            if self.counts.get(item) == count:
+                return count
+            heapq.heappop(self._heap)
+
+    def top(self, k: int) -> list[tuple[Hashable, int, int]]:
+        """상위 k 개 [(항목, count, error)]"""
+        return [(item, count, self.errors[item])
+                for item, count in heapq.nlargest(k, self.counts.items(), key=itemgetter(1))]
+
+    @classmethod
+    def merge(cls, sketches: Iterable["SpaceSaving"], capacity: int) -> "SpaceSaving":
+        """
+        여러 요약을 합쳐 capacity 개로 축소
+        (어떤 요약에 없는 항목은 그 요약의 min_count 만큼 count 와 error 에 더함
+         → count 는 계속 과대 추정치, count - error 는 하한)
+        """
+        sketches = [s for s in sketches if s.counts]
+        merged = cls(capacity)
+        if not sketches:
+            return merged
+        counts: dict = {}
+        errors: dict = {}
+        floors = [s.min_count() for s in sketches]
+        floor_total = sum(floors)
+        for sketch, floor in zip(sketches, floors):
+            for item, count in sketch.counts.items():
+                if item in counts:
+                    counts[item] += count - floor
+                    errors[item] += sketch.errors[item] - floor
+                else:
+                    counts[item] = count + floor_total - floor
+                    errors[item] = sketch.errors[item] + floor_total - floor
+        for item, count in heapq.nlargest(capacity, counts.items(), key=itemgetter(1)):
+            merged.counts[item] = count
+            merged.errors[item] = errors[item]
+        if merged.full:
+            merged._rebuild_heap()
+        return merged
+
+
+class WindowedTopK:
+    """
+    필드별 상위 K 를 시간 버킷 단위로 유지 (버킷 수 상한 → 메모리 상한)
+    - add(): 이벤트 시각의 버킷에 반영 (늦게 온 이벤트는 최신 버킷에 근사 반영)
+    - top(): windows 중 하나의 창(초)에 대해 필드별 상위 k
+    """
+
+    def __init__(self, fields: Iterable[str], windows: Iterable[int] = (3600, 21600, 86400),
+                 bucket_seconds: int = 300, capacity: int = 128):
+        self.fields = tuple(fields)
+        self.windows = tuple(sorted(windows))
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self._buckets: deque = deque(maxlen=self.windows[-1] // bucket_seconds + 1)   # (index, {field: SpaceSaving})
+        self._read_index = 0
+        self._version = 0   # 닫힌 버킷이 바뀌면 증가 → 창 캐시 무효화
+        self._cache: dict[int, tuple] = {}
+
+    def add(self, alert: dict, epoch: Optional[float] = None):
+        index = int((epoch if epoch is not None else time.time()) // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1][0] < index:
+            self._buckets.append((index, {field: SpaceSaving(self.capacity) for field in self.fields}))
+        bucket_index, sketches = self._buckets[-1]
+        if bucket_index < self._read_index:
+            self._version += 1
+        for field in self.fields:
+            value = alert.get(field)
+            if value is not None and value != "":
+                sketches[field].offer(value)
+
+    def window_for(self, seconds: float) -> int:
+        """요청한 길이 이상인 가장 작은 창 (없으면 가장 큰 창)"""
+        for window in self.windows:
+            if window >= seconds:
+                return window
+        return self.windows[-1]
+
+    def sketches(self, window: int, now: Optional[float] = None) -> dict[str, list[SpaceSaving]]:
+        """창에 해당하는 필드별 요약 목록 (닫힌 버킷 병합 캐시 + 현재 버킷)"""
+        now_index = int((now if now is not None else time.time()) // self.bucket_seconds)
+        self._read_index = max(self._read_index, now_index)
+        first = now_index - window // self.bucket_seconds
+
+        key = (now_index, self._version)
+        cached = self._cache.get(window)
+        if cached is None or cached[0] != key:
+            closed = [s for i, s in self._buckets if first <= i < now_index]
+            merged = {field: SpaceSaving.merge((s[field] for s in closed), self.capacity) for field in self.fields}
+            self._cache[window] = cached = (key, merged)
+
+        result = {field: [cached[1][field]] for field in self.fields}
+        if self._buckets and self._buckets[-1][0] == now_index:
+            for field in self.fields:
+                result[field].append(self._buckets[-1][1][field])
+        return result
+
+    def top(self, window: int, k: int = 10, now: Optional[float] = None) -> dict[str, list[tuple]]:
+        return top_k([self], window, k, now)
+
+
+def top_k(trackers: Iterable[WindowedTopK], window: int, k: int = 10,
+          now: Optional[float] = None) -> dict[str, list[tuple]]:
+    """여러 WindowedTopK (센서별) 를 합친 창의 필드별 상위 k [(항목, count, error)]"""
+    trackers = list(trackers)
+    if not trackers:
+        return {}
+    fields = trackers[0].fields
+    parts: dict[str, list[SpaceSaving]] = {field: [] for field in fields}
+    for tracker in trackers:
+        for field, sketches in tracker.sketches(window, now).items():
+            parts[field].extend(sketches)
+    capacity = trackers[0].capacity
+    return {field: SpaceSaving.merge(sketches, capacity).top(k) for field, sketches in parts.items()}
+
+
+class HyperLogLog:
+    """
+    HyperLogLog 고유 개수 추정 (레지스터 2^p 바이트, 표준 오차 약 1.04 / sqrt(2^p))
+    같은 p 끼리 레지스터별 max 로 병합 (버킷 / 센서 합산)
+    """
+
+    __slots__ = ("p", "m", "registers")
+
+    _INV_POW = [2.0 ** -r for r in range(66)]
+
+    def __init__(self, p: int = 12, registers: Optional[bytearray] = None):
+        self.p = p
+        self.m = 1 << p
+        self.registers = registers if registers is not None else bytearray(self.m)
+
+    def add(self, value):
+        h = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = self.m
+        registers = self.registers
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(map(self._INV_POW.__getitem__, registers))
+        if estimate <= 2.5 * m:
+            zeros = registers.count(0)
+            if zeros:
+                estimate = m * math.log(m / zeros)   # 작은 범위 보정 (linear counting)
+        return int(round(estimate))
+
+    @property
+    def error_rate(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    @classmethod
+    def merge(cls, sketches: Iterable["HyperLogLog"], p: int = 12) -> "HyperLogLog":
+        """
+        레지스터별 max — 레지스터 값은 7비트 이하이므로 전체를 큰 정수 하나로 보고
+        바이트마다 (b | 0x80) - a 의 최상위 비트로 b >= a 를 판별 (바이트 사이 자리내림 없음)
+        """
+        m = 1 << p
+        high = int.from_bytes(b"\x80" * m, "big")
+        merged = None
+        for sketch in sketches:
+            value = int.from_bytes(sketch.registers, "big")
+            if merged is None:
+                merged = value
+                continue
+            mask = ((((value | high) - merged) & high) >> 7) * 0xFF
+            merged ^= (merged ^ value) & mask
+        registers = bytearray(merged.to_bytes(m, "big")) if merged is not None else None
+        return cls(p, registers)
+
+
+class WindowedDistinct:
+    """
+    이름별 HyperLogLog 를 시간 버킷 단위로 유지 (retention 이내의 임의 창 고유 개수)
+    - add(): {"src_ip": ..., "dest_ip": ...} 처럼 이름 → 값
+    - sketches(): 창의 닫힌 버킷 병합 캐시 + 현재 버킷
+    """
+
+    def __init__(self, names: Iterable[str], bucket_seconds: int = 3600,
+                 retention: int = 7 * 86400, p: int = 12):
+        self.names = tuple(names)
+        self.bucket_seconds = bucket_seconds
+        self.retention = retention
+        self.p = p
+        self._buckets: deque = deque(maxlen=retention // bucket_seconds + 1)   # (index, {name: HyperLogLog})
+        self._read_index = 0
+        self._version = 0
+        self._cache: dict[int, tuple] = {}
+
+    def add(self, values: dict, epoch: Optional[float] = None):
+        index = int((epoch if epoch is not None else time.time()) // self.bucket_seconds)
+        if not self._buckets or self._buckets[-1][0] < index:
+            self._buckets.append((index, {name: HyperLogLog(self.p) for name in self.names}))
+        bucket_index, sketches = self._buckets[-1]
+        if bucket_index < self._read_index:
+            self._version += 1
+        for name, value in values.items():
+            if value is not None and value != "":
+                sketches[name].add(value)
+
+    def sketches(self, window: int, now: Optional[float] = None) -> dict[str, list[HyperLogLog]]:
+        now_index = int((now if now is not None else time.time()) // self.bucket_seconds)
+        self._read_index = max(self._read_index, now_index)
+        first = now_index - window // self.bucket_seconds
+
+        key = (now_index, self._version)
+        cached = self._cache.get(window)
+        if cached is None or cached[0] != key:
+            closed = [s for i, s in self._buckets if first <= i < now_index]
+            merged = {name: HyperLogLog.merge((s[name] for s in closed), self.p) for name in self.names}
+            self._cache[window] = cached = (key, merged)
+            if len(self._cache) > 16:
+                self._cache = {window: cached}
+
+        result = {name: [cached[1][name]] for name in self.names}
+        if self._buckets and self._buckets[-1][0] == now_index:
+            for name in self.names:
+                result[name].append(self._buckets[-1][1][name])
+        return result
+
+
+def distinct_counts(trackers: Iterable[WindowedDistinct], window: int,
+                    now: Optional[float] = None) -> dict[str, int]:
+    """여러 WindowedDistinct (센서별) 를 합친 창의 이름별 고유 개수 추정"""
+    trackers = list(trackers)
+    if not trackers:
+        return {}
+    parts: dict[str, list[HyperLogLog]] = {name: [] for name in trackers[0].names}
+    for tracker in trackers:
+        for name, sketches in tracker.sketches(window, now).items():
+            parts[name].extend(sketches)
+    p = trackers[0].p
+    return {name: HyperLogLog.merge(sketches, p).count() for name, sketches in parts.items()}
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Suricata MCP Server - 수정 버전
-- eve.json 실시간 모니터링
+- eve.json 실시간 모니터링 (다중 센서: 소스별 회전 추적 / 체크포인트, 알림에 sensor 태그)
 - 생성된 룰을 /etc/suricata/rules/suricata.rules에 직접 추가
 - 백업용으로 data/rules.json에도 저장
 - Ollama 자동 룰 생성
@@ -15,7 +15,10 @@ import io
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
+from collections import Counter
 import subprocess
+import time
+import re
 
 try:
     import httpx
@@ -23,6 +26,20 @@ except ImportError:
     print("ERROR: httpx 설치 필요 (pip install httpx)", file=sys.stderr)
     sys.exit(1)
 
+from rule_dedup import RuleIndex, parse_rule
+from llm_client import CircuitOpenError, get_llm_client, release_llm_client
+from rule_templates import BLOCK_TEMPLATES, TemplateClassifier
+from eve_watch import RECHECK_EVENTS, create_watcher
+from eve_reader import ChunkedLineReader
+from checkpoint import Checkpoint, find_rotated
+from sensors import expand_sources, sensor_key
+from eve_scan import ORDER_SLACK_SECONDS, SparseIndex, find_stream_offset, line_epoch, line_timestamp
+from alert_aggregator import AlertAggregator
+from alert_store import to_epoch
+from threat_scorer import IPThreat, ThreatScorer
+from firewall import BatchBlocker, FirewallError, ProtectedNetworks, create_backend
+from blocklist import BlockList
+
 # ================== 전역 상태 ==================
 alert_history: list[dict] = []
 generated_rules: list[dict] = []
@@ -32,6 +49,9 @@ processed_alerts: set[int] = set()
 DATA_DIR = Path("data")
 ALERTS_FILE = DATA_DIR / "alerts.json"
 RULES_FILE = DATA_DIR / "rules.json"
+METRICS_FILE = DATA_DIR / "metrics.json"
+CHECKPOINT_DIR = DATA_DIR / "checkpoints"  # 소스별 <sensor_key>.json (경로 기준, 센서 이름 순서와 무관)
+BLOCKLIST_FILE = DATA_DIR / "blocklist.db"  # 차단 목록 (API 와 공유)
 
 # 설정
 CONFIG_PATH = Path("config.json")
@@ -42,6 +62,7 @@ else:
     config = {
         "suricata": {
             "eve_log_path": "/var/log/suricata/eve.json",
+            "eve_sources": [],  # 다중 센서: 경로 / glob / {"path", "sensor"} (비어 있으면 eve_log_path)
             "rules_path": "/etc/suricata/rules",
             "main_rules_file": "/etc/suricata/rules/suricata.rules"  # 메인 룰 파일
         },
@@ -49,30 +70,117 @@ else:
             "backfill_lines": 50,
             "max_alerts": 1000,
             "auto_generate_rules": True,
-            "severity_threshold": 2
+            "severity_threshold": 2,
+            "dedup_rules": True,
+            "near_duplicate_threshold": 0.85,
+            "block_near_duplicates": True,
+            "rule_templates": True,
+            "read_chunk_bytes": 1048576,
+            "max_catchup_bytes_per_sec": 0,
+            "checkpoint_interval": 5,
+            "checkpoint_max_gap_bytes": 536870912,
+            "source_rescan_interval": 30,
+            "index_every_lines": 10000,
+            "index_every_seconds": 60,
+            "shed_lag_bytes": 67108864,
+            "shed_lag_seconds": 300,
+            "shed_keep_severity": 2,
+            "shed_sample_rate": 10,
+            "shed_max_counters": 10000,
+            "alerts_save_interval": 1.0,
+            "alert_aggregation_window": 60,  # 같은 (sensor, sid, src, dest, dport) 알림을 합치는 창 (초, 0 = 원본 그대로)
+            "alert_aggregation_max_keys": 50000,
+            "threat_threshold": 20,  # IP 위협 점수 임계값 (심각도 가중치 1:10, 2:5, 3:2, 그 외 1)
+            "threat_half_life": 300,  # 점수 반감기 (초)
+            "threat_idle_ttl": 3600,
+            "threat_max_ips": 100000,
+            "threat_whitelist": ["127.0.0.1"],
+            "auto_block": False,  # 임계값을 넘은 IP 를 방화벽 집합에 자동 추가
+            "auto_block_duration": 3600,  # 자동 차단 유지 시간 (초, 0 = 영구)
+            "reputation_block_duration": 86400,  # 평판 기반 룰(ET DROP / CINS 등) 출발지 차단 유지 시간 (초)
+            "firewall_backend": "auto",  # ipset / nftables / fake / auto
+            "firewall_use_sudo": True,
+            "firewall_protected": [],  # 자동 차단하지 않을 대역 (CIDR), 루프백 / 이 호스트 / 게이트웨이는 항상 제외
+            "block_flush_interval": 1.0,  # 차단 요청을 모아 한 트랜잭션으로 적용하는 주기 (초)
+            "blocklist_reconcile_interval": 300  # 방화벽 집합을 차단 목록에 맞추는 주기 (초)
         },
         "ollama": {
             "enabled": True,
             "base_url": "http://localhost:11434",
-            "model": "llama3.2:latest"
+            "model": "llama3.2:latest",
+            "num_predict": 256,
+            "num_ctx": 2048,
+            "stop": [],
+            "max_field_chars": 200,
+            "read_timeout": 30,
+            "breaker_failures": 3,
+            "breaker_cooldown": 10
         }
     }
 
 EVE_LOG_PATH = config["suricata"]["eve_log_path"]
+EVE_SOURCES = config["suricata"].get("eve_sources") or [EVE_LOG_PATH]
+SOURCE_RESCAN_INTERVAL = config["mcp_server"].get("source_rescan_interval", 30)
+INDEX_EVERY_LINES = config["mcp_server"].get("index_every_lines", 10000)
+INDEX_EVERY_SECONDS = config["mcp_server"].get("index_every_seconds", 60)
+# 부하 차단: 파일 끝보다 이만큼 뒤처지면 낮은 심각도 알림을 샘플링 / 집계하고 LLM 호출 생략
+SHED_LAG_BYTES = config["mcp_server"].get("shed_lag_bytes", 64 * 1024 * 1024)
+SHED_LAG_SECONDS = config["mcp_server"].get("shed_lag_seconds", 300)
+SHED_KEEP_SEVERITY = config["mcp_server"].get("shed_keep_severity", 2)
+SHED_SAMPLE_RATE = config["mcp_server"].get("shed_sample_rate", 10)
+SHED_MAX_COUNTERS = config["mcp_server"].get("shed_max_counters", 10000)
+ALERTS_SAVE_INTERVAL = config["mcp_server"].get("alerts_save_interval", 1.0)
+AGGREGATION_WINDOW = config["mcp_server"].get("alert_aggregation_window", 60)
+AGGREGATION_MAX_KEYS = config["mcp_server"].get("alert_aggregation_max_keys", 50000)
+AGGREGATION_KEY = ("sensor", "signature_id", "src_ip", "dest_ip", "dest_port")
+THREAT_THRESHOLD = config["mcp_server"].get("threat_threshold", 20)
+THREAT_HALF_LIFE = config["mcp_server"].get("threat_half_life", 300)
+THREAT_IDLE_TTL = config["mcp_server"].get("threat_idle_ttl", 3600)
+THREAT_MAX_IPS = config["mcp_server"].get("threat_max_ips", 100000)
+THREAT_WHITELIST = config["mcp_server"].get("threat_whitelist", ["127.0.0.1"])
+AUTO_BLOCK = config["mcp_server"].get("auto_block", False)
+AUTO_BLOCK_DURATION = config["mcp_server"].get("auto_block_duration", 3600)
+REPUTATION_BLOCK_DURATION = config["mcp_server"].get("reputation_block_duration", 86400)
+FIREWALL_BACKEND = config["mcp_server"].get("firewall_backend", "auto")
+FIREWALL_USE_SUDO = config["mcp_server"].get("firewall_use_sudo", True)
+FIREWALL_PROTECTED = config["mcp_server"].get("firewall_protected", [])
+BLOCK_FLUSH_INTERVAL = config["mcp_server"].get("block_flush_interval", 1.0)
+BLOCKLIST_RECONCILE_INTERVAL = config["mcp_server"].get("blocklist_reconcile_interval", 300)
 RULES_PATH = config["suricata"]["rules_path"]
 MAIN_RULES_FILE = config["suricata"].get("main_rules_file", "/etc/suricata/rules/suricata.rules")
 BACKFILL_LINES = config["mcp_server"]["backfill_lines"]
 MAX_ALERTS = config["mcp_server"]["max_alerts"]
 AUTO_GENERATE = config["mcp_server"].get("auto_generate_rules", True)
 SEVERITY_THRESHOLD = config["mcp_server"].get("severity_threshold", 2)
+DEDUP_RULES = config["mcp_server"].get("dedup_rules", True)
+NEAR_DUP_THRESHOLD = config["mcp_server"].get("near_duplicate_threshold", 0.85)
+BLOCK_NEAR_DUPLICATES = config["mcp_server"].get("block_near_duplicates", True)
+RULE_TEMPLATES = config["mcp_server"].get("rule_templates", True)
+READ_CHUNK_BYTES = config["mcp_server"].get("read_chunk_bytes", 1024 * 1024)
+MAX_CATCHUP_RATE = config["mcp_server"].get("max_catchup_bytes_per_sec", 0)
+CHECKPOINT_INTERVAL = config["mcp_server"].get("checkpoint_interval", 5)
+CHECKPOINT_MAX_GAP = config["mcp_server"].get("checkpoint_max_gap_bytes", 512 * 1024 * 1024)
 
 OLLAMA_ENABLED = config["ollama"]["enabled"]
 OLLAMA_BASE_URL = config["ollama"]["base_url"]
 OLLAMA_MODEL = config["ollama"]["model"]
+OLLAMA_NUM_PREDICT = config["ollama"].get("num_predict", 256)
+OLLAMA_NUM_CTX = config["ollama"].get("num_ctx", 2048)
+OLLAMA_STOP = config["ollama"].get("stop", [])
+OLLAMA_MAX_FIELD_CHARS = config["ollama"].get("max_field_chars", 200)
+OLLAMA_READ_TIMEOUT = config["ollama"].get("read_timeout", 30)
+OLLAMA_BREAKER_FAILURES = config["ollama"].get("breaker_failures", 3)
+OLLAMA_BREAKER_COOLDOWN = config["ollama"].get("breaker_cooldown", 10)
 
 # 데이터 디렉토리 생성
 DATA_DIR.mkdir(exist_ok=True)
 
+_SEVERITY_RE = re.compile(r'"severity"\s*:\s*(\d+)')
+_SID_RE = re.compile(r'"signature_id"\s*:\s*(\d+)')
+_SRC_IP_RE = re.compile(r'"src_ip"\s*:\s*"([^"]*)"')
+# 스트리밍 중 룰이 끝났는지: 줄이 rev:N; / sid:N; 뒤의 ')' 로 끝나야 함
+_RULE_END_RE = re.compile(r'\b(?:rev|sid)\s*:\s*\d+\s*;\s*\)$')
+
 # ================== 로깅 ==================
 def log(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
@@ -85,7 +193,7 @@ def save_alerts():
             json.dump({
                 "total": len(alert_history),
                 "alerts": alert_history[-1000:]  # 최근 1000개만
-            }, f, indent=2)
+            }, f, ensure_ascii=False, separators=(",", ":"))  # 자주 저장하므로 공백 없이
     except Exception as e:
         log(f"[Data] ❌ 알림 저장 실패: {e}")
 
@@ -96,16 +204,40 @@ def save_rules():
             json.dump({
                 "total": len(generated_rules),
                 "rules": generated_rules
-            }, f, indent=2)
+            }, f, ensure_ascii=False, separators=(",", ":"))
     except Exception as e:
         log(f"[Data] ❌ 룰 저장 실패: {e}")
 
+def save_metrics(metrics: dict):
+    """모니터 / LLM 메트릭을 JSON 파일로 저장 (대시보드 / 운영 확인용)"""
+    try:
+        with open(METRICS_FILE, "w") as f:
+            json.dump({"updated_at": datetime.now().isoformat(), **metrics}, f, indent=2)
+    except Exception as e:
+        log(f"[Data] ❌ 메트릭 저장 실패: {e}")
+
 # ================== Ollama 클라이언트 ==================
 class OllamaClient:
     def __init__(self, base_url: str = OLLAMA_BASE_URL, model: str = OLLAMA_MODEL):
         self.base_url = base_url.rstrip('/')
         self.model = model
-        self.client = httpx.AsyncClient(timeout=120.0)
+        # 스트리밍이므로 전체 응답이 아닌 청크 간 대기 시간에 타임아웃 적용
+        # 커넥션 풀 / 서킷 브레이커는 같은 base_url 을 쓰는 모든 클라이언트가 공유
+        self.llm = get_llm_client(
+            self.base_url,
+            httpx.Timeout(OLLAMA_READ_TIMEOUT, connect=5.0),
+            failure_threshold=OLLAMA_BREAKER_FAILURES,
+            cooldown=OLLAMA_BREAKER_COOLDOWN,
+        )
+        self.metrics = {
+            "requests": 0,
+            "rules": 0,
+            "early_stops": 0,
+            "total_tokens": 0,
+            "last_ttft_ms": None,
+            "avg_ttft_ms": None,
+            "last_total_ms": None,
+        }
     
     async def generate_rule(self, alert_data: dict) -> Optional[str]:
         if not OLLAMA_ENABLED:
@@ -116,29 +248,30 @@ class OllamaClient:
         try:
             log(f"[Ollama] 🤖 LLM 룰 생성: {alert_data['signature'][:50]}...")
             
-            response = await self.client.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.3,
-                        "top_p": 0.9
-                    }
-                }
-            )
+            options = {
+                "temperature": 0.3,
+                "top_p": 0.9,
+                "num_predict": OLLAMA_NUM_PREDICT,
+                "num_ctx": OLLAMA_NUM_CTX,
+            }
+            if OLLAMA_STOP:
+                options["stop"] = OLLAMA_STOP
             
-            if response.status_code == 200:
-                result = response.json()
-                rule = self._extract_rule(result.get("response", ""))
-                if rule:
-                    log(f"[Ollama] ✓ 룰 생성 완료")
-                return rule
-            else:
-                log(f"[Ollama] ❌ HTTP 오류: {response.status_code}")
-                return None
+            rule = await self._stream_generate({
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": options
+            })
+            if rule:
+                self.metrics["rules"] += 1
+                log(f"[Ollama] ✓ 룰 생성 완료 "
+                    f"(TTFT {self.metrics['last_ttft_ms']}ms, 총 {self.metrics['last_total_ms']}ms)")
+            return rule
                 
+        except CircuitOpenError as e:
+            log(f"[Ollama] ⏸ 호출 생략: {e}")
+            return None
         except httpx.TimeoutException:
             log(f"[Ollama] ❌ 타임아웃")
             return None
@@ -149,16 +282,94 @@ class OllamaClient:
             log(f"[Ollama] ❌ 예외: {e}")
             return None
     
+    async def _stream_generate(self, payload: dict) -> Optional[str]:
+        """
+        /api/generate 스트리밍 응답을 읽다가 첫 번째 완성된 룰 라인이 보이면 즉시 중단
+        (연결을 닫으면 Ollama 도 생성을 멈추므로 불필요한 토큰 생성 비용 절감)
+        """
+        started = time.monotonic()
+        first_token_at = None
+        text = ""
+        tokens = 0
+        rule = None
+        
+        self.metrics["requests"] += 1
+        
+        async with self.llm.stream("POST", "/api/generate", json=payload) as response:
+            if response.status_code != 200:
+                log(f"[Ollama] ❌ HTTP 오류: {response.status_code}")
+                return None
+            
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                try:
+                    chunk = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                
+                piece = chunk.get("response", "")
+                if piece:
+                    if first_token_at is None:
+                        first_token_at = time.monotonic()
+                    tokens += 1
+                    text += piece
+                
+                if chunk.get("done"):
+                    # 완료 청크의 eval_count 가 정확한 토큰 수
+                    tokens = chunk.get("eval_count", tokens)
+                    rule = self._extract_rule(text)
+                    break
+                
+                rule = self._first_complete_rule(text)
+                if rule:
+                    self.metrics["early_stops"] += 1
+                    break
+        
+        finished = time.monotonic()
+        self._record(started, first_token_at, finished, tokens)
+        return rule
+    
+    def _first_complete_rule(self, text: str) -> Optional[str]:
+        """
+        줄바꿈으로 끝났거나 rev:N;) / sid:N;) 로 닫힌 첫 번째 룰 라인 반환 (아직 생성 중이면 None)
+        content / pcre 안의 ')' 에서 끊긴 룰은 파싱해서 마지막 옵션(따옴표 밖)이 rev / sid 인지 확인
+        """
+        complete, _, partial = text.rpartition("\n")
+        rule = self._extract_rule(complete) if complete else None
+        if rule:
+            return rule
+        partial = partial.strip()
+        parsed = parse_rule(partial) if _RULE_END_RE.search(partial) else None
+        if parsed and parsed.options and parsed.options[-1][0] in ("rev", "sid"):
+            return self._extract_rule(partial)
+        return None
+    
+    def _record(self, started: float, first_token_at: Optional[float], finished: float, tokens: int):
+        self.metrics["total_tokens"] += tokens
+        self.metrics["last_total_ms"] = round((finished - started) * 1000)
+        if first_token_at is None:
+            return
+        ttft = round((first_token_at - started) * 1000)
+        self.metrics["last_ttft_ms"] = ttft
+        avg = self.metrics["avg_ttft_ms"]
+        # 지수 이동 평균
+        self.metrics["avg_ttft_ms"] = ttft if avg is None else round(avg * 0.8 + ttft * 0.2)
+    
     def _build_prompt(self, alert_data: dict) -> str:
+        # 프롬프트 크기 제한: 각 필드를 max_field_chars 로 자름
+        def field(key: str) -> str:
+            return str(alert_data.get(key))[:OLLAMA_MAX_FIELD_CHARS]
+        
         return f"""You are a Suricata IDS rule generator. Create a detection rule for this alert.
 
 ALERT:
-- Source IP: {alert_data.get('src_ip')}
-- Destination IP: {alert_data.get('dest_ip')}
-- Protocol: {alert_data.get('proto')}
-- Signature: {alert_data.get('signature')}
-- Category: {alert_data.get('category')}
-- Severity: {alert_data.get('severity')}
+- Source IP: {field('src_ip')}
+- Destination IP: {field('dest_ip')}
+- Protocol: {field('proto')}
+- Signature: {field('signature')}
+- Category: {field('category')}
+- Severity: {field('severity')}
 
 REQUIREMENTS:
 1. Output ONLY the Suricata rule (one line)
@@ -170,6 +381,7 @@ REQUIREMENTS:
 Generate rule:"""
     
     def _extract_rule(self, response: str) -> Optional[str]:
+        """응답에서 첫 번째 룰 라인 추출 (닫는 ')' 가 빠졌으면 보완, 이미 닫혀 있으면 그대로)"""
         lines = response.strip().split('\n')
         
         for line in lines:
@@ -178,13 +390,16 @@ Generate rule:"""
                 continue
             if (line.startswith(('alert', 'drop', 'reject', 'pass')) and 
                 'sid:' in line and 'msg:' in line):
-                if not line.endswith(';'):
-                    line += ';'
+                if not line.endswith(')'):
+                    line = line.rstrip(';') + ';)'
                 return line
         return None
     
+    def get_metrics(self) -> dict:
+        return {**self.metrics, "client": self.llm.metrics()}
+    
     async def close(self):
-        await self.client.aclose()
+        await release_llm_client(self.llm)
 
 # ================== 룰 관리자 ==================
 class RuleManager:
@@ -192,9 +407,49 @@ class RuleManager:
         self.rules_path = Path(rules_path)
         self.main_rules_file = Path(main_rules_file)
         self.auto_rules_file = self.rules_path / "auto_generated.rules"
+        self.rule_index = RuleIndex(near_threshold=NEAR_DUP_THRESHOLD)
+        self._index_loaded = False
+    
+    async def _ensure_index(self):
+        """기존 룰 파일로 중복 인덱스 구성 (최초 1회, 스레드에서 실행)"""
+        if self._index_loaded:
+            return
+        self._index_loaded = True
+        
+        def _load():
+            loaded = self.rule_index.load_file(self.main_rules_file)
+            loaded += self.rule_index.load_file(self.auto_rules_file)
+            return loaded
+        
+        try:
+            loaded = await asyncio.to_thread(_load)
+            log(f"[Rules] ✓ 중복 인덱스 구성: {loaded}개 룰")
+        except Exception as e:
+            log(f"[Rules] ⚠ 중복 인덱스 구성 실패: {e}")
+    
+    async def check_duplicate(self, rule: str) -> bool:
+        """중복 / 유사 룰이면 True (삽입하지 않음)"""
+        if not DEDUP_RULES:
+            return False
+        
+        await self._ensure_index()
+        verdict = self.rule_index.check(rule)
+        
+        if verdict.status == "duplicate":
+            log(f"[Rules] ⏭ 중복 룰 건너뜀 (기존 sid:{verdict.match_sid})")
+            return True
+        if verdict.status == "near_duplicate":
+            log(f"[Rules] ⚠ 유사 룰 탐지 (기존 sid:{verdict.match_sid}, 유사도 {verdict.similarity})")
+            return BLOCK_NEAR_DUPLICATES
+        if verdict.status == "invalid":
+            log(f"[Rules] ⚠ 룰 파싱 실패: 원문 비교로만 중복 확인")
+        return False
     
-    async def add_rule(self, rule: str, alert_info: dict) -> bool:
+    async def add_rule(self, rule: str, alert_info: dict, source: str = "llm") -> bool:
         try:
+            if await self.check_duplicate(rule):
+                return False
+            
             self.rules_path.mkdir(parents=True, exist_ok=True)
             
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -219,13 +474,16 @@ class RuleManager:
                 f.write(f"# Severity: {alert_info.get('severity')}\n")
                 f.write(f"{rule}\n")
             
+            self.rule_index.add(rule)
+            
             # 3. 생성 기록 저장 (data/rules.json - 대시보드용)
             generated_rules.append({
                 "rule": rule,
                 "alert": alert_info.get('signature', 'Unknown'),
                 "severity": alert_info.get('severity'),
                 "timestamp": timestamp,
-                "file": "suricata.rules"
+                "file": "suricata.rules",
+                "source": source
             })
             
             # JSON 파일에 저장 (대시보드 백업)
@@ -261,89 +519,272 @@ class RuleManager:
             log(f"[Rules] ❌ 예외: {e}")
 
 # ================== Suricata 모니터 ==================
-class SuricataMonitor:
-    def __init__(self, eve_log_path: str = EVE_LOG_PATH, backfill_lines: int = BACKFILL_LINES):
-        self.eve_log_path = Path(eve_log_path)
+class EveSource:
+    """eve.json 하나를 tail (센서별 회전 추적 / 체크포인트 / 감시기)"""
+    
+    def __init__(self, path: Path, sensor: str, monitor: "SuricataMonitor", backfill_lines: int = BACKFILL_LINES):
+        self.eve_log_path = Path(path)
+        self.sensor = sensor
+        self.monitor = monitor
         self.backfill_lines = max(0, backfill_lines)
         self._fd: Optional[io.BufferedReader] = None
         self._inode: Optional[int] = None
-        self.running = False
-        self._buffer = b""
-        self.ollama = OllamaClient()
-        self.rule_manager = RuleManager()
-        self._save_counter = 0
+        self._reopen_from_start = False  # 회전 / 삭제 뒤 새로 생긴 파일은 처음부터 읽음
+        self._skip_until: Optional[float] = None  # 체크포인트 timestamp 로 재개할 때 이 epoch 이하 줄은 건너뜀
+        self._reader = ChunkedLineReader(READ_CHUNK_BYTES, MAX_CATCHUP_RATE)
+        self.checkpoint = Checkpoint(self._checkpoint_path(), flush_interval=CHECKPOINT_INTERVAL)
+        self.catching_up = False
+        self._last_ts: Optional[str] = None
+        self.watcher = None
+        self.tag = f"[MCP:{sensor}]"
+        # 사이드카 timestamp→offset 인덱스 (API 의 시간 범위 조회가 cutoff 위치로 바로 이동)
+        self.index: Optional[SparseIndex] = None
+        self._index_lines = 0
+        self._index_epoch = 0.0
+        self._index_saved = 0.0
+        # 지연(lag) 측정 / 부하 차단 상태
+        self._last_epoch: Optional[float] = None
+        self.lag_bytes = 0
+        self.lag_seconds = 0.0
+        self.shedding = False
+        self.shed_stats: Counter = Counter()
+        self.shed_counters: Counter = Counter()
+        self._shed_seen = 0
 
-    async def start(self):
-        self.running = True
-        
-        while not self.eve_log_path.exists():
-            log(f"[MCP] eve.json 대기: {self.eve_log_path}...")
+    def _checkpoint_path(self) -> Path:
+        """data/checkpoints/<sensor_key>.json (경로 기준이므로 센서 이름 / 순서가 바뀌어도 같은 파일)"""
+        return CHECKPOINT_DIR / f"{sensor_key(self.eve_log_path)}.json"
+
+    async def run(self):
+        while self.monitor.running and not self.eve_log_path.exists():
+            log(f"{self.tag} eve.json 대기: {self.eve_log_path}...")
             await asyncio.sleep(1)
+        if not self.monitor.running:
+            return
         
         await self._open_file(initial=True)
-        log(f"[MCP] ✓ 모니터링 시작: {self.eve_log_path}")
+        log(f"{self.tag} ✓ 모니터링 시작: {self.eve_log_path}")
         
-        if AUTO_GENERATE and OLLAMA_ENABLED:
-            log(f"[MCP] 🤖 자동 룰 생성 활성화 (심각도 <= {SEVERITY_THRESHOLD})")
-            log(f"[MCP] 📝 룰 저장 위치: {MAIN_RULES_FILE}")
+        # inotify 가 가능하면 변경 시에만 깨어남 (불가능하면 0.1초 폴링)
+        self.watcher = create_watcher(self.eve_log_path)
+        log(f"{self.tag} 👀 감시 방식: {type(self.watcher).__name__}")
+        events = set()
         
-        while self.running:
+        while self.monitor.running:
             try:
-                await self._reopen_if_rotated()
+                if not self._fd or events & RECHECK_EVENTS:
+                    await self._reopen_if_rotated()
+                    self.watcher.rewatch()
 
                 if not self._fd:
                     await asyncio.sleep(0.5)
                     continue
 
-                current_pos = self._fd.tell()
-                stat_result = os.fstat(self._fd.fileno())
-                
-                if stat_result.st_size > current_pos:
-                    data_chunk = self._fd.read(stat_result.st_size - current_pos)
-                    if data_chunk:
-                        self._buffer += data_chunk
-                        await self._drain_buffer()
-                
-                elif stat_result.st_size < current_pos:
-                    log("[MCP] ⚠ 로그 트렁케이트")
-                    self._fd.seek(stat_result.st_size)
-                    self._buffer = b""
-                
-                await asyncio.sleep(0.1)
+                await self._read_available()
+                events = await self.watcher.wait()
 
             except PermissionError:
-                log("[MCP] ❌ 권한 거부")
+                log(f"{self.tag} ❌ 권한 거부")
                 await asyncio.sleep(2)
             except FileNotFoundError:
-                log("[MCP] ⚠ 파일 없음")
+                log(f"{self.tag} ⚠ 파일 없음")
                 if self._fd:
-                    try: self._fd.close()
-                    except: pass
-                self._fd = None
-                self._inode = None
+                    await self._close_rotated()
                 await asyncio.sleep(1)
             except Exception as e:
-                log(f"[MCP] ❌ 오류: {e}")
+                log(f"{self.tag} ❌ 오류: {e}")
                 await asyncio.sleep(0.5)
 
-    async def _drain_buffer(self):
-        last_newline = self._buffer.rfind(b"\n")
-        if last_newline == -1:
+    async def _read_available(self):
+        """현재 파일 끝까지 고정 크기 청크로 읽기 (밀린 양과 무관하게 메모리 일정)"""
+        current_pos = self._fd.tell()
+        stat_result = os.fstat(self._fd.fileno())
+        
+        if stat_result.st_size < current_pos:
+            log(f"{self.tag} ⚠ 로그 트렁케이트")
+            self._fd.seek(stat_result.st_size)
+            self._reader.reset()
+            return
+        
+        await self._drain(self._fd, self._reader, self.eve_log_path, self._inode)
+
+    async def _drain(self, fd, reader: ChunkedLineReader, source: Path, inode: Optional[int]):
+        """fd 를 EOF 까지 처리하며 청크마다 체크포인트 / 사이드카 인덱스 갱신 (완성된 줄 기준 offset)"""
+        while True:
+            chunk_start = fd.tell() - reader.pending
+            nbytes, lines = reader.read_chunk(fd)
+            if not nbytes:
+                break
+            if lines and fd is self._fd:
+                self._index_chunk(chunk_start, lines)
+            if lines:
+                last = lines[-1][:128].encode()
+                self._last_ts = line_timestamp(last) or self._last_ts
+                self._last_epoch = line_epoch(last) or self._last_epoch
+            self._update_lag(fd, reader)
+            for line_str in lines:
+                if self._skip_until is not None and self._already_seen(line_str):
+                    continue
+                await self._consume_line(line_str)
+            self.checkpoint.update(source, inode, fd.tell() - reader.pending, self._last_ts)
+            await reader.throttle(nbytes)
+
+    def _already_seen(self, line: str) -> bool:
+        """체크포인트 timestamp 이하의 줄이면 True (ORDER_SLACK_SECONDS 만큼 지나가면 더 이상 비교하지 않음)"""
+        epoch = line_epoch(line[:128].encode())
+        if epoch is None:
+            return False
+        if epoch > self._skip_until + ORDER_SLACK_SECONDS:
+            self._skip_until = None
+            return False
+        return epoch <= self._skip_until
+
+    def _update_lag(self, fd, reader: ChunkedLineReader):
+        """파일 끝까지 남은 bytes / 마지막 이벤트 이후 경과 시간으로 부하 차단 시작·해제 (절반 이하로 줄면 해제)"""
+        self.lag_bytes = max(0, os.fstat(fd.fileno()).st_size - (fd.tell() - reader.pending))
+        if self.lag_bytes and self._last_epoch:
+            self.lag_seconds = max(0.0, time.time() - self._last_epoch)
+        else:
+            self.lag_seconds = 0.0
+        
+        over = (SHED_LAG_BYTES and self.lag_bytes > SHED_LAG_BYTES) or \
+            (SHED_LAG_SECONDS and self.lag_seconds > SHED_LAG_SECONDS)
+        if not self.shedding and over:
+            self.shedding = True
+            log(f"{self.tag} 🚧 부하 차단 시작: {self.lag_bytes:,} bytes / {self.lag_seconds:.0f}초 뒤처짐 "
+                f"(심각도 > {SHED_KEEP_SEVERITY} 샘플링 1/{SHED_SAMPLE_RATE}, LLM 생략)")
+        elif self.shedding and self.lag_bytes <= SHED_LAG_BYTES / 2 and self.lag_seconds <= SHED_LAG_SECONDS / 2:
+            self.shedding = False
+            log(f"{self.tag} ✓ 부하 차단 해제: 집계 {self.shed_stats['aggregated']:,}개, "
+                f"샘플 {self.shed_stats['sampled']:,}개")
+
+    def _shed(self, line: str) -> bool:
+        """
+        부하 차단 중 낮은 심각도 알림은 JSON 파싱 없이 (sid, src_ip) 카운터로 집계
+        (shed_sample_rate 개마다 1개는 그대로 처리) — 처리하지 않았으면 True
+        """
+        match = _SEVERITY_RE.search(line)
+        severity = int(match.group(1)) if match else 3
+        if severity <= SHED_KEEP_SEVERITY:
+            return False
+        self._shed_seen += 1
+        if SHED_SAMPLE_RATE > 1 and self._shed_seen % SHED_SAMPLE_RATE == 0:
+            self.shed_stats["sampled"] += 1
+            return False
+        
+        sid = _SID_RE.search(line)
+        src = _SRC_IP_RE.search(line)
+        key = (int(sid.group(1)) if sid else 0, src.group(1) if src else "")
+        if key in self.shed_counters or len(self.shed_counters) < SHED_MAX_COUNTERS:
+            self.shed_counters[key] += 1
+        else:
+            self.shed_stats["overflow"] += 1
+        self.shed_stats["aggregated"] += 1
+        return True
+
+    def ingestion_stats(self) -> dict:
+        return {
+            "lag_bytes": self.lag_bytes,
+            "lag_seconds": round(self.lag_seconds, 1),
+            "shedding": self.shedding,
+            "shed": dict(self.shed_stats),
+            "top_aggregated": [
+                {"sid": sid, "src_ip": src, "count": count}
+                for (sid, src), count in self.shed_counters.most_common(20)
+            ],
+        }
+
+    def _index_chunk(self, chunk_start: int, lines: list[str]):
+        """N 줄 또는 M 초마다 청크 첫 줄의 (epoch, offset) 을 인덱스에 추가"""
+        if self.index is None:
+            return
+        self._index_lines += len(lines)
+        epoch = line_epoch(lines[0][:128].encode())
+        if epoch is None:
             return
+        if self._index_lines >= INDEX_EVERY_LINES or epoch - self._index_epoch >= INDEX_EVERY_SECONDS:
+            self.index.add(epoch, chunk_start)
+            self._index_lines = 0
+            self._index_epoch = epoch
+            if time.monotonic() - self._index_saved >= CHECKPOINT_INTERVAL:
+                self.index.save()
+                self._index_saved = time.monotonic()
+
+    def _open_index(self, size: int):
+        # API 와 같은 min_gap (같은 인덱스 파일을 공유하므로 간격 기준을 맞춤)
+        self.index = SparseIndex(self.eve_log_path).load()
+        self.index.validate(self._inode, size)
+        self._index_lines = 0
+        self._index_epoch = self.index.epochs[-1] if self.index.epochs else 0.0
 
-        lines_to_process = self._buffer[:last_newline]
-        self._buffer = self._buffer[last_newline + 1:]
+    def _bounded_offset(self, fd, offset: int, size: int) -> int:
+        """공백 구간이 checkpoint_max_gap_bytes 를 넘으면 최근 구간만 읽도록 건너뜀 (줄 경계 정렬)"""
+        if not CHECKPOINT_MAX_GAP or size - offset <= CHECKPOINT_MAX_GAP:
+            return offset
+        skip_to = size - CHECKPOINT_MAX_GAP
+        fd.seek(skip_to)
+        fd.readline()
+        log(f"{self.tag} ⚠ 체크포인트 공백이 너무 큼: {fd.tell() - offset:,} bytes 건너뜀")
+        return fd.tell()
 
-        for line_bytes in lines_to_process.splitlines():
-            line_str = line_bytes.decode("utf-8", errors="ignore")
-            await self._consume_line(line_str)
+    async def _resume_from_checkpoint(self) -> bool:
+        """체크포인트가 있으면 마지막 위치부터 이어 읽기 (회전된 파일 포함)"""
+        state = self.checkpoint.state
+        if not state:
+            return False
+        
+        size = os.fstat(self._fd.fileno()).st_size
+        self.catching_up = True
+        try:
+            if state["inode"] == self._inode:
+                offset = state["offset"] if state["offset"] <= size else 0
+                self._fd.seek(self._bounded_offset(self._fd, offset, size))
+                log(f"{self.tag} ⏩ 체크포인트에서 재개: offset {offset:,} / {size:,} "
+                    f"(마지막 이벤트 {state.get('last_timestamp')})")
+                await self._drain(self._fd, self._reader, self.eve_log_path, self._inode)
+                return True
             
-    async def _open_file(self, initial=False):
-        log(f"[MCP] 파일 열기: {self.eve_log_path}...")
+            # 중단된 동안 회전됨: 이전 파일을 inode 로 찾아 남은 부분부터 처리
+            rotated = find_rotated(self.eve_log_path, state["inode"])
+            if rotated:
+                log(f"{self.tag} ⏩ 회전된 파일에서 재개: {rotated} (offset {state['offset']:,})")
+                reader = ChunkedLineReader(READ_CHUNK_BYTES, MAX_CATCHUP_RATE)
+                with open(rotated, "rb") as old_fd:
+                    old_size = os.fstat(old_fd.fileno()).st_size
+                    old_fd.seek(self._bounded_offset(old_fd, min(state["offset"], old_size), old_size))
+                    await self._drain(old_fd, reader, rotated, state["inode"])
+            else:
+                # inode 로 찾지 못함 (압축 / 삭제 / 복사 교체): 현재 파일에 이미 처리한 구간이 있을 수 있으므로
+                # 체크포인트 timestamp 위치부터 읽고 그 이하 줄은 건너뜀
+                since = to_epoch(state.get("last_timestamp"))
+                if since is not None:
+                    offset = find_stream_offset(self._fd, size, since - ORDER_SLACK_SECONDS, self.index)
+                    self._skip_until = since
+                    log(f"{self.tag} ⚠ 체크포인트의 파일을 찾을 수 없음, "
+                        f"마지막 이벤트 {state['last_timestamp']} 이후부터 읽기 (offset {offset:,})")
+                    self._fd.seek(self._bounded_offset(self._fd, offset, size))
+                    await self._drain(self._fd, self._reader, self.eve_log_path, self._inode)
+                    return True
+                log(f"{self.tag} ⚠ 체크포인트의 파일을 찾을 수 없음, 현재 파일 처음부터 읽기")
+            
+            self._fd.seek(self._bounded_offset(self._fd, 0, size))
+            await self._drain(self._fd, self._reader, self.eve_log_path, self._inode)
+            return True
+        finally:
+            self._skip_until = None
+            self.catching_up = False
+            self.checkpoint.flush()
+            
+    async def _open_file(self, initial=False, from_start=False):
+        log(f"{self.tag} 파일 열기: {self.eve_log_path}...")
         self._fd = open(self.eve_log_path, "rb")
         stat = self.eve_log_path.stat()
         self._inode = stat.st_ino
-        self._buffer = b""
+        self._reader.reset()
+        self._open_index(stat.st_size)
+        
+        if initial and await self._resume_from_checkpoint():
+            return
         
         if initial and self.backfill_lines > 0:
             try:
@@ -367,39 +808,67 @@ class SuricataMonitor:
                     line_str = line_bytes.decode("utf-8", errors="ignore")
                     await self._consume_line(line_str)
                 
-                log(f"[MCP] ✓ 백필: {len(lines)}개")
+                log(f"{self.tag} ✓ 백필: {len(lines)}개")
             except Exception as e:
-                log(f"[MCP] ⚠ 백필 실패: {e}")
+                log(f"{self.tag} ⚠ 백필 실패: {e}")
             
             self._fd.seek(0, 2)
-        else:
+        elif not from_start:
             self._fd.seek(0, 2)
+        
+        self.checkpoint.update(self.eve_log_path, self._inode, self._fd.tell(), self._last_ts)
     
+    async def _close_rotated(self):
+        """
+        회전 / 삭제된 파일을 닫기 전에 열린 fd 로 남은 줄을 모두 처리
+        (logrotate create 창 / Suricata 가 다시 열기 전 rename 구간에도 줄을 잃지 않음)
+        다음에 열리는 파일은 회전 뒤 새로 생긴 파일이므로 처음부터 읽음
+        """
+        try:
+            await self._read_available()
+        except OSError as e:
+            log(f"{self.tag} ⚠ 이전 파일 마저 읽기 실패: {e}")
+        finally:
+            try:
+                self._fd.close()
+            except OSError:
+                pass
+            self._fd = None
+            self._inode = None
+            self._reopen_from_start = True
+
     async def _reopen_if_rotated(self):
         if not self._fd:
-            await self._open_file()
+            await self._open_file(from_start=self._reopen_from_start)
+            self._reopen_from_start = False
             return
         
         try:
             path_stat = self.eve_log_path.stat()
         except FileNotFoundError:
-            log("[MCP] 🔄 파일 사라짐")
-            self._fd.close()
-            self._fd = None
-            self._inode = None
+            log(f"{self.tag} 🔄 파일 사라짐")
+            await self._close_rotated()
             raise
         
         if self._inode is not None and path_stat.st_ino != self._inode:
-            log("[MCP] 🔄 로그 회전")
-            self._fd.close()
-            self._fd = None
-            await self._open_file()
+            log(f"{self.tag} 🔄 로그 회전")
+            # 이전 파일에 남은 줄을 먼저 처리하고, 새 파일은 처음부터 읽음
+            await self._close_rotated()
+            await self._open_file(from_start=True)
+            self._reopen_from_start = False
 
     async def _consume_line(self, line: str):
         s = line.strip()
         if not s:
             return
         
+        # alert 이벤트가 아니면 JSON 파싱 생략 (flow / dns / http / stats 가 대부분)
+        if '"alert"' not in s:
+            return
+        
+        if self.shedding and self._shed(s):
+            return
+        
         try:
             event = json.loads(s)
         except json.JSONDecodeError:
@@ -408,9 +877,78 @@ class SuricataMonitor:
         if event.get("event_type") != "alert":
             return
         
-        await self._process_alert(event)
+        await self.monitor._process_alert(event, self)
+
+    def close(self):
+        self.checkpoint.flush()
+        if self.index:
+            self.index.save()
+        if self.watcher:
+            self.watcher.close()
+        if self._fd:
+            try:
+                self._fd.close()
+            except:
+                pass
+            self._fd = None
+
+
+class SuricataMonitor:
+    """여러 eve.json 소스(센서)를 동시에 tail 하고 알림을 한 곳에서 처리"""
     
-    async def _process_alert(self, event: dict):
+    def __init__(self, eve_sources: list = EVE_SOURCES, backfill_lines: int = BACKFILL_LINES):
+        self.source_specs = eve_sources
+        self.backfill_lines = backfill_lines
+        self.sources: dict[str, EveSource] = {}
+        self._known_paths: set[Path] = set()
+        self._tasks: list[asyncio.Task] = []
+        self.sensor_counts: Counter = Counter()
+        self.aggregator = AlertAggregator(AGGREGATION_WINDOW, AGGREGATION_KEY, AGGREGATION_MAX_KEYS)
+        self.blocklist = BlockList(BLOCKLIST_FILE)
+        self.threats = ThreatScorer(
+            threshold=THREAT_THRESHOLD,
+            half_life=THREAT_HALF_LIFE,
+            idle_ttl=THREAT_IDLE_TTL,
+            max_ips=THREAT_MAX_IPS,
+            whitelist=THREAT_WHITELIST,
+            on_threshold=self._on_threat,
+            is_blocked=self.blocklist.contains,
+        )
+        self.threat_events: list[dict] = []
+        self.blocker = BatchBlocker(
+            create_backend(FIREWALL_BACKEND, FIREWALL_USE_SUDO), protected=ProtectedNetworks(FIREWALL_PROTECTED)
+        ) if AUTO_BLOCK else None
+        self.running = False
+        self.ollama = OllamaClient()
+        self.rule_manager = RuleManager()
+        self.templates = TemplateClassifier()
+        self._save_counter = 0
+        self._last_save = 0.0
+
+    async def start(self):
+        self.running = True
+        
+        if AUTO_GENERATE and (OLLAMA_ENABLED or RULE_TEMPLATES):
+            log(f"[MCP] 🤖 자동 룰 생성 활성화 (심각도 <= {SEVERITY_THRESHOLD})")
+            log(f"[MCP] 📝 룰 저장 위치: {MAIN_RULES_FILE}")
+        
+        if self.blocker:
+            log(f"[Firewall] 🛡 자동 차단 활성화 ({self.blocker.backend.name}, {AUTO_BLOCK_DURATION}초)")
+            self._tasks.append(asyncio.create_task(self._flush_blocks()))
+        
+        # glob 소스는 주기적으로 재검색해 새 센서 파일을 추가
+        while self.running:
+            self._discover_sources()
+            await asyncio.sleep(SOURCE_RESCAN_INTERVAL)
+
+    def _discover_sources(self):
+        for path, sensor in expand_sources(self.source_specs, set(self.sources), self._known_paths):
+            source = EveSource(path, sensor, self, self.backfill_lines)
+            self.sources[sensor] = source
+            self._tasks.append(asyncio.create_task(source.run()))
+            log(f"[MCP] 📡 센서 추가: {sensor} ({path})")
+
+    async def _process_alert(self, event: dict, source: EveSource):
         alert = event.get("alert", {}) or {}
         
         info = {
@@ -427,51 +965,192 @@ class SuricataMonitor:
             "signature_id": alert.get("signature_id", 0),
             "action": alert.get("action", ""),
             "app_proto": event.get("app_proto", ""),
+            "sensor": source.sensor,
         }
         
-        alert_history.append(info)
+        self.sensor_counts[source.sensor] += 1
+        
+        epoch = to_epoch(info["timestamp"]) or time.time()
+        # 반복 알림도 모두 점수에 반영 (집계 전), 임계값을 넘으면 _on_threat 즉시 호출
+        self.threats.observe(info["src_ip"], info["severity"], info["signature"], epoch)
         
-        if len(alert_history) > MAX_ALERTS:
-            del alert_history[:len(alert_history) - MAX_ALERTS]
+        # 같은 키의 반복 알림은 열린 집계 레코드의 count / last_seen 만 갱신
+        # (alert_history 에 이미 들어 있는 dict 이므로 다음 저장 때 반영됨)
+        record, is_new = self.aggregator.add(info, epoch)
+        self.aggregator.expire(epoch)
+        if is_new:
+            alert_history.append(record)
+            if len(alert_history) > MAX_ALERTS:
+                del alert_history[:len(alert_history) - MAX_ALERTS]
         
-        # 10개마다 파일 저장
+        # 10개마다 파일 저장 (폭주 시에도 alerts_save_interval 초에 한 번까지만)
         self._save_counter += 1
-        if self._save_counter >= 10:
+        if self._save_counter >= 10 and time.monotonic() - self._last_save >= ALERTS_SAVE_INTERVAL:
             save_alerts()
+            save_metrics(self.get_metrics())
             self._save_counter = 0
+            self._last_save = time.monotonic()
+        
+        if not is_new:
+            return
         
         severity = info["severity"]
         
         if severity <= 2:
             log(f"[ALERT] 심각도 {severity} | {info['src_ip']} → {info['dest_ip']} | {info['signature']}")
         
+        # 평판 기반 출발지: 영구 drop 룰 대신 차단 목록 / 방화벽에 TTL 로 (sid 가 아니라 (sid, src_ip) 단위)
+        # auto_block 이 꺼져 있으면 차단할 곳이 없으므로 아래 일반 룰 생성(LLM)으로 넘김
+        if RULE_TEMPLATES and self.templates.classify(info) in BLOCK_TEMPLATES:
+            if self.blocker:
+                self._block_reputation_source(info)
+                return
+            self.templates.block_skipped += 1
+        
         # 자동 룰 생성
-        if AUTO_GENERATE and OLLAMA_ENABLED and severity <= SEVERITY_THRESHOLD:
+        if AUTO_GENERATE and (OLLAMA_ENABLED or RULE_TEMPLATES) and severity <= SEVERITY_THRESHOLD:
             signature_id = info["signature_id"]
             
             if signature_id not in processed_alerts:
                 processed_alerts.add(signature_id)
+                defer_llm = source.catching_up or source.shedding
                 
-                log(f"[MCP] 🎯 자동 룰 생성: {info['signature']}")
+                if not defer_llm:
+                    log(f"[MCP] 🎯 자동 룰 생성: {info['signature']}")
                 
-                rule = await self.ollama.generate_rule(info)
+                rule, origin = await self._generate_rule(info, defer_llm)
                 
-                if rule:
-                    success = await self.rule_manager.add_rule(rule, info)
+                if origin == "deferred":
+                    # LLM 을 생략했으므로 다음에 다시 시도
+                    processed_alerts.discard(signature_id)
+                    source.shed_stats["llm_skipped"] += 1
+                elif rule:
+                    success = await self.rule_manager.add_rule(rule, info, source=origin)
                     if success:
                         log(f"[MCP] ✅ 룰 생성 & 메인 파일 추가 완료!")
                     else:
-                        log(f"[MCP] ❌ 룰 추가 실패 (권한 확인 필요)")
+                        log(f"[MCP] ❌ 룰 추가 안 됨 (중복 또는 권한 문제)")
+    
+    def _on_threat(self, threat: IPThreat):
+        """IP 위협 점수가 임계값을 넘은 순간 (다음 폴링 주기를 기다리지 않음)"""
+        log(f"[Threat] 🚨 {threat.ip} 점수 {threat.score:.1f} ≥ {THREAT_THRESHOLD} | {threat.reason()}")
+        self.threat_events.append({"timestamp": datetime.now().isoformat(), **threat.to_dict()})
+        if len(self.threat_events) > 100:
+            del self.threat_events[:-100]
+        if self.blocker:
+            # 차단 목록에는 바로 저장 (재발 시 is_blocked 로 콜백 생략), 방화벽 적용은 _flush_blocks 가 모아서
+            try:
+                ip = self.blocker.validate(threat.ip)
+            except ValueError as e:
+                log(f"[Firewall] ⚠ 자동 차단 생략: {e}")
+                return
+            self.blocklist.add([(ip, AUTO_BLOCK_DURATION)], threat.reason(), source="auto")
+            self.blocker.request(ip, AUTO_BLOCK_DURATION)
+    
+    def _block_reputation_source(self, info: dict):
+        """
+        평판 룰에 걸린 출발지 IP 를 reputation_block_duration 동안 차단
+        (같은 sid 의 다른 IP 도 각각 처리, 이미 차단 중인 IP 는 건너뜀 — 만료되면 다시 차단)
+        auto_block 이 켜져 있을 때만 호출됨
+        """
+        try:
+            ip = self.blocker.validate(info.get("src_ip") or "")
+        except ValueError as e:
+            log(f"[Firewall] ⚠ 평판 차단 생략 (sid:{info['signature_id']}): {e}")
+            return
+        if self.blocklist.contains(ip):
+            return
+        self.templates.hits["ip_block"] += 1
+        self.blocklist.add([(ip, REPUTATION_BLOCK_DURATION)], f"Reputation: {info['signature']}", source="template")
+        self.blocker.request(ip, REPUTATION_BLOCK_DURATION)
+        log(f"[MCP] ⚡ 평판 차단 예약: {ip} ({REPUTATION_BLOCK_DURATION}초) | sid:{info['signature_id']}")
+    
+    async def _flush_blocks(self):
+        """예약된 차단을 block_flush_interval 마다 한 트랜잭션으로 적용, 주기적으로 차단 목록과 동기화"""
+        last_reconcile = 0.0
+        while self.running:
+            await asyncio.sleep(BLOCK_FLUSH_INTERVAL)
+            await self._apply_blocks()
+            if time.monotonic() - last_reconcile >= BLOCKLIST_RECONCILE_INTERVAL:
+                last_reconcile = time.monotonic()
+                try:
+                    result = await asyncio.to_thread(self.blocklist.reconcile, self.blocker.backend)
+                    if result["added"] or result["removed"]:
+                        log(f"[Firewall] 🔄 차단 목록 동기화: +{result['added']} / -{result['removed']}")
+                except FirewallError as e:
+                    log(f"[Firewall] ❌ 차단 목록 동기화 실패: {e}")
+    
+    async def _apply_blocks(self):
+        if not self.blocker.pending:
+            return
+        try:
+            applied = await asyncio.to_thread(self.blocker.flush)
+            log(f"[Firewall] 🛡 {len(applied)}개 IP 차단 ({self.blocker.backend.name})")
+        except FirewallError as e:
+            log(f"[Firewall] ❌ 차단 실패: {e}")
+    
+    async def _generate_rule(self, info: dict, defer_llm: bool = False) -> tuple[Optional[str], str]:
+        """템플릿으로 처리 가능한 알림은 즉시 생성, 나머지만 LLM 호출"""
+        if RULE_TEMPLATES:
+            await self.rule_manager._ensure_index()
+            matched = self.templates.generate(info, self.rule_manager.rule_index.sids)
+            if matched:
+                name, rule = matched
+                log(f"[MCP] ⚡ 템플릿 룰 생성: {name}")
+                return rule, f"template:{name}"
+        
+        if not OLLAMA_ENABLED:
+            return None, "none"
+        
+        if defer_llm:
+            # 체크포인트 따라잡기 / 부하 차단 중에는 LLM 호출 생략 (템플릿만 사용)
+            return None, "deferred"
+        
+        self.templates.record_llm()
+        return await self.ollama.generate_rule(info), "llm"
+    
+    def get_metrics(self) -> dict:
+        return {
+            "llm": self.ollama.get_metrics(),
+            "rule_generation": self.templates.stats(),
+            "aggregation": self.aggregator.stats(),
+            "blocking": {
+                "backend": self.blocker.backend.name,
+                "pending": self.blocker.pending,
+                "applied": self.blocker.applied,
+                "failed": self.blocker.failed,
+                "blocked": len(self.blocklist.active()),
+                "last_reconcile": self.blocklist.last_reconcile,
+            } if self.blocker else None,
+            "threats": {
+                **self.threats.stats(),
+                "top": self.threats.top(20),
+                "events": self.threat_events[-20:],
+            },
+            "sensors": {
+                sensor: {
+                    "path": str(source.eve_log_path),
+                    "alerts": self.sensor_counts[sensor],
+                    "catching_up": source.catching_up,
+                    "ingestion": source.ingestion_stats(),
+                    "checkpoint": source.checkpoint.state,
+                }
+                for sensor, source in self.sources.items()
+            },
+        }
     
     async def stop(self):
         self.running = False
+        if self.blocker:
+            await self._apply_blocks()
         save_alerts()  # 종료 시 마지막 저장
         save_rules()
-        if self._fd:
-            try:
-                self._fd.close()
-            except:
-                pass
+        save_metrics(self.get_metrics())
+        for task in self._tasks:
+            task.cancel()
+        for source in self.sources.values():
+            source.close()
+        self.blocklist.close()
         await self.ollama.close()
 
 # ================== 메인 ==================
@@ -479,7 +1158,7 @@ async def main():
     log("=" * 60)
     log("🛡️  Suricata MCP Server (메인 룰 파일 연동)")
     log("=" * 60)
-    log(f"📁 Eve Log: {EVE_LOG_PATH}")
+    log(f"📁 Eve Sources: {', '.join(str(s) for s in EVE_SOURCES)}")
     log(f"📁 Rules Path: {RULES_PATH}")
     log(f"📝 Main Rules File: {MAIN_RULES_FILE}")
     log(f"💾 Alerts Backup: {ALERTS_FILE}")
@@ -0,0 +1,140 @@
+"""
+mcp_server/threat_scorer.py
+IP 별 위협 점수 (스트리밍)
+- 알림이 들어올 때마다 해당 IP 점수만 갱신: 점수 = 이전 점수 × 0.5^(경과/반감기) + 심각도 가중치
+  (매 주기마다 최근 N개 알림으로 다시 계산하지 않음 → 느린 공격자도 누적, 갱신 O(1))
+- 시그니처 집합은 IP 당 max_signatures 개까지만
+- 임계값을 넘는 순간 콜백 호출 (점수가 임계값의 절반 아래로 내려가면 다시 감시)
+- 오래 조용한 IP 는 갱신 순서(OrderedDict) 앞에서부터 지연 제거
+"""
+
+import heapq
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+# old backup/agent 의 severity_weights (critical 10, high 5, medium 2, low 1)
+SEVERITY_WEIGHTS = {1: 10.0, 2: 5.0, 3: 2.0}
+DEFAULT_WEIGHT = 1.0
+REARM_RATIO = 0.5
+
+
+class IPThreat:
+    __slots__ = ("ip", "score", "updated", "count", "signatures", "first_seen", "triggered")
+
+    def __init__(self, ip: str, now: float):
+        self.ip = ip
+        self.score = 0.0
+        self.updated = now
+        self.first_seen = now
+        self.count = 0
+        self.signatures: dict[str, None] = {}   # 삽입 순서 유지 집합
+        self.triggered = False
+
+    def reason(self) -> str:
+        """위협 사유 (old backup/agent 의 _determine_threat_reason 기준)"""
+        if self.count >= 10:
+            return f"High alert count ({self.count})"
+        if len(self.signatures) >= 3:
+            return f"Multiple attack types ({len(self.signatures)})"
+        return f"High threat score ({self.score:.1f})"
+
+    def to_dict(self, score: Optional[float] = None) -> dict:
+        return {
+            "ip": self.ip,
+            "score": round(self.score if score is None else score, 2),
+            "count": self.count,
+            "signatures": list(self.signatures),
+            "first_seen": self.first_seen,
+            "last_seen": self.updated,
+            "reason": self.reason(),
+        }
+
+
+class ThreatScorer:
+    def __init__(
+        self,
+        threshold: float = 20.0,
+        half_life: float = 300.0,
+        max_signatures: int = 16,
+        idle_ttl: float = 3600.0,
+        max_ips: int = 100000,
+        whitelist: Iterable[str] = (),
+        on_threshold: Optional[Callable[[IPThreat], None]] = None,
+        is_blocked: Optional[Callable[[str], bool]] = None,
+    ):
+        self.threshold = threshold
+        self.half_life = half_life
+        self.max_signatures = max_signatures
+        self.idle_ttl = idle_ttl
+        self.max_ips = max_ips
+        self.whitelist = set(whitelist)
+        self.on_threshold = on_threshold
+        self.is_blocked = is_blocked   # 이미 차단된 IP 는 콜백 생략 (O(1) 조회)
+        self.ips: OrderedDict[str, IPThreat] = OrderedDict()
+        self.triggered_total = 0
+        self.evicted = 0
+
+    def _decay(self, state: IPThreat, now: float) -> float:
+        elapsed = now - state.updated
+        if elapsed <= 0:
+            return state.score
+        return state.score * 0.5 ** (elapsed / self.half_life)
+
+    def observe(self, ip: str, severity: Optional[int], signature: Optional[str] = None,
+                now: Optional[float] = None) -> Optional[IPThreat]:
+        """알림 1건 반영 → 해당 IP 상태 (화이트리스트 / 빈 IP 면 None)"""
+        if not ip or ip in self.whitelist:
+            return None
+        now = time.time() if now is None else now
+
+        state = self.ips.get(ip)
+        if state is None:
+            state = self.ips[ip] = IPThreat(ip, now)
+        else:
+            state.score = self._decay(state, now)
+            self.ips.move_to_end(ip)
+            if state.triggered and state.score < self.threshold * REARM_RATIO:
+                state.triggered = False
+        state.score += SEVERITY_WEIGHTS.get(severity, DEFAULT_WEIGHT)
+        state.updated = max(state.updated, now)
+        state.count += 1
+        if signature and signature not in state.signatures and len(state.signatures) < self.max_signatures:
+            state.signatures[signature] = None
+
+        if not state.triggered and state.score >= self.threshold:
+            state.triggered = True
+            self.triggered_total += 1
+            if self.on_threshold and not (self.is_blocked and self.is_blocked(ip)):
+                self.on_threshold(state)
+
+        self._evict(now)
+        return state
+
+    def _evict(self, now: float):
+        """갱신 순서 앞쪽(가장 오래 조용한 IP)부터 idle_ttl 초과 / max_ips 초과분 제거"""
+        ips = self.ips
+        while ips:
+            ip, state = next(iter(ips.items()))
+            if len(ips) <= self.max_ips and now - state.updated < self.idle_ttl:
+                break
+            del ips[ip]
+            self.evicted += 1
+
+    def score(self, ip: str, now: Optional[float] = None) -> float:
+        state = self.ips.get(ip)
+        return self._decay(state, time.time() if now is None else now) if state else 0.0
+
+    def top(self, n: int = 20, now: Optional[float] = None) -> list[dict]:
+        now = time.time() if now is None else now
+        scored = ((self._decay(state, now), state) for state in self.ips.values())
+        return [state.to_dict(score) for score, state in heapq.nlargest(n, scored, key=lambda x: x[0])]
+
+    def stats(self) -> dict:
+        return {
+            "tracked_ips": len(self.ips),
+            "threshold": self.threshold,
+            "half_life": self.half_life,
+            "triggered": self.triggered_total,
+            "evicted": self.evicted,
+        }
@@ -0,0 +1,14 @@
+"""
+tests/conftest.py
+api/, mcp_server/ 모듈은 스크립트 디렉터리 기준으로 import 하므로 두 경로를 sys.path 에 추가
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+for path in (ROOT / "mcp_server", ROOT / "api"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
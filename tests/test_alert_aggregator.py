@@ -0,0 +1,67 @@
+"""alert_aggregator: 창 안의 중복은 같은 레코드의 count / last_seen 만 갱신, expire() 로 창 닫기"""
+
+from alert_aggregator import AlertAggregator
+from alert_store import to_epoch
+
+
+def alert(second: int, src_ip: str = "203.0.113.7", sid: int = 2001219) -> dict:
+    return {"timestamp": f"2026-10-18T10:00:{second:02d}.000000+0000", "sensor": "eth0", "sid": sid,
+            "src_ip": src_ip, "dest_ip": "192.0.2.10", "dest_port": 22}
+
+
+T0 = to_epoch(alert(0)["timestamp"])
+
+
+def test_duplicates_in_window_update_the_same_record():
+    agg = AlertAggregator(window=30)
+    first, is_new = agg.add(alert(0))
+    assert is_new and first["count"] == 1
+
+    for second in (5, 20, 12):                                    # 늦게 온 12초는 last_seen 유지
+        record, is_new = agg.add(alert(second))
+        assert record is first and not is_new
+    assert first["count"] == 4
+    assert first["first_seen"] == alert(0)["timestamp"]
+    assert first["last_seen"] == alert(20)["timestamp"]
+
+    other, is_new = agg.add(alert(6, src_ip="198.51.100.3"))      # 다른 키는 별도 레코드
+    assert is_new and other is not first
+    assert agg.stats() == {"window": 30, "open": 2, "alerts": 5, "records": 2, "collapsed": 3,
+                           "evicted": 0, "ratio": 2.5}
+
+
+def test_expire_closes_windows_in_first_seen_order():
+    agg = AlertAggregator(window=30)
+    a, _ = agg.add(alert(0))
+    b, _ = agg.add(alert(10, src_ip="198.51.100.3"))
+    agg.add(alert(25))
+
+    assert agg.expire(T0 + 29) == []
+    assert agg.expire(T0 + 30) == [a] and a["count"] == 2
+    assert agg.stats()["open"] == 1
+    assert agg.expire(T0 + 40) == [b]
+    assert agg.stats()["open"] == 0 and agg.expire(T0 + 1000) == []
+
+
+def test_alert_after_window_starts_a_new_record():
+    agg = AlertAggregator(window=30)
+    first, _ = agg.add(alert(0))
+    second, is_new = agg.add(alert(45))
+    assert is_new and second is not first and second["count"] == 1
+    assert agg.expire(T0 + 50) == [first]                         # 밀려난 이전 창도 함께 반환
+    assert agg.flush() == [second]
+
+
+def test_max_keys_evicts_oldest_record():
+    agg = AlertAggregator(window=30, max_keys=2)
+    records = [agg.add(alert(n, src_ip=f"10.0.0.{n}"))[0] for n in range(3)]
+    assert agg.stats()["evicted"] == 1 and agg.stats()["open"] == 2
+    assert agg.expire(T0) == [records[0]]
+
+
+def test_disabled_window_passes_alerts_through():
+    agg = AlertAggregator(window=0)
+    event = alert(0)
+    assert agg.add(event) == (event, True) and "count" not in event
+    assert agg.add(alert(0)) == (alert(0), True)
+    assert agg.expire(T0 + 100) == [] and agg.stats()["alerts"] == 2
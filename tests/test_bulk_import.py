@@ -0,0 +1,66 @@
+"""bulk_import: 압축 스트림은 줄 경계 청크로 나눠 병렬 파싱 (파일 전체를 한 번에 담지 않음)"""
+
+import gzip
+import json
+
+import bulk_import
+from alert_store import AlertStore
+from eve_archive import GZIP
+
+
+def eve_lines(count: int) -> bytes:
+    lines = []
+    for n in range(count):
+        event = {"timestamp": f"2026-10-18T10:{n // 60 % 60:02d}:{n % 60:02d}.000000+0000",
+                 "event_type": "alert" if n % 3 else "flow", "src_ip": f"10.0.{n // 256 % 256}.{n % 256}",
+                 "dest_ip": "192.0.2.10", "alert": {"signature_id": n, "signature": "x" * (n % 50), "severity": 2}}
+        lines.append(json.dumps(event).encode())
+    return b"\n".join(lines) + b"\n"
+
+
+def test_stream_chunks_split_on_line_boundaries(tmp_path):
+    data = eve_lines(500)
+    path = tmp_path / "eve.json.1.gz"
+    path.write_bytes(gzip.compress(data))
+
+    chunks = list(bulk_import.stream_chunks(str(path), GZIP, chunk_bytes=4096))
+    assert len(chunks) > 10
+    assert all(len(chunk) <= 4096 + 512 for chunk, _ in chunks)       # 청크 + 잘린 줄 하나
+    assert all(chunk.endswith(b"\n") for chunk, _ in chunks if chunk)
+    assert b"".join(chunk for chunk, _ in chunks) == data
+    assert sum(weight for _, weight in chunks) == path.stat().st_size
+
+
+def test_unterminated_last_line_is_kept(tmp_path):
+    path = tmp_path / "eve.json.2.gz"
+    path.write_bytes(gzip.compress(b'{"a": 1}\n{"b": 2}'))
+    chunks = [chunk for chunk, _ in bulk_import.stream_chunks(str(path), GZIP, chunk_bytes=4)]
+    assert b"".join(chunks) == b'{"a": 1}\n{"b": 2}'
+
+
+def test_import_gzip_and_plain_with_bounded_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_import, "STREAM_CHUNK_BYTES", 8192)
+    data = eve_lines(900)
+    plain = tmp_path / "eth0" / "eve.json.1"
+    plain.parent.mkdir()
+    plain.write_bytes(data)
+    archive = tmp_path / "eth0" / "eve.json.2.gz"
+    archive.write_bytes(gzip.compress(data))
+
+    # 청크 작업 함수가 chunk 크기만 받는지 (파일 전체 rows 를 한 번에 반환하지 않는지) 확인
+    tasks = bulk_import.build_tasks([archive], workers=2)
+    assert [func for func, _, _ in tasks] == [bulk_import.stream_tasks]
+    subtasks = list(bulk_import.stream_tasks(*tasks[0][1]))
+    assert len(subtasks) > 10 and all(func is bulk_import.parse_chunk for func, _, _ in subtasks)
+
+    db = tmp_path / "alerts.db"
+    result = bulk_import.import_files([archive], db, workers=2)
+    assert result["parsed"] == result["inserted"] == 600
+    assert result["bytes"] == archive.stat().st_size
+
+    again = bulk_import.import_files([plain], db, workers=2)   # 같은 줄 → 모두 중복
+    assert again["parsed"] == 600 and again["inserted"] == 0
+
+    store = AlertStore(db)
+    assert store.count() == 600 and store.sensors() == ["eth0"]
+    store.close()
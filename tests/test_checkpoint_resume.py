@@ -0,0 +1,95 @@
+"""체크포인트 재개: 회전 파일 inode 탐색 / 찾지 못하면 last_timestamp 기준으로 이어 읽기"""
+
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from checkpoint import Checkpoint, find_rotated
+from sensors import expand_sources, sensor_key
+from suricata_server import EveSource
+
+
+BASE = datetime(2026, 10, 18, 10, 0, tzinfo=timezone.utc)
+
+
+def ts(n: int) -> str:
+    return (BASE + timedelta(seconds=n)).strftime("%Y-%m-%dT%H:%M:%S.%f%z")
+
+
+def eve_line(n: int) -> str:
+    return json.dumps({"timestamp": ts(n), "event_type": "alert",
+                       "src_ip": "203.0.113.7", "alert": {"signature_id": n, "severity": 3}}) + "\n"
+
+
+class FakeMonitor:
+    running = True
+
+    def __init__(self):
+        self.sids = []
+
+    async def _process_alert(self, event, source):
+        self.sids.append(event["alert"]["signature_id"])
+
+
+def resume(tmp_path, monkeypatch, state: dict) -> list[int]:
+    monkeypatch.chdir(tmp_path)
+    eve = tmp_path / "eve.json"
+    checkpoint = Checkpoint(tmp_path / "data" / "checkpoints" / f"{sensor_key(eve)}.json")
+    checkpoint.state = state
+    checkpoint._dirty = True
+    checkpoint.flush()
+
+    monitor = FakeMonitor()
+    source = EveSource(eve, "eve", monitor, backfill_lines=0)
+    try:
+        asyncio.run(source._open_file(initial=True))
+    finally:
+        source.close()
+    return monitor.sids
+
+
+def test_find_rotated_matches_inode_and_skips_sidecars(tmp_path):
+    eve = tmp_path / "eve.json"
+    eve.write_text(eve_line(1))
+    rotated = tmp_path / "eve.json.1"
+    os.link(eve, tmp_path / "eve.json.idx")
+    os.link(eve, rotated)
+    assert find_rotated(eve, eve.stat().st_ino) == rotated
+    assert find_rotated(eve, -1) is None
+
+
+def test_missing_inode_resumes_after_checkpoint_timestamp(tmp_path, monkeypatch):
+    # 체크포인트의 파일(다른 inode)은 사라졌고, 현재 파일에 이미 처리한 1..3000 이 함께 들어 있음
+    (tmp_path / "eve.json").write_text("".join(eve_line(n) for n in range(1, 3010)))
+    sids = resume(tmp_path, monkeypatch, {
+        "path": str(tmp_path / "eve.json"), "inode": -1, "offset": 12345, "last_timestamp": ts(3000),
+    })
+    assert sids == list(range(3001, 3010))
+
+
+def test_missing_inode_without_timestamp_reads_from_start(tmp_path, monkeypatch):
+    (tmp_path / "eve.json").write_text("".join(eve_line(n) for n in range(1, 4)))
+    sids = resume(tmp_path, monkeypatch, {"path": "eve.json", "inode": -1, "offset": 0, "last_timestamp": None})
+    assert sids == [1, 2, 3]
+
+
+def test_rotated_file_is_finished_before_current(tmp_path, monkeypatch):
+    rotated = tmp_path / "eve.json.1"
+    rotated.write_text("".join(eve_line(n) for n in range(1, 5)))
+    (tmp_path / "eve.json").write_text("".join(eve_line(n) for n in range(5, 7)))
+    offset = len(eve_line(1)) * 2
+    sids = resume(tmp_path, monkeypatch, {
+        "path": str(tmp_path / "eve.json"), "inode": rotated.stat().st_ino, "offset": offset,
+        "last_timestamp": ts(2),
+    })
+    assert sids == [3, 4, 5, 6]
+
+
+def test_sensor_key_does_not_depend_on_discovery_order(tmp_path):
+    a, b = tmp_path / "a" / "eth0" / "eve.json", tmp_path / "b" / "eth0" / "eve.json"
+    first = dict(expand_sources([str(a), str(b)]))
+    second = dict(expand_sources([str(b), str(a)]))
+    assert first[a] != second[a]                    # 표시 이름(eth0 / eth0-2)은 순서에 따라 바뀜
+    assert sensor_key(a) == sensor_key(tmp_path / "a" / "eth0" / ".." / "eth0" / "eve.json")
+    assert sensor_key(a) != sensor_key(b) and sensor_key(a).startswith("eth0-")
@@ -0,0 +1,26 @@
+"""If-None-Match 파싱 (entity-tag 목록 / W/ / *)"""
+
+from main import etag_matches
+
+ETAG = '"eb8809c60949e835"'
+
+
+def test_exact_and_listed_tags_match():
+    assert etag_matches(ETAG, ETAG)
+    assert etag_matches(f'"aaaa", {ETAG}', ETAG)
+    assert etag_matches(f' "aaaa" ,{ETAG} ', ETAG)
+
+
+def test_weak_tags_and_wildcard():
+    assert etag_matches(f'W/{ETAG}', ETAG)
+    assert etag_matches(f'"aaaa", W/{ETAG}', ETAG)
+    assert etag_matches("*", ETAG)
+
+
+def test_substrings_do_not_match():
+    assert not etag_matches(None, ETAG)
+    assert not etag_matches("", ETAG)
+    assert not etag_matches('"eb8809c60949e835-gzip"', ETAG)
+    assert not etag_matches('"xx' + ETAG[1:], ETAG)
+    assert not etag_matches(ETAG.strip('"'), ETAG)      # 따옴표 없는 값은 entity-tag 가 아님
+    assert not etag_matches('"aaaa", "bbbb"', ETAG)
@@ -0,0 +1,120 @@
+"""eve_archive: seekable zstd 의 프레임 경계를 넘는 seek / read, seek table 이 없을 때의 대체 경로"""
+
+import gzip
+import io
+import json
+import struct
+
+import pytest
+
+zstandard = pytest.importorskip("zstandard")
+
+from eve_archive import (GZIP, PLAIN, SEEKABLE_MAGIC, SEEKABLE_ZSTD, SKIPPABLE_MAGIC, ZSTD, SeekTable,
+                         SeekableZstdReader, archive_kind, open_eve, open_seekable, seekable_size)
+from eve_scan import iter_lines_since, line_epoch
+
+FRAME_BYTES = 7000   # 줄 경계와 맞지 않는 프레임 크기
+
+
+def eve_data(count: int = 3000) -> bytes:
+    return b"".join(
+        json.dumps({"timestamp": f"2026-10-18T{n // 3600:02d}:{n // 60 % 60:02d}:{n % 60:02d}.000000+0000",
+                    "event_type": "alert", "flow_id": n, "pad": "x" * (n % 40)}).encode() + b"\n"
+        for n in range(count)
+    )
+
+
+def seekable_zstd(data: bytes, frame_bytes: int = FRAME_BYTES, checksums: bool = False) -> bytes:
+    """zstd contrib seekable 형식: 독립 프레임들 + skippable 프레임의 seek table"""
+    cctx = zstandard.ZstdCompressor()
+    frames, entries = [], []
+    for start in range(0, len(data), frame_bytes):
+        chunk = data[start:start + frame_bytes]
+        frame = cctx.compress(chunk)
+        frames.append(frame)
+        entries.append(struct.pack("<III", len(frame), len(chunk), 0) if checksums
+                       else struct.pack("<II", len(frame), len(chunk)))
+    footer = struct.pack("<IBI", len(entries), 0x80 if checksums else 0, SEEKABLE_MAGIC)
+    table = b"".join(entries) + footer
+    return b"".join(frames) + struct.pack("<II", SKIPPABLE_MAGIC, len(table)) + table
+
+
+@pytest.fixture
+def data():
+    return eve_data()
+
+
+def test_round_trip_and_seek_across_frame_boundaries(tmp_path, data):
+    path = tmp_path / "eve.json.3.zst"
+    path.write_bytes(seekable_zstd(data))
+    assert archive_kind(path) == SEEKABLE_ZSTD
+    assert seekable_size(path) == len(data)
+
+    with open_seekable(path) as f:
+        assert f.read() == data
+        for boundary in range(FRAME_BYTES, len(data), FRAME_BYTES):
+            for offset in (boundary - 5, boundary, boundary + 1):
+                f.seek(offset)
+                assert f.read(FRAME_BYTES + 20) == data[offset:offset + FRAME_BYTES + 20]
+        f.seek(-10, io.SEEK_END)
+        assert f.read() == data[-10:]
+        f.seek(len(data) + 100)
+        assert f.read(10) == b""
+
+
+def test_raw_reader_stops_at_frame_end_and_tracks_position(tmp_path, data):
+    path = tmp_path / "eve.json.zst"
+    path.write_bytes(seekable_zstd(data, checksums=True))   # 12바이트 항목 (체크섬 플래그)
+    raw = open(path, "rb")
+    table = SeekTable.read(raw)
+    assert len(table) == -(-len(data) // FRAME_BYTES) and table.size == len(data)
+
+    reader = SeekableZstdReader(raw, table)
+    reader.seek(FRAME_BYTES - 3)
+    buf = bytearray(10)
+    assert reader.readinto(buf) == 3                          # 프레임 끝까지만
+    assert reader.readinto(memoryview(buf)[3:]) == 7          # 다음 프레임 로드
+    assert bytes(buf) == data[FRAME_BYTES - 3:FRAME_BYTES + 7]
+    assert reader.tell() == FRAME_BYTES + 7
+    reader.seek(-2, io.SEEK_CUR)
+    assert reader.tell() == FRAME_BYTES + 5
+    reader.close()
+
+
+def test_plain_zstd_falls_back_to_streaming(tmp_path, data):
+    path = tmp_path / "eve.json.2.zst"
+    path.write_bytes(zstandard.ZstdCompressor().compress(data[:50000]) +
+                     zstandard.ZstdCompressor().compress(data[50000:]))
+    assert archive_kind(path) == ZSTD
+    assert open_seekable(path) is None and seekable_size(path) == 0
+    with open_eve(path) as f:
+        assert f.read() == data
+
+
+def test_corrupt_seek_table_is_not_seekable(tmp_path, data):
+    blob = bytearray(seekable_zstd(data))
+    table_size = struct.unpack_from("<I", blob, len(blob) - 9)[0] * 8 + 9
+    struct.pack_into("<I", blob, len(blob) - table_size - 4, table_size + 1)   # 프레임 크기 불일치
+    path = tmp_path / "eve.json.4.zst"
+    path.write_bytes(bytes(blob))
+    assert archive_kind(path) == ZSTD and open_seekable(path) is None
+
+
+def test_kind_detection_by_magic(tmp_path, data):
+    gz = tmp_path / "eve.json.zst"          # 확장자와 무관
+    gz.write_bytes(gzip.compress(data))
+    plain = tmp_path / "eve.json.gz"
+    plain.write_bytes(data)
+    assert archive_kind(gz) == GZIP and archive_kind(plain) == PLAIN
+
+
+def test_time_range_scan_inside_seekable_archive(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = eve_data(12000)
+    path = tmp_path / "eve.json.5.zst"
+    path.write_bytes(seekable_zstd(data, frame_bytes=65536))
+    lines = data.splitlines()
+    cutoff = line_epoch(lines[9500])
+    expected = [line + b"\n" for line in lines if line_epoch(line) >= cutoff]
+    assert list(iter_lines_since(path, cutoff)) == expected
+    assert list(iter_lines_since(path, cutoff, use_index=False)) == expected
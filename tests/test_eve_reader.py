@@ -0,0 +1,86 @@
+"""eve_reader.ChunkedLineReader: 청크 사이에 걸친 미완성 줄, 버퍼보다 긴 줄 건너뛰기"""
+
+import asyncio
+import io
+
+from eve_reader import ChunkedLineReader
+
+
+class Trickle(io.RawIOBase):
+    """readinto 한 번에 최대 step 바이트만 돌려주는 파일 (tail 중 조금씩 쓰이는 eve.json)"""
+
+    def __init__(self, data: bytes, step: int):
+        self.data = data
+        self.pos = 0
+        self.step = step
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.step, len(self.data) - self.pos)
+        buffer[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+
+def read_all(reader: ChunkedLineReader, fd) -> list[str]:
+    lines = []
+    while True:
+        n, chunk = reader.read_chunk(fd)
+        if not n:
+            return lines
+        lines.extend(chunk)
+
+
+def test_partial_line_is_carried_across_chunks():
+    events = [f'{{"event_type": "alert", "flow_id": {n}, "pad": "{"x" * (n % 37)}"}}' for n in range(200)]
+    data = "\n".join(events).encode() + b"\n"
+    for step in (1, 7, 64, 4096):
+        reader = ChunkedLineReader(chunk_size=128)
+        assert read_all(reader, Trickle(data, step)) == events
+        assert reader.pending == 0 and reader.lines == 200 and reader.bytes_read == len(data)
+
+
+def test_unterminated_tail_waits_for_the_rest_of_the_line():
+    reader = ChunkedLineReader(chunk_size=64)
+    fd = io.BytesIO(b'{"a": 1}\n{"b": ')
+    assert reader.read_chunk(fd) == (15, ['{"a": 1}'])
+    assert reader.pending == 6
+
+    fd = io.BytesIO(b'2}\n\n{"c": 3}\n')                         # 같은 파일에 이어 쓰인 부분
+    assert reader.read_chunk(fd) == (13, ['{"b": 2}', '{"c": 3}'])   # 빈 줄은 무시
+    assert reader.pending == 0
+
+    reader.read_chunk(io.BytesIO(b'{"half'))
+    reader.reset()                                               # 회전 / truncate → 미완성 줄 폐기
+    assert reader.read_chunk(io.BytesIO(b'{"d": 4}\n')) == (9, ['{"d": 4}'])
+
+
+def test_oversized_line_is_skipped_up_to_next_newline():
+    huge = b'{"payload": "' + b"A" * 1000 + b'"}'
+    data = b'{"a": 1}\n' + huge + b'\n{"b": 2}\n' + huge + b"\n"
+    for step in (13, 32, 4096):
+        reader = ChunkedLineReader(chunk_size=32)
+        assert read_all(reader, Trickle(data, step)) == ['{"a": 1}', '{"b": 2}']
+        assert reader.oversized_lines == 2 and reader.pending == 0
+
+
+def test_line_exactly_filling_the_buffer_is_oversized():
+    reader = ChunkedLineReader(chunk_size=16)
+    data = b"B" * 16 + b"\n" + b"C" * 15 + b"\n"
+    assert read_all(reader, Trickle(data, 16)) == ["C" * 15]
+    assert reader.oversized_lines == 1
+
+
+def test_throttle_only_yields_without_rate_limit():
+    reader = ChunkedLineReader(chunk_size=16, max_rate=0)
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(100):
+            await reader.throttle(1 << 20)
+        return loop.time() - start
+
+    assert asyncio.run(go()) < 0.5
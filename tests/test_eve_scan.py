@@ -0,0 +1,111 @@
+"""eve_scan: mmap 이진 탐색 + 희소 인덱스로 cutoff 이후 줄만 (줄 경계 정렬, 파일 축소 / 회전 시 재구성)"""
+
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from eve_scan import INDEX_MIN_GAP, SparseIndex, iter_lines_since, line_epoch, sidecar_path
+
+BASE = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def eve_line(seconds: float, n: int) -> bytes:
+    ts = (BASE + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%S.%f%z")
+    return json.dumps({"timestamp": ts, "event_type": "alert", "flow_id": n,
+                       "payload": "A" * (60 + n % 90)}).encode()
+
+
+def build(path, count: int, start: float = 0.0, tail: bytes = b"") -> list[bytes]:
+    """1초 간격, 가끔 몇 초 뒤섞인 줄 / timestamp 없는 줄 포함 (마지막에 미완성 줄 tail)"""
+    lines = []
+    for n in range(count):
+        seconds = start + n - (5 if n % 97 == 0 else 0)
+        lines.append(b'{"event_type":"stats"}' if n % 211 == 0 else eve_line(seconds, n))
+    path.write_bytes(b"\n".join(lines) + b"\n" + tail)
+    return lines
+
+
+def expected(lines: list[bytes], cutoff: float) -> list[bytes]:
+    return [line for line in lines if (line_epoch(line) or -1) >= cutoff]
+
+
+@pytest.fixture
+def eve(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)      # 인덱스는 data/index/ 아래
+    return tmp_path / "eve.json"
+
+
+def test_returns_exactly_the_lines_at_or_after_cutoff(eve):
+    lines = build(eve, 30000, tail=eve_line(10 ** 6, -1)[:40])
+    assert eve.stat().st_size > 3 * INDEX_MIN_GAP
+    for seconds in (0, 1, 12345.5, 29990, 29999, 40000):
+        cutoff = BASE.timestamp() + seconds
+        assert list(iter_lines_since(eve, cutoff)) == expected(lines, cutoff)
+        assert list(iter_lines_since(eve, cutoff, use_index=False)) == expected(lines, cutoff)
+
+
+def test_end_limits_to_complete_lines_before_offset(eve):
+    lines = build(eve, 2000)
+    end = sum(len(line) + 1 for line in lines[:1500]) - 10     # 1500번째 줄 중간
+    cutoff = BASE.timestamp() + 1000
+    assert list(iter_lines_since(eve, cutoff, end=end)) == expected(lines[:1499], cutoff)
+
+
+def test_index_is_saved_and_narrows_the_search(eve):
+    build(eve, 30000)
+    list(iter_lines_since(eve, BASE.timestamp() + 20000))
+    assert sidecar_path(eve).exists() and not (eve.parent / "eve.json.idx").exists()
+
+    index = SparseIndex(eve).load()
+    assert index.inode == eve.stat().st_ino and len(index.offsets) >= 2
+    assert index.offsets == sorted(index.offsets)
+    assert all(b - a >= INDEX_MIN_GAP for a, b in zip(index.offsets, index.offsets[1:]))
+    with open(eve, "rb") as f:
+        for epoch, offset in zip(index.epochs, index.offsets):
+            f.seek(offset - 1)
+            assert f.read(1) == b"\n"                            # 항목은 줄 시작 offset
+            assert line_epoch(f.readline()) == epoch
+    lo, hi = index.bounds(BASE.timestamp() + 20000, eve.stat().st_size)
+    assert 0 < lo < hi <= eve.stat().st_size
+
+
+def test_index_rebuilt_when_file_shrinks(eve):
+    build(eve, 30000)
+    list(iter_lines_since(eve, BASE.timestamp() + 25000))
+    inode = eve.stat().st_ino
+
+    with open(eve, "r+b") as f:                                   # copytruncate: 같은 inode, 더 작은 내용
+        f.truncate(0)
+    lines = build(eve, 8000, start=50000)
+    assert eve.stat().st_ino == inode
+    cutoff = BASE.timestamp() + 55000
+    assert list(iter_lines_since(eve, cutoff)) == expected(lines, cutoff)
+    assert max(SparseIndex(eve).load().offsets, default=0) <= eve.stat().st_size
+
+    # 다시 이전 크기 이상으로 자라도 truncate 전 항목이 섞이면 안 됨
+    more = [eve_line(58000 + n, n) for n in range(30000)]
+    with open(eve, "ab") as f:
+        f.write(b"\n".join(more) + b"\n")
+    cutoff = BASE.timestamp() + 57990
+    assert list(iter_lines_since(eve, cutoff)) == expected(lines + more, cutoff)
+    with open(eve, "rb") as f:
+        index = SparseIndex(eve).load()
+        for epoch, offset in zip(index.epochs, index.offsets):
+            f.seek(offset)
+            assert line_epoch(f.readline()) == epoch
+
+
+def test_index_rebuilt_after_rotation(eve):
+    build(eve, 30000)
+    list(iter_lines_since(eve, BASE.timestamp() + 25000))
+    old_index = SparseIndex(eve).load()
+
+    os.rename(eve, eve.with_name("eve.json.1"))
+    lines = build(eve, 30000, start=100000)                       # 새 inode, 다른 시간대
+    cutoff = BASE.timestamp() + 110000
+    assert list(iter_lines_since(eve, cutoff)) == expected(lines, cutoff)
+    new_index = SparseIndex(eve).load()
+    assert new_index.inode == eve.stat().st_ino != old_index.inode
+    assert all(epoch >= BASE.timestamp() + 100000 - 5 for epoch in new_index.epochs)
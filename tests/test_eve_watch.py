@@ -0,0 +1,73 @@
+"""eve_watch: inotify 이벤트 (수정 / 회전 / 재생성), inotify 를 쓸 수 없을 때 폴링 대체"""
+
+import asyncio
+import os
+
+import pytest
+
+import eve_watch
+from eve_watch import (CREATE, MODIFY, POLL, RECHECK_EVENTS, ROTATE, TIMEOUT, InotifyWatcher, PollingWatcher,
+                       create_watcher)
+
+needs_inotify = pytest.mark.skipif(eve_watch._libc is None, reason="inotify 없음 (Linux 전용)")
+
+
+@needs_inotify
+def test_inotify_reports_modify_rotate_and_create(tmp_path):
+    eve = tmp_path / "eve.json"
+    eve.write_bytes(b"")
+
+    async def go():
+        watcher = create_watcher(eve, timeout=2.0)
+        assert isinstance(watcher, InotifyWatcher)
+        try:
+            with open(eve, "ab") as f:
+                f.write(b'{"event_type": "alert"}\n')
+            assert await watcher.wait() == {MODIFY}
+
+            os.rename(eve, tmp_path / "eve.json.1")
+            eve.write_bytes(b"")                                  # 회전: 이동 후 같은 이름으로 생성
+            await asyncio.sleep(0.05)
+            events = await watcher.wait()
+            assert {ROTATE, CREATE} <= events and events & RECHECK_EVENTS
+
+            watcher.rewatch()                                     # 새 inode 감시
+            with open(eve, "ab") as f:
+                f.write(b"{}\n")
+            assert await watcher.wait() == {MODIFY}
+            with open(tmp_path / "eve.json.1", "ab") as f:        # 이전 파일은 더 이상 깨우지 않음
+                f.write(b"{}\n")
+            with open(tmp_path / "other.json", "wb") as f:        # 같은 디렉토리의 다른 파일도
+                f.write(b"{}\n")
+            watcher.timeout = 0.2
+            assert await watcher.wait() == {TIMEOUT}
+            assert watcher.wakeups == 3
+        finally:
+            watcher.close()
+
+    asyncio.run(go())
+
+
+def test_falls_back_to_polling_without_inotify(tmp_path, monkeypatch):
+    monkeypatch.setattr(eve_watch, "_libc", None)
+
+    async def go():
+        watcher = create_watcher(tmp_path / "eve.json", poll_interval=0.01)
+        assert isinstance(watcher, PollingWatcher)
+        assert await watcher.wait() == {POLL} and POLL in RECHECK_EVENTS
+        watcher.close()
+
+    asyncio.run(go())
+
+
+@needs_inotify
+def test_falls_back_to_polling_when_inotify_init_fails(tmp_path, monkeypatch):
+    def fail(self):
+        raise OSError(24, "inotify_init1 실패")                   # EMFILE: 인스턴스 한도 초과
+
+    monkeypatch.setattr(InotifyWatcher, "start", fail)
+
+    async def go():
+        return create_watcher(tmp_path / "eve.json")
+
+    assert isinstance(asyncio.run(go()), PollingWatcher)
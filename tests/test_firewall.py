@@ -0,0 +1,109 @@
+"""BatchBlocker / BlockList.reconcile (FakeBackend)"""
+
+import pytest
+
+from blocklist import BlockList
+from firewall import BatchBlocker, FakeBackend, FirewallError, ProtectedNetworks
+
+
+class FailingBackend(FakeBackend):
+    """fail_on 번째 add 호출에서 FirewallError"""
+
+    def __init__(self, fail_on: int):
+        super().__init__()
+        self.fail_on = fail_on
+        self.calls = 0
+
+    def add(self, entries):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise FirewallError("restore failed")
+        super().add(entries)
+
+
+def test_batch_blocker_coalesces_into_one_transaction():
+    backend = FakeBackend()
+    blocker = BatchBlocker(backend)
+    for ip in ("10.0.0.1", "10.0.0.2", "10.0.0.1"):
+        blocker.request(ip, 60)
+    blocker.request("10.0.0.2", 0)   # 같은 IP 는 마지막 duration
+
+    assert blocker.pending == 2
+    applied = blocker.flush()
+
+    assert sorted(applied) == [("10.0.0.1", 60), ("10.0.0.2", 0)]
+    assert len(backend.batches) == 1
+    assert blocker.pending == 0 and blocker.applied == 2
+    assert blocker.flush() == [] and len(backend.batches) == 1
+
+
+def test_batch_blocker_splits_by_max_batch():
+    backend = FakeBackend()
+    blocker = BatchBlocker(backend, max_batch=2)
+    for i in range(5):
+        blocker.request(f"10.0.1.{i}", 10)
+    assert len(blocker.flush()) == 5
+    assert [len(batch) for batch in backend.batches] == [2, 2, 1]
+
+
+def test_batch_blocker_requeues_failed_and_later_batches():
+    backend = FailingBackend(fail_on=2)
+    blocker = BatchBlocker(backend, max_batch=2)
+    for i in range(5):
+        blocker.request(f"10.0.2.{i}", 30)
+
+    with pytest.raises(FirewallError):
+        blocker.flush()
+    # 첫 배치는 적용, 실패한 배치와 그 뒤 배치는 다시 예약
+    assert set(backend.list()) == {"10.0.2.0", "10.0.2.1"}
+    assert blocker.pending == 3 and blocker.failed == 2
+
+    blocker.request("10.0.2.4", 0)   # 재시도 전 새 요청이 우선
+    applied = dict(blocker.flush())
+    assert applied == {"10.0.2.2": 30, "10.0.2.3": 30, "10.0.2.4": 0}
+    assert len(backend.list()) == 5
+
+
+def test_batch_blocker_refuses_protected_addresses():
+    blocker = BatchBlocker(FakeBackend(), protected=ProtectedNetworks(["10.9.0.0/16"], include_local=False))
+    for ip in ("127.0.0.1", "::1", "0.0.0.0", "10.9.1.1", "not-an-ip"):
+        with pytest.raises(ValueError):
+            blocker.request(ip)
+    assert blocker.request(" 10.8.1.1 ") == "10.8.1.1"
+
+
+def test_reconcile_readds_missing_with_remaining_and_removes_extra(tmp_path):
+    store = BlockList(tmp_path / "blocklist.db")
+    now = 1_000_000.0
+    store.add([("10.0.0.1", 600)], "scan", now=now - 100)        # 500초 남음
+    store.add([("10.0.0.2", 0)], "manual", now=now - 100)        # 영구
+    store.add([("10.0.0.3", 50)], "expired", now=now - 100)      # 이미 만료
+
+    backend = FakeBackend()
+    backend.entries["10.0.0.2"] = None          # 이미 적용됨
+    backend.entries["10.0.0.9"] = None          # 목록에 없는 IP
+
+    result = store.reconcile(backend, now=now)
+
+    assert result["added"] == 1 and result["removed"] == 1
+    assert backend.batches[0] == ["add 10.0.0.1 timeout 500"]
+    assert backend.batches[1] == ["del 10.0.0.9"]
+    assert set(backend.entries) == {"10.0.0.1", "10.0.0.2"}
+    assert store.get("10.0.0.3") is None       # 만료 항목 정리
+    assert store.reconcile(backend, now=now) == {**result, "added": 0, "removed": 0}
+    store.close()
+
+
+def test_reconcile_sees_rows_written_by_another_process(tmp_path):
+    path = tmp_path / "blocklist.db"
+    mcp, api = BlockList(path), BlockList(path, refresh_interval=3600)
+    api.contains("10.0.0.5")                   # 캐시 확인 시각 갱신
+    mcp.add([("10.0.0.5", 0)], "auto", source="auto")
+
+    backend = FakeBackend()
+    backend.entries["10.0.0.5"] = None          # MCP 가 방금 적용한 항목
+    result = api.reconcile(backend)
+
+    assert result["removed"] == 0 and "10.0.0.5" in backend.entries
+    mcp.close()
+    api.close()
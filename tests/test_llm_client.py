@@ -0,0 +1,96 @@
+"""LLMClient 서킷 브레이커 (본문 도중 실패 집계, half_open 시험 호출 1개)"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from llm_client import CircuitBreaker, CircuitOpenError, LLMClient
+
+
+class HangingBody(httpx.AsyncByteStream):
+    """상태 줄 / 첫 청크는 보내고 본문 도중 읽기 타임아웃 (생성이 멈춘 Ollama)"""
+
+    async def __aiter__(self):
+        yield b'{"response": "alert", "done": false}\n'
+        raise httpx.ReadTimeout("stalled")
+
+
+def make_client(handler, failure_threshold: int = 3) -> LLMClient:
+    client = LLMClient("http://fake-llm.test", httpx.Timeout(1.0),
+                       CircuitBreaker(failure_threshold=failure_threshold, cooldown=60))
+    client.client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+async def read_all(client: LLMClient):
+    async with client.stream("POST", "/api/generate") as response:
+        async for _ in response.aiter_lines():
+            pass
+
+
+def test_mid_body_timeouts_open_the_breaker():
+    client = make_client(lambda request: httpx.Response(200, stream=HangingBody()))
+
+    async def go():
+        for _ in range(3):
+            with pytest.raises(httpx.ReadTimeout):
+                await read_all(client)
+        with pytest.raises(CircuitOpenError):
+            await read_all(client)
+        await client.client.aclose()
+
+    asyncio.run(go())
+    assert client.breaker.state == "open"
+    assert client.breaker.failures == 3 and client.errors == 3
+    assert client.breaker.short_circuited == 1
+
+
+def test_success_is_recorded_after_the_body_and_errors_in_caller_count():
+    client = make_client(lambda request: httpx.Response(200, content=b'{"done": true}\n'))
+    client.breaker.failures = 2
+
+    async def go():
+        async with client.stream("POST", "/api/generate") as response:
+            assert client.breaker.failures == 2      # 본문을 읽기 전에는 초기화하지 않음
+            await response.aread()
+        assert client.breaker.failures == 0
+
+        with pytest.raises(ValueError):
+            async with client.stream("POST", "/api/generate"):
+                raise ValueError("bad chunk")
+        await client.client.aclose()
+
+    asyncio.run(go())
+    assert client.breaker.failures == 1 and client.errors == 1
+
+
+def expire_cooldown(breaker: CircuitBreaker):
+    breaker.opened_at -= breaker.cooldown + 1
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=5.0)
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    expire_cooldown(breaker)
+
+    assert breaker.allow()                              # 쿨다운 경과 → 시험 호출
+    assert breaker.state == "half_open"
+    assert not breaker.allow() and not breaker.allow()  # 결과가 나올 때까지 나머지는 차단
+    assert breaker.short_circuited == 3
+
+    breaker.release()                                   # 시험 호출이 결과 없이 끝남 (취소)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow() and breaker.allow()
+
+
+def test_failed_probe_reopens_with_longer_cooldown():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=5.0)
+    breaker.record_failure()
+    expire_cooldown(breaker)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.open_count == 2 and breaker.cooldown >= 9.0
+    assert not breaker.allow()
@@ -0,0 +1,123 @@
+"""SuricataMonitor._process_alert (평판 차단 / 룰 생성 분기), EveSource 부하 차단"""
+
+import asyncio
+import json
+
+import pytest
+
+import suricata_server
+from firewall import BatchBlocker, FakeBackend, ProtectedNetworks
+from eve_reader import ChunkedLineReader
+from suricata_server import EveSource, SuricataMonitor
+
+REPUTATION = {"signature_id": 2522001, "signature": "ET CINS Active Threat Intelligence Poor Reputation IP",
+              "category": "Misc Attack", "severity": 2}
+
+
+def exploit(sid: int, severity: int) -> dict:
+    """템플릿에 맞지 않는 알림 (LLM 대상)"""
+    return {"signature_id": sid, "signature": "ET EXPLOIT Apache Struts OGNL Injection",
+            "category": "Web Application Attack", "severity": severity}
+
+
+def alert_event(src_ip: str, alert: dict, n: int = 0) -> dict:
+    return {"timestamp": f"2026-10-18T10:00:{n:02d}.000000+0000", "event_type": "alert",
+            "src_ip": src_ip, "dest_ip": "192.0.2.10", "dest_port": 22, "proto": "TCP", "alert": alert}
+
+
+@pytest.fixture
+def monitor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(suricata_server, "AUTO_GENERATE", True)
+    monkeypatch.setattr(suricata_server, "OLLAMA_ENABLED", True)
+    monkeypatch.setattr(suricata_server, "RULE_TEMPLATES", True)
+    monkeypatch.setattr(suricata_server, "AGGREGATION_WINDOW", 0)
+    monkeypatch.setattr(suricata_server, "processed_alerts", set())
+    monkeypatch.setattr(suricata_server, "alert_history", [])
+
+    monitor = SuricataMonitor(eve_sources=[])
+    monitor.llm_calls = []
+    monitor.added = []
+
+    async def generate_rule(info):
+        monitor.llm_calls.append(info["signature_id"])
+        return f'alert ip any any -> any any (msg:"llm"; sid:{9000000 + len(monitor.llm_calls)}; rev:1;)'
+
+    async def add_rule(rule, info, source="llm"):
+        monitor.added.append((rule, source))
+        return True
+
+    monitor.ollama.generate_rule = generate_rule
+    monitor.rule_manager.add_rule = add_rule
+    monitor.rule_manager._index_loaded = True
+    yield monitor
+    asyncio.run(monitor.ollama.close())
+    monitor.blocklist.close()
+
+
+def process(monitor: SuricataMonitor, source: EveSource, *events):
+    async def go():
+        for event in events:
+            await monitor._process_alert(event, source)
+    asyncio.run(go())
+
+
+def test_reputation_alert_blocks_each_source_when_blocker_is_set(monitor, tmp_path):
+    monitor.blocker = BatchBlocker(FakeBackend(), protected=ProtectedNetworks())
+    source = EveSource(tmp_path / "eve.json", "eve", monitor)
+    process(monitor, source, alert_event("203.0.113.7", REPUTATION, 1), alert_event("203.0.113.8", REPUTATION, 2),
+            alert_event("127.0.0.1", REPUTATION, 3))
+
+    assert monitor.blocker.pending == 2                    # 같은 sid 라도 출발지별, 루프백은 거부
+    assert monitor.blocklist.contains("203.0.113.7") and monitor.blocklist.contains("203.0.113.8")
+    assert monitor.llm_calls == [] and monitor.added == []
+    assert monitor.templates.stats()["template_hits"] == {"ip_block": 2}
+
+
+def test_reputation_alert_falls_through_to_llm_without_blocker(monitor, tmp_path):
+    assert monitor.blocker is None                         # auto_block 기본값
+    source = EveSource(tmp_path / "eve.json", "eve", monitor)
+    process(monitor, source, alert_event("203.0.113.7", REPUTATION, 1))
+
+    assert monitor.llm_calls == [2522001]
+    assert [origin for _, origin in monitor.added] == ["llm"]
+    assert monitor.templates.stats()["skipped_no_blocker"] == 1
+    assert not monitor.blocklist.contains("203.0.113.7")
+
+
+def drain(source: EveSource):
+    asyncio.run(source._drain(source._fd, source._reader, source.eve_log_path, source._inode))
+
+
+def test_shedding_keeps_high_severity_and_defers_llm(monitor, tmp_path, monkeypatch):
+    monkeypatch.setattr(suricata_server, "SHED_LAG_BYTES", 4096)
+    monkeypatch.setattr(suricata_server, "SHED_LAG_SECONDS", 0)
+    monkeypatch.setattr(suricata_server, "SHED_SAMPLE_RATE", 1)      # 샘플링 없음
+    eve = tmp_path / "eve.json"
+    events = [alert_event("203.0.113.7", exploit(3000001, 1), 1)]
+    events += [alert_event(f"198.51.100.{n % 3}", exploit(3000002, 3), n % 60) for n in range(300)]
+    eve.write_text("".join(json.dumps(event) + "\n" for event in events))
+
+    source = EveSource(eve, "eve", monitor)
+    source._reader = ChunkedLineReader(1024)
+    source._fd = open(eve, "rb")
+    source._inode = eve.stat().st_ino
+    try:
+        drain(source)                                                 # 파일 끝이 4KB 이상 남은 동안 차단
+        assert not source.shedding                                    # 따라잡으면 해제
+        kept = [a["signature_id"] for a in suricata_server.alert_history]
+        assert kept.count(3000001) == 1                               # 심각도 ≤ SHED_KEEP_SEVERITY 는 처리
+        shed = sum(source.shed_counters.values())
+        assert shed == source.shed_stats["aggregated"] > 250 and kept.count(3000002) == 300 - shed
+        assert set(source.shed_counters) == {(3000002, f"198.51.100.{n}") for n in range(3)}
+
+        assert monitor.llm_calls == [] and source.shed_stats["llm_skipped"] == 1
+        assert 3000001 not in suricata_server.processed_alerts       # 다음에 다시 시도
+
+        with open(eve, "a") as f:                                     # 지연 해소 후 같은 sid 재발
+            f.write(json.dumps(alert_event("203.0.113.7", exploit(3000001, 1), 59)) + "\n")
+        drain(source)
+        assert monitor.llm_calls == [3000001]
+        assert [origin for _, origin in monitor.added] == ["llm"]
+    finally:
+        source._fd.close()
@@ -0,0 +1,162 @@
+"""OllamaClient 스트리밍 (가짜 /api/generate: httpx.MockTransport / 로컬 HTTP 서버의 chunked 응답)"""
+
+import asyncio
+import json
+
+import httpx
+
+from suricata_server import OllamaClient
+
+RULE = 'alert tcp any any -> any any (msg:"Test"; content:"x"; classtype:misc-activity; sid:9000001; rev:1;)'
+FIRST_TOKEN_DELAY = 0.05
+
+
+class FakeGenerate(httpx.AsyncByteStream):
+    """청크를 하나씩 보내며 몇 개까지 읽혔는지 기록 (룰이 닫힌 뒤의 청크는 읽히면 안 됨)"""
+
+    def __init__(self, pieces: list[str], done: dict):
+        self.lines = [json.dumps({"response": p, "done": False}) + "\n" for p in pieces]
+        self.lines.append(json.dumps({"response": "", "done": True, **done}) + "\n")
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(FIRST_TOKEN_DELAY)
+        for line in self.lines:
+            self.sent += 1
+            yield line.encode()
+
+    async def aclose(self):
+        self.closed = True
+
+
+def run_stream(pieces: list[str], done: dict = None):
+    body = FakeGenerate(pieces, done or {})
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, stream=body)
+
+    async def go():
+        client = OllamaClient(base_url="http://fake-ollama.test")
+        await client.llm.client.aclose()
+        client.llm.client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+        try:
+            rule = await client._stream_generate({"model": "m", "prompt": "p", "stream": True})
+        finally:
+            await client.close()
+        return client, rule
+
+    client, rule = asyncio.run(go())
+    assert requests[0].url.path == "/api/generate"
+    return client, rule, body
+
+
+def test_stream_stops_at_closing_paren_and_records_ttft():
+    pieces = [RULE[:30], RULE[30:70], RULE[70:], "\n\nExplanation: ", "this rule matches x", "\n"]
+    client, rule, body = run_stream(pieces, {"eval_count": 99})
+
+    assert rule == RULE
+    assert body.sent == 3 and body.closed            # 닫는 ')' 청크 이후로는 읽지 않음
+    assert client.metrics["early_stops"] == 1
+    assert client.metrics["total_tokens"] == 3       # done 청크 전에 끊었으므로 청크 수
+    assert client.metrics["last_ttft_ms"] >= FIRST_TOKEN_DELAY * 1000 * 0.8
+    assert client.metrics["avg_ttft_ms"] == client.metrics["last_ttft_ms"]
+    assert client.metrics["last_total_ms"] >= client.metrics["last_ttft_ms"]
+
+
+def test_stream_until_done_uses_eval_count():
+    client, rule, body = run_stream(["```\n", RULE[:40], RULE[40:-1]], {"eval_count": 42})
+
+    assert rule == RULE                              # 잘린 ')' 는 보완
+    assert body.sent == 4
+    assert client.metrics["early_stops"] == 0
+    assert client.metrics["total_tokens"] == 42
+
+
+def test_extract_rule_keeps_closed_rule():
+    client = OllamaClient(base_url="http://fake-ollama.test")
+    assert client._extract_rule(f"```\n{RULE}\n```") == RULE
+    assert client._extract_rule(RULE[:-1]) == RULE
+    assert client._extract_rule(RULE[:-2]) == RULE
+    assert client._extract_rule("no rule here") is None
+    asyncio.run(client.close())
+
+
+def test_truncated_rule_does_not_stop_the_stream_early():
+    client = OllamaClient(base_url="http://fake-ollama.test")
+    head = 'alert tcp any any -> any any (msg:"Test"; sid:9000001; '
+    assert client._first_complete_rule(head + 'content:"GET (rev:2)') is None    # content 안의 ')'
+    assert client._first_complete_rule(head + 'rev:1; pcre:"/a(b)') is None     # 옵션 도중
+    assert client._first_complete_rule(head + 'content:"rev:1;)') is None       # 따옴표가 닫히지 않음
+    assert client._first_complete_rule("```\n" + RULE) == RULE
+    assert client._first_complete_rule(RULE.replace("rev:1;", "") + "  ") == RULE.replace("rev:1;", "")
+    asyncio.run(client.close())
+
+
+async def serve_chunked(pieces: list[str], delay: float, state: dict):
+    """
+    /api/generate 를 흉내 내는 로컬 HTTP/1.1 서버 (청크마다 delay 간격, Transfer-Encoding: chunked)
+    클라이언트가 연결을 끊으면 나머지 청크는 보내지 않음
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length:"))
+        state["request"] = json.loads(await reader.readexactly(length))
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n")
+        lines = [json.dumps({"response": p, "done": False}) + "\n" for p in pieces]
+        lines.append(json.dumps({"response": "", "done": True, "eval_count": 99}) + "\n")
+        try:
+            for line in lines:
+                data = line.encode()
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+                state["sent"] += 1
+                try:
+                    await asyncio.wait_for(reader.read(1), delay)    # b"" → 클라이언트가 끊음
+                    state["disconnected"] = True
+                    break
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except ConnectionError:
+            state["disconnected"] = True
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def test_real_http_stream_stops_before_trailing_explanation():
+    pieces = [RULE[:30], RULE[30:70], RULE[70:], "\n\nExplanation: ", "this rule matches x", "\n"]
+    state = {"sent": 0, "disconnected": False}
+
+    async def go():
+        server = await serve_chunked(pieces, delay=0.5, state=state)
+        port = server.sockets[0].getsockname()[1]
+        client = OllamaClient(base_url=f"http://127.0.0.1:{port}")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            rule = await client._stream_generate({"model": "m", "prompt": "p", "stream": True})
+            elapsed = loop.time() - started
+        finally:
+            await client.close()
+        for _ in range(50):                                      # 서버 쪽이 끊김을 감지할 때까지
+            if state["disconnected"]:
+                break
+            await asyncio.sleep(0.05)
+        server.close()
+        await server.wait_closed()
+        return client, rule, elapsed
+
+    client, rule, elapsed = asyncio.run(go())
+    assert rule == RULE and state["request"]["stream"] is True
+    assert state["sent"] == 3 and state["disconnected"]          # 설명 청크는 보내기 전에 끊김
+    assert elapsed < 0.5 * 3                                     # 청크 6개 + done 을 기다리지 않음
+    assert client.metrics["early_stops"] == 1
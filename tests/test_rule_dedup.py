@@ -0,0 +1,43 @@
+"""rule_dedup 헤더 파싱 ([..] 그룹) / 파싱 실패 룰의 원문 중복 비교"""
+
+from rule_dedup import RuleIndex, canonicalize, parse_rule
+
+GROUPED = ('alert tcp [1.2.3.4, 5.6.7.8] any -> $HOME_NET [80, 443] '
+           '(msg:"a"; flow:established,to_server; content:"evil"; sid:9000001; rev:1;)')
+
+
+def test_bracketed_header_groups_parse():
+    parsed = parse_rule(GROUPED)
+    assert parsed is not None
+    assert parsed.header == ("tcp", "[1.2.3.4,5.6.7.8]", "any", "->", "$HOME_NET", "[80,443]")
+    assert parsed.sid == 9000001
+
+    nested = parse_rule('drop ip ![10.0.0.0/8, [192.168.0.0/16, !192.168.1.0/24]] any <> any any (msg:"n"; sid:1;)')
+    assert nested.header[1] == "![10.0.0.0/8,[192.168.0.0/16,!192.168.1.0/24]]"
+
+
+def test_group_spacing_and_sid_do_not_matter():
+    compact = GROUPED.replace("[1.2.3.4, 5.6.7.8]", "[1.2.3.4,5.6.7.8]").replace("[80, 443]", "[80,443]")
+    assert canonicalize(compact) == canonicalize(GROUPED.replace("sid:9000001", "sid:9000002"))
+
+    index = RuleIndex()
+    assert index.add(GROUPED)
+    verdict = index.check(compact.replace("sid:9000001", "sid:9000003"))
+    assert verdict.status == "duplicate" and verdict.match_sid == 9000001
+
+
+def test_unparsable_rule_falls_back_to_raw_text():
+    broken = 'alert tcp any any -> any (msg:"missing port"; content:"x"; sid:9000010; rev:1;)'
+    assert parse_rule(broken) is None
+
+    index = RuleIndex()
+    assert index.check(broken).status == "invalid"    # 비교할 원문 없음 → 중복 아님
+    assert index.add(broken)
+    assert 9000010 in index.sids
+
+    again = broken.replace("sid:9000010; rev:1;", "sid:9000011;  rev:2;")
+    verdict = index.check(again)
+    assert verdict.status == "duplicate" and verdict.match_sid == 9000010
+    assert not index.add(again)
+    assert index.check(broken.replace('"x"', '"y"')).status == "invalid"
+    assert len(index) == 1
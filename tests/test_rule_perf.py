@@ -0,0 +1,61 @@
+"""rule_perf.log / eve.json stats 파싱과 성능 순위 (tests/fixtures 기록 샘플)"""
+
+import shutil
+
+from conftest import FIXTURES
+from rule_perf import build_perf_report, load_latest_stats, load_rule_perf
+
+RULES = [
+    {"sid": "2100498", "message": "GPL ATTACK_RESPONSE id check returned root", "action": "alert", "file": "suricata.rules"},
+    {"sid": "9000001", "message": "LLM generated", "action": "alert", "file": "local.rules"},
+]
+
+
+def test_parse_merges_latest_dump_per_sid():
+    perf = load_rule_perf(FIXTURES / "rule_perf.log")
+    assert set(perf) == {2100498, 9000001, 9000002}          # "bogus" sid / 잘린 마지막 줄은 무시
+    assert perf[2100498]["ticks_total"] == 1500000           # 10:00 덤프가 09:00 덤프를 덮어씀
+    assert perf[2100498]["profiled_at"].startswith("2026-10-18T10:00")
+    assert perf[9000001]["profiled_at"].startswith("2026-10-18T09:00")   # 이후 덤프에 없으면 유지
+    assert perf[9000002]["percent"] == 33.0
+
+
+def test_report_sort_order_and_flagging():
+    perf = load_rule_perf(FIXTURES / "rule_perf.log")
+    stats = load_latest_stats(FIXTURES / "stats.json", block_size=64)
+
+    report = build_perf_report(perf, RULES, stats, sort="ticks_total", cost_threshold=100000)
+    assert [e["sid"] for e in report["rules"]] == [2100498, 9000002, 9000001]
+    assert report["total_ticks"] == 2700000
+    assert [e["sid"] for e in report["flagged"]] == [9000001]  # 매치 없음 → cost = ticks_total
+    assert report["rules"][0]["origin"] == "upstream" and report["rules"][0]["in_ruleset"]
+    assert not report["rules"][1]["in_ruleset"]
+
+    by_avg = build_perf_report(perf, RULES, sort="ticks_avg")
+    assert [e["sid"] for e in by_avg["rules"]] == [9000001, 2100498, 9000002]
+    assert build_perf_report(perf, RULES, sort="nope")["sort"] == "ticks_total"
+    assert len(build_perf_report(perf, RULES, limit=1)["rules"]) == 1
+
+    assert report["stats"] == {
+        "timestamp": "2026-10-18T10:00:00.000000+0000", "uptime": 3600, "packets": 123456,
+        "alerts": 42, "rules_loaded": 30005, "rules_failed": 2,
+    }
+
+
+def test_missing_logs(tmp_path):
+    assert load_rule_perf(tmp_path / "rule_perf.log") == {}
+    assert load_latest_stats(tmp_path / "eve.json") is None
+    assert build_perf_report({}, RULES, None)["profiled_rules"] == 0
+
+
+def test_rotated_log_falls_back_until_next_dump(tmp_path):
+    log = tmp_path / "rule_perf.log"
+    shutil.copy(FIXTURES / "rule_perf.log", tmp_path / "rule_perf.log.1")
+    assert set(load_rule_perf(log)) == {2100498, 9000001, 9000002}    # 회전 직후 새 파일 없음
+
+    log.write_text("")
+    assert set(load_rule_perf(log)) == {2100498, 9000001, 9000002}    # 새 파일이 아직 비어 있음
+
+    log.write_text('{"timestamp":"2026-10-18T11:00:00.000000+0000","rules":[{"signature_id":2100498,"ticks_total":7}]}\n')
+    perf = load_rule_perf(log)
+    assert set(perf) == {2100498} and perf[2100498]["ticks_total"] == 7
@@ -0,0 +1,27 @@
+"""TemplateClassifier (평판 출발지는 룰 없음, SID 는 삽입 때만 사용)"""
+
+from rule_templates import BLOCK_TEMPLATES, TEMPLATE_SID_RANGE, TemplateClassifier
+
+REPUTATION_ALERT = {"signature_id": 2522001, "signature": "ET CINS Active Threat Intelligence",
+                    "category": "Misc Attack", "severity": 2, "src_ip": "203.0.113.7", "dest_port": 22}
+SCAN_ALERT = {"signature_id": 2010937, "signature": "ET SCAN Suspicious inbound to mySQL port 3306",
+              "category": "Detection of a Network Scan", "severity": 2, "dest_port": 3306}
+
+
+def test_reputation_alert_generates_no_rule():
+    templates = TemplateClassifier()
+    assert templates.classify(REPUTATION_ALERT) in BLOCK_TEMPLATES
+    assert templates.generate(REPUTATION_ALERT, set()) is None
+    assert templates.misses == 0 and not templates.hits
+
+
+def test_sid_is_not_consumed_until_rule_is_inserted():
+    templates = TemplateClassifier()
+    used: set[int] = set()
+    first = templates.generate(SCAN_ALERT, used)[1]
+    again = templates.generate(SCAN_ALERT, used)[1]   # 첫 룰이 중복으로 거부됨 → 같은 SID 재사용
+    assert first == again
+    assert f"sid:{TEMPLATE_SID_RANGE[0]};" in first
+
+    used.add(TEMPLATE_SID_RANGE[0])                    # RuleIndex.add 로 삽입된 뒤
+    assert f"sid:{TEMPLATE_SID_RANGE[0] + 1};" in templates.generate(SCAN_ALERT, used)[1]
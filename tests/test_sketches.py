@@ -0,0 +1,88 @@
+"""sketches: SpaceSaving 오차 상한 / 병합, HyperLogLog 고유 개수 오차 / 병합"""
+
+import random
+from collections import Counter
+
+from sketches import HyperLogLog, SpaceSaving
+
+
+def zipf_stream(n: int, seed: int) -> list:
+    """몇몇 heavy hitter + 긴 꼬리, int 와 str 항목 혼재 (dest_port / src_ip)"""
+    rng = random.Random(seed)
+    items = [80, 443, 22, "203.0.113.7", "198.51.100.3"] + [f"10.0.{i // 256}.{i % 256}" for i in range(3000)]
+    items += list(range(1024, 4024))
+    weights = [1.0 / (rank + 1) ** 1.1 for rank in range(len(items))]
+    return rng.choices(items, weights=weights, k=n)
+
+
+def assert_bounds(sketch: SpaceSaving, truth: Counter, total: int):
+    bound = total / sketch.capacity
+    for item, count, error in sketch.top(len(sketch)):
+        assert count - error <= truth[item] <= count          # 하한 ≤ 실제 ≤ 과대 추정
+        assert error <= bound
+    kept = set(sketch.counts)
+    assert all(item in kept for item, freq in truth.items() if freq > bound)
+
+
+def test_top_k_counts_stay_within_error_bound_with_mixed_item_types():
+    stream = zipf_stream(50000, seed=1)
+    sketch = SpaceSaving(capacity=100)
+    for item in stream:
+        sketch.offer(item)                                    # int / str 동률에서 TypeError 없음
+
+    truth = Counter(stream)
+    assert len(sketch) == 100
+    assert_bounds(sketch, truth, len(stream))
+    assert [item for item, _, _ in sketch.top(3)] == [item for item, _ in truth.most_common(3)]
+    assert sketch.min_count() == min(sketch.counts.values())
+
+
+def test_equal_counts_of_different_types_do_not_compare_items():
+    sketch = SpaceSaving(capacity=2)
+    for item in (1, "a", 2, "b", 3, "c"):
+        sketch.offer(item)
+    assert len(sketch) == 2 and sum(sketch.counts.values()) == 6
+
+
+def test_merge_keeps_error_bound_over_combined_stream():
+    streams = [zipf_stream(20000, seed=seed) for seed in (2, 3, 4)]
+    sketches = []
+    for stream in streams:
+        sketch = SpaceSaving(capacity=100)
+        for item in stream:
+            sketch.offer(item)
+        sketches.append(sketch)
+
+    merged = SpaceSaving.merge(sketches, capacity=100)
+    truth = Counter(item for stream in streams for item in stream)
+    total = sum(map(len, streams))
+    assert len(merged) == 100
+    for item, count, error in merged.top(100):
+        assert count - error <= truth[item] <= count
+        assert error <= total / 100
+    assert merged.top(3)[0][0] == truth.most_common(1)[0][0]
+    merged.offer("new")                                       # 병합 결과도 계속 갱신 가능
+    assert "new" in merged.counts
+
+
+def test_hll_cardinality_within_tolerance():
+    for n in (100, 5000, 200000):
+        hll = HyperLogLog(p=12)
+        for i in range(n):
+            hll.add(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}")
+            hll.add(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}")   # 중복은 무시
+        assert abs(hll.count() - n) <= max(2, 4 * hll.error_rate * n)
+
+
+def test_hll_merge_is_registerwise_max_and_counts_the_union():
+    a, b = HyperLogLog(p=10), HyperLogLog(p=10)
+    for i in range(30000):
+        a.add(i)
+    for i in range(20000, 60000):
+        b.add(i)
+
+    merged = HyperLogLog.merge([a, b], p=10)
+    assert list(merged.registers) == [max(x, y) for x, y in zip(a.registers, b.registers)]
+    assert abs(merged.count() - 60000) <= 4 * merged.error_rate * 60000
+    assert HyperLogLog.merge([a], p=10).registers == a.registers
+    assert HyperLogLog.merge([], p=10).count() == 0
@@ -0,0 +1,78 @@
+"""threat_scorer: 반감기 감쇠, 임계값 통과 시 콜백 1회, 감쇠 후 재감시"""
+
+import pytest
+
+from threat_scorer import REARM_RATIO, SEVERITY_WEIGHTS, ThreatScorer
+
+T0 = 1_760_000_000.0
+
+
+def test_score_decays_with_half_life():
+    scorer = ThreatScorer(threshold=1000, half_life=60)
+    scorer.observe("203.0.113.7", 1, "sig", now=T0)
+    assert scorer.score("203.0.113.7", now=T0) == SEVERITY_WEIGHTS[1]
+    assert scorer.score("203.0.113.7", now=T0 + 60) == pytest.approx(SEVERITY_WEIGHTS[1] / 2)
+    assert scorer.score("203.0.113.7", now=T0 + 180) == pytest.approx(SEVERITY_WEIGHTS[1] / 8)
+
+    state = scorer.observe("203.0.113.7", 3, "sig", now=T0 + 60)  # 감쇠된 점수 + 새 가중치
+    assert state.score == pytest.approx(SEVERITY_WEIGHTS[1] / 2 + SEVERITY_WEIGHTS[3])
+    assert scorer.score("unknown", now=T0) == 0.0
+
+
+def test_slow_attacker_accumulates_across_observations():
+    scorer = ThreatScorer(threshold=1000, half_life=300)
+    for n in range(10):
+        scorer.observe("198.51.100.3", 2, now=T0 + n * 30)
+    top = scorer.top(1, now=T0 + 270)
+    assert top[0]["ip"] == "198.51.100.3" and top[0]["count"] == 10
+    assert SEVERITY_WEIGHTS[2] * 5 < top[0]["score"] < SEVERITY_WEIGHTS[2] * 10
+
+
+def test_threshold_crossing_fires_callback_once():
+    fired = []
+    scorer = ThreatScorer(threshold=20, half_life=300, on_threshold=fired.append)
+    for n in range(6):                                            # 10점씩, 2번째에서 통과
+        scorer.observe("203.0.113.7", 1, f"sig-{n}", now=T0 + n)
+    assert [state.ip for state in fired] == ["203.0.113.7"]
+    assert scorer.stats()["triggered"] == 1
+    assert fired[0].triggered and fired[0].count == 6
+
+
+def test_rearms_only_after_score_decays_below_ratio():
+    fired = []
+    scorer = ThreatScorer(threshold=20, half_life=60, on_threshold=fired.append)
+    scorer.observe("203.0.113.7", 1, now=T0)
+    scorer.observe("203.0.113.7", 1, now=T0)                      # 20 → 발동
+    assert len(fired) == 1
+
+    # 60초 후 10 + 1 = 11 → 아직 임계값 × REARM_RATIO(10) 이상, 다시 넘어도 발동 안 함
+    scorer.observe("203.0.113.7", None, now=T0 + 60)
+    scorer.observe("203.0.113.7", 1, now=T0 + 60)
+    assert len(fired) == 1
+
+    # 충분히 감쇠 (10 미만) → 재감시, 다시 넘으면 한 번 더
+    later = T0 + 60 + 5 * 60
+    assert scorer.score("203.0.113.7", now=later) < 20 * REARM_RATIO
+    scorer.observe("203.0.113.7", 1, now=later)
+    assert len(fired) == 1
+    scorer.observe("203.0.113.7", 1, now=later)
+    assert len(fired) == 2 and scorer.stats()["triggered"] == 2
+
+
+def test_whitelist_and_blocked_ips_skip_callback():
+    fired = []
+    scorer = ThreatScorer(threshold=10, whitelist=["192.0.2.1"], on_threshold=fired.append,
+                          is_blocked=lambda ip: ip == "203.0.113.9")
+    assert scorer.observe("192.0.2.1", 1, now=T0) is None
+    assert scorer.observe("203.0.113.9", 1, now=T0).triggered      # 상태는 갱신, 콜백만 생략
+    assert fired == [] and scorer.stats()["triggered"] == 1
+
+
+def test_idle_and_overflow_ips_are_evicted():
+    scorer = ThreatScorer(idle_ttl=100, max_ips=3)
+    for n in range(3):
+        scorer.observe(f"10.0.0.{n}", 3, now=T0 + n)
+    scorer.observe("10.0.0.3", 3, now=T0 + 3)                     # max_ips 초과 → 가장 오래된 것
+    assert list(scorer.ips) == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    scorer.observe("10.0.0.2", 3, now=T0 + 150)                   # idle_ttl 초과분 제거
+    assert list(scorer.ips) == ["10.0.0.2"] and scorer.stats()["evicted"] == 3